@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+import tempfile
 import yaml
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
@@ -52,6 +53,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'rest_framework',
     'user',
     'job',
     'review',
@@ -59,7 +61,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'utilities.profiling.ProfilingMiddleware',
+    'utilities.instrumentation.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'utilities.routers.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -73,7 +78,7 @@ ROOT_URLCONF = 'ganyApi.urls'
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [],
+        'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -92,16 +97,52 @@ WSGI_APPLICATION = 'ganyApi.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# ENGINE utilities.db.pooled takes the connections from a pool sized by
+# the POOL section of the database settings, e.g
+#   database:
+#     ENGINE: utilities.db.pooled
+#     POOL:
+#       MIN_SIZE: 2  # kept open
+#       MAX_SIZE: 20
+#       IDLE_TIMEOUT: 300  # idle seconds before closing above MIN_SIZE
+#       MAX_LIFETIME: 1800
+#       CHECK_AFTER: 30  # idle seconds before a checkout pings
+#       TIMEOUT: 10  # seconds waiting for a free connection
+
 DATABASES = {
     'default': {
         'ENGINE': config['database']['ENGINE'],
         'NAME': config['database']['NAME'],
         'USER': config['database']['USER'],
         'PASSWORD': config['database']['PASSWORD'],
-        'HOST': config['database']['HOST']
+        'HOST': config['database']['HOST'],
+        'POOL': config['database'].get('POOL', {}),
     }
 }
 
+# Read replicas, the REPLICAS of the database settings are added as
+# replica1, replica2... with the settings of default they do not give.
+# The reads of the scheduling and review models go to them, see
+# utilities.routers, e.g
+#   database:
+#     REPLICAS:
+#       - HOST: replica-1.internal
+#     REPLICA_PIN_SECONDS: 5
+
+REPLICAS = []
+for n, replica in enumerate(config['database'].get('REPLICAS') or [], 1):
+    DATABASES[f'replica{n}'] = {
+        **DATABASES['default'],
+        **replica,
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICAS.append(f'replica{n}')
+
+DATABASE_ROUTERS = ['utilities.routers.ReplicaRouter']
+
+# seconds a user who wrote reads from the primary, about the replica lag
+REPLICA_PIN_SECONDS = config['database'].get('REPLICA_PIN_SECONDS', 5)
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -140,3 +181,117 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/2.2/howto/static-files/
 
 STATIC_URL = '/static/'
+
+# REST framework
+# https://www.django-rest-framework.org/api-guide/settings/
+
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
+    'DEFAULT_PERMISSION_CLASSES': [
+        'rest_framework.permissions.IsAuthenticated',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'utilities.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
+}
+
+
+# Time slots
+
+# merge new time slots with the adjacent slots of their creator
+TIMESLOT_COALESCE = False
+
+
+# Caches
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+
+# availability results are cached per executor. The locmem backends
+# are per process, an invalidation does not reach the other workers:
+# deployments running more than one process configure a shared
+# backend in the caches section of the YAML settings, e.g
+#   caches:
+#     default:
+#       BACKEND: django.core.cache.backends.memcached.MemcachedCache
+#       LOCATION: 127.0.0.1:11211
+#     availability:
+#       BACKEND: django.core.cache.backends.memcached.MemcachedCache
+#       LOCATION: 127.0.0.1:11211
+#       KEY_PREFIX: availability
+# check --deploy warns about a locmem availability cache
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'availability': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'availability',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    **config.get('caches', {}),
+}
+
+AVAILABILITY_CACHE = 'availability'
+
+
+# Profiling
+# see utilities.profiling, enabled by the profiling section of the YAML
+# settings, e.g
+#   profiling:
+#     ENABLED: true
+#     RATE: 0.01
+#     PATTERNS: {'^/api/jobs/$': 0.2}
+#     DIRECTORY: /var/tmp/gany-profiles
+#     KEEP: 500
+
+PROFILING = {
+    'ENABLED': False,
+    # the share of the requests profiled
+    'RATE': 0.01,
+    # path regular expressions and their own rates
+    'PATTERNS': {},
+    'DIRECTORY': os.path.join(tempfile.gettempdir(), 'gany-profiles'),
+    # the number of recent profiles kept
+    'KEEP': 200,
+    **config.get('profiling', {}),
+}
+
+
+# Metrics
+# see utilities.metrics, the worker processes share DIRECTORY. The
+# files of dead processes are removed at startup. /metrics answers staff
+# users and the ALLOWED_IPS, behind a proxy the scraper should reach
+# the server directly or the proxy should block /metrics
+
+METRICS = {
+    'DIRECTORY': os.path.join(tempfile.gettempdir(), 'gany-metrics'),
+    'ALLOWED_IPS': ['127.0.0.1', '::1'],
+    **config.get('metrics', {}),
+}
+
+
+# SQL instrumentation
+# see utilities.instrumentation
+
+# going over a query budget raises instead of logging a warning, the
+# test runner turns it on
+QUERY_BUDGET_RAISE = False
+
+TEST_RUNNER = 'utilities.test_runner.TestRunner'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'utilities.instrumentation': {
+            'handlers': ['console'],
+            # INFO logs every request, the test runner only WARNING
+            'level': 'INFO',
+        },
+    },
+}
@@ -14,8 +14,26 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from job.views import JobViewSet
+from review.views import ReviewViewSet
+from timeslot.views import TimeSlotViewSet
+from utilities.metrics import metrics_view
+from utilities.profiling import profile_detail, profile_list
+
+router = DefaultRouter()
+router.register('jobs', JobViewSet, basename='job')
+router.register('timeslots', TimeSlotViewSet, basename='timeslot')
+router.register('reviews', ReviewViewSet, basename='review')
 
 urlpatterns = [
+    path('admin/profiles/', admin.site.admin_view(profile_list),
+         name='admin-profiles'),
+    path('admin/profiles/<name>/', admin.site.admin_view(profile_detail),
+         name='admin-profile'),
     path('admin/', admin.site.urls),
+    path('api/', include(router.urls)),
+    path('metrics', metrics_view, name='metrics'),
 ]
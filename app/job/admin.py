@@ -9,6 +9,7 @@ class JobAdmin(admin.ModelAdmin):
         'type', 'duration', 'job_status',
         'payment_status'
     ]
+    list_select_related = ['creator', 'executor']
 
     class meta:
         model = Job
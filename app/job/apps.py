@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class JobConfig(AppConfig):
     name = 'job'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from utilities import checks, metrics  # noqa: F401
+        metrics.remove_dead()
@@ -1 +1,32 @@
-RECESS_HOUR = 1
\ No newline at end of file
+RECESS_HOUR = 1
+
+# exclusion constraints guarding an executor's schedule
+DURATION_EXCLUSION = 'job_job_executor_duration_excl'
+RECESS_EXCLUSION = 'job_job_executor_recess_excl'
+
+# payment statuses
+PAYMENT_PENDING = 'pending'
+PAYMENT_PAID = 'paid'
+
+# job statuses, and the statuses each one can be reached from
+JOB_INCOMPLETE = 'incomplete'
+JOB_IN_PROGRESS = 'in_progress'
+JOB_COMPLETE = 'complete'
+JOB_CANCELLED = 'cancelled'
+JOB_STATUSES = [
+    (JOB_INCOMPLETE, 'Incomplete'),
+    (JOB_IN_PROGRESS, 'In progress'),
+    (JOB_COMPLETE, 'Complete'),
+    (JOB_CANCELLED, 'Cancelled'),
+]
+JOB_TRANSITIONS = {
+    JOB_IN_PROGRESS: {JOB_INCOMPLETE},
+    JOB_COMPLETE: {JOB_IN_PROGRESS},
+    JOB_CANCELLED: {JOB_INCOMPLETE, JOB_IN_PROGRESS},
+}
+# who can move a job to each status, staff can move any job
+JOB_TRANSITION_ROLES = {
+    JOB_IN_PROGRESS: {'executor'},
+    JOB_COMPLETE: {'executor'},
+    JOB_CANCELLED: {'creator', 'executor'},
+}
@@ -0,0 +1,58 @@
+""" Streaming job exports in NDJSON or CSV """
+import csv
+import io
+import itertools
+import json
+
+# the exported columns, fetched with values_list
+COLUMNS = [
+    ('id', 'id'),
+    ('creator', 'creator__email'),
+    ('executor', 'executor__email'),
+    ('type', 'type'),
+    ('start', 'duration__startswith'),
+    ('end', 'duration__endswith'),
+    ('price', 'price'),
+    ('job_status', 'job_status'),
+    ('payment_status', 'payment_status'),
+]
+HEADER = [name for name, _ in COLUMNS]
+
+
+def _text(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if value is None:
+        return None
+    return value if isinstance(value, (int, str)) else str(value)
+
+
+def export_rows(queryset, chunk_size=2000):
+    """ the rows of the jobs, fetched chunk_size at a time through a
+    server side cursor so memory use does not grow with the export"""
+    return queryset.values_list(*[lookup for _, lookup in COLUMNS]) \
+        .order_by('duration__startswith', 'id') \
+        .iterator(chunk_size=chunk_size)
+
+
+def ndjson_lines(rows):
+    """ a JSON object per row"""
+    for row in rows:
+        yield json.dumps(dict(zip(HEADER, map(_text, row)))) + '\n'
+
+
+def csv_lines(rows):
+    """ a CSV header line, then a line per row"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in itertools.chain([HEADER], rows):
+        writer.writerow([_text(value) for value in row])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+FORMATS = {
+    'ndjson': (ndjson_lines, 'application/x-ndjson'),
+    'csv': (csv_lines, 'text/csv'),
+}
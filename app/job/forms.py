@@ -0,0 +1,28 @@
+from django import forms
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .export import FORMATS
+
+
+class IsoDateTimeField(forms.DateTimeField):
+    """ a date time field accepting ISO 8601 values with an offset"""
+
+    def to_python(self, value):
+        if isinstance(value, str):
+            parsed = parse_datetime(value.strip())
+            if parsed is not None:
+                if timezone.is_naive(parsed):
+                    parsed = timezone.make_aware(parsed)
+                return parsed
+        return super().to_python(value)
+
+
+class JobExportForm(forms.Form):
+    """ the filters of a job export"""
+    export_format = forms.ChoiceField(choices=[(f, f) for f in FORMATS],
+                                      required=False)
+    start = IsoDateTimeField(required=False)
+    end = IsoDateTimeField(required=False)
+    job_status = forms.CharField(max_length=20, required=False)
+    payment_status = forms.CharField(max_length=20, required=False)
@@ -0,0 +1,89 @@
+import math
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from timeslot.models import TimeSlot
+from utilities import benchmark
+from utilities.db.pool import close_pools, stats
+
+ENGINES = {
+    'per request': 'django.db.backends.postgresql',
+    'pooled': 'utilities.db.pooled',
+}
+
+
+def availability_read(alias):
+    """ a cheap availability read followed by the end of the request,
+    which closes the connection or gives it back to the pool"""
+    def operation(argument):
+        list(TimeSlot.objects.using(alias).filter(creator_id=argument)[:10])
+        connections[alias].close()
+    return operation
+
+
+def measure_concurrent(operation, requests, threads):
+    """ calls operation requests times from threads at once, returns
+    the mean and 95th percentile wall time of a call in milliseconds"""
+    def call(argument):
+        started = time.perf_counter()
+        operation(argument)
+        return (time.perf_counter() - started) * 1000
+
+    with ThreadPoolExecutor(threads) as executor:
+        timings = sorted(executor.map(call, range(requests)))
+    return {
+        'ms': round(statistics.mean(timings), 3),
+        'p95_ms': round(timings[math.ceil(0.95 * len(timings)) - 1], 3),
+    }
+
+
+def run(requests, threads=8):
+    """ measures the availability read through a new connection per
+    request and through the pool, against the default database, one
+    request at a time and from concurrent threads"""
+    results = {}
+    for name, engine in ENGINES.items():
+        alias = f"benchmark-{name.replace(' ', '-')}"
+        connections.databases[alias] = dict(
+            connections.databases['default'], ENGINE=engine)
+        try:
+            results[name] = benchmark.measure(availability_read(alias),
+                                              range(requests))
+            results[name]['concurrent'] = measure_concurrent(
+                availability_read(alias), requests, threads)
+            if engine == ENGINES['pooled']:
+                results[name]['pool'] = stats()[
+                    (alias, connections[alias].settings_dict['NAME'])]
+        finally:
+            connections[alias].close()
+            close_pools(alias=alias)
+            delattr(connections._connections, alias)
+            del connections.databases[alias]
+    return results
+
+
+class Command(BaseCommand):
+    help = ('Compares the latency of availability reads through a new '
+            'connection per request and through the connection pool')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--threads', type=int, default=8)
+
+    def handle(self, *args, **options):
+        results = run(options['requests'], options['threads'])
+        for name, result in results.items():
+            concurrent = result['concurrent']
+            self.stdout.write(f"{name:<12} {result['ms']:>8.3f} ms "
+                              f"p95 {result['p95_ms']:>8.3f} ms, "
+                              f"{options['threads']} threads "
+                              f"{concurrent['ms']:>8.3f} ms "
+                              f"p95 {concurrent['p95_ms']:>8.3f} ms")
+        self.stdout.write(f"pool {results['pooled']['pool']}")
+        self.stdout.write(
+            f"{results['per request']['ms'] / results['pooled']['ms']:.1f}x "
+            f"faster pooled")
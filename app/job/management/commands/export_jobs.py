@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from job.export import FORMATS, export_rows
+from job.forms import JobExportForm
+from job.models import Job
+
+
+class Command(BaseCommand):
+    help = ('Streams the jobs with their price and statuses as NDJSON or '
+            'CSV, in constant memory')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', dest='export_format',
+                            choices=sorted(FORMATS), default='ndjson')
+        parser.add_argument('--start', help='jobs starting from, ISO 8601')
+        parser.add_argument('--end', help='jobs starting before, ISO 8601')
+        parser.add_argument('--job-status')
+        parser.add_argument('--payment-status')
+        parser.add_argument('--output', help='defaults to stdout')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        form = JobExportForm({
+            name: options[name] for name in JobExportForm.base_fields
+            if options[name] is not None})
+        if not form.is_valid():
+            raise CommandError(form.errors.as_text())
+        filters = dict(form.cleaned_data)
+        lines, _ = FORMATS[filters.pop('export_format')]
+        rows = export_rows(Job.objects.for_export(**filters),
+                           chunk_size=options['chunk_size'])
+
+        if options['output']:
+            with open(options['output'], 'w', newline='') as stream:
+                stream.writelines(lines(rows))
+        else:
+            for line in lines(rows):
+                self.stdout.write(line, ending='')
@@ -0,0 +1,61 @@
+import datetime
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, connection, transaction
+from django.utils.timezone import make_aware
+
+from review.models import ExecutorRating, Leaderboard
+from utilities import dataset
+from utilities.cache import availability_cache
+
+
+class Command(BaseCommand):
+    help = ('Loads a synthetic data set of users, time slots, jobs and '
+            'reviews with COPY, e.g for benchmarks and EXPLAIN checks')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--timeslots', type=int, default=100000)
+        parser.add_argument('--jobs', type=int, default=100000,
+                            help='at most, slots only take the jobs '
+                                 'fitting in them')
+        parser.add_argument('--reviews', type=int, default=50000,
+                            help='at most, only complete jobs are reviewed')
+        parser.add_argument('--executor-share', type=float, default=0.2,
+                            help='the share of the users offering slots')
+        parser.add_argument('--start', default='2019-01-01',
+                            help='the day before the first slots')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--prefix', default='gen',
+                            help='prefix of the user emails')
+        parser.add_argument('--batch-size', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        try:
+            start = make_aware(datetime.datetime.strptime(options['start'],
+                                                          '%Y-%m-%d'))
+        except ValueError:
+            raise CommandError('start must be a YYYY-MM-DD date')
+        if options['users'] < 2:
+            raise CommandError('at least 2 users, an executor and a creator')
+
+        began = time.perf_counter()
+        try:
+            with transaction.atomic():
+                counts = dataset.generate(
+                    options['users'], options['timeslots'], options['jobs'],
+                    options['reviews'], start, options['executor_share'],
+                    options['seed'], options['prefix'],
+                    options['batch_size'])
+                ExecutorRating.objects.backfill()
+        except IntegrityError as error:
+            raise CommandError(f'{error}, use another --prefix')
+        Leaderboard.objects.refresh(concurrently=False)
+        availability_cache.cache.clear()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        for name, count in counts.items():
+            self.stdout.write(f'{count:>10} {name}')
+        self.stdout.write(f'generated in {time.perf_counter() - began:.1f} s')
@@ -0,0 +1,123 @@
+import os
+import random
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from psycopg2.extras import DateTimeTZRange
+
+from job.models import Job
+from review.models import Review
+from timeslot.models import TimeSlot
+from utilities import benchmark, factories
+from utilities.time import timeslot_continuity_check
+
+BASELINE = os.path.join(settings.BASE_DIR, 'benchmarks', 'baseline.json')
+
+
+def build_cases(creator, executors, per_executor, repeat, seed=1):
+    """ the benchmark cases as (name, operation, arguments) tuples.
+    Every operation targets a different free part of the synthetic
+    schedules, see utilities.factories"""
+    rnd = random.Random(seed)
+
+    def targets(slots):
+        return rnd.sample([(e, k) for e in executors for k in slots],
+                          min(repeat, len(executors) * len(slots)))
+
+    # odd slots are free, the gaps follow each slot
+    odd = range(1, per_executor, 2)
+    bookings = [(e, DateTimeTZRange(factories.slot_period(k).lower,
+                                    factories.slot_period(k).lower
+                                    + factories.JOB_LENGTH))
+                for e, k in targets(odd)]
+    gaps = [(e, DateTimeTZRange(factories.slot_period(k).upper,
+                                factories.slot_period(k + 1).lower))
+            for e, k in targets(range(per_executor - 1))]
+    windows = [(e, DateTimeTZRange(factories.slot_period(k).lower,
+                                   factories.slot_period(k + 9).upper))
+               for e, k in targets(range(max(1, per_executor - 9)))]
+    jobs = list(Job.objects.filter(creator=creator).order_by('?')[:repeat])
+
+    return [
+        ('JobManager.create',
+         lambda a: Job.objects.create(creator, a[0], 10, a[1]),
+         bookings),
+        ('TimeSlotManager.create',
+         lambda a: TimeSlot.objects.create(a[0], a[1]),
+         gaps),
+        ('timeslot_continuity_check',
+         lambda a: timeslot_continuity_check(TimeSlot.objects.filter(
+             creator=a[0], period__overlap=a[1])),
+         windows),
+        ('ReviewManager.create',
+         lambda job: Review.objects.create(creator, job.executor, job, 4),
+         jobs),
+    ]
+
+
+def run(size, repeat, seed=1):
+    """ measures the cases against size slots, the data set being
+    rolled back afterwards"""
+    results = {}
+    with transaction.atomic():
+        creator_id, executor_ids, per_executor = \
+            factories.create_schedules(size)
+        User = get_user_model()
+        creator = User.objects.get(pk=creator_id)
+        executors = list(User.objects.filter(pk__in=executor_ids))
+        for name, operation, arguments in build_cases(
+                creator, executors, per_executor, repeat, seed):
+            # each case starts from the same data set
+            with transaction.atomic():
+                results[name] = benchmark.measure(operation, arguments)
+                transaction.set_rollback(True)
+        transaction.set_rollback(True)
+    return results
+
+
+class Command(BaseCommand):
+    help = ('Measures the scheduling hot paths against synthetic data sets '
+            'in a throwaway database, flags regressions against a baseline')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,10000',
+                            help='comma separated slot counts, e.g '
+                                 '10,10000,1000000')
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--baseline', default=BASELINE)
+        parser.add_argument('--tolerance', type=float, default=0.5,
+                            help='allowed wall time increase, 0.5 is 50%%')
+        parser.add_argument('--update-baseline', action='store_true')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        test_db = connection.creation.create_test_db(verbosity=0)
+        try:
+            results = {}
+            for size in sizes:
+                results[str(size)] = run(size, options['repeat'],
+                                         options['seed'])
+                for name, result in results[str(size)].items():
+                    self.stdout.write(
+                        f"{size:>8} {name:<28} {result['ms']:>9.3f} ms "
+                        f"p95 {result['p95_ms']:>9.3f} ms "
+                        f"{result['queries']:>6} queries")
+        finally:
+            connection.creation.destroy_test_db(test_db, verbosity=0)
+
+        baseline = benchmark.load(options['baseline'])
+        if options['update_baseline']:
+            baseline.update(results)
+            benchmark.save(options['baseline'], baseline)
+            self.stdout.write(f"baseline written to {options['baseline']}")
+            return
+        found = benchmark.regressions(results, baseline,
+                                      options['tolerance'])
+        for size, name, reason in found:
+            self.stderr.write(f'regression {size} {name}: {reason}')
+        if found:
+            raise CommandError(f'{len(found)} regressions')
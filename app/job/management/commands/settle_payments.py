@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from job.models import Settlement
+from job.serializers import SettlementRequestSerializer
+
+
+class Command(BaseCommand):
+    help = ('Pays the pending jobs selected by executor, start date range '
+            'or ids in a single update, reporting the totals per executor')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--executor', dest='executors', action='append',
+                            default=[], help='executor email, repeatable')
+        parser.add_argument('--start', help='jobs starting from, ISO 8601')
+        parser.add_argument('--end', help='jobs starting before, ISO 8601')
+        parser.add_argument('--ids', help='comma separated job ids')
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects
+        executors = dict(users.filter(
+            email__in=options['executors']).values_list('pk', 'email'))
+        unknown = set(options['executors']) - set(executors.values())
+        if unknown:
+            raise CommandError(f'Unknown executors {sorted(unknown)}')
+        data = {'executors': list(executors)}
+        for name in ['start', 'end']:
+            if options[name]:
+                data[name] = options[name]
+        if options['ids']:
+            data['ids'] = options['ids'].split(',')
+        selection = SettlementRequestSerializer(data=data)
+        if not selection.is_valid():
+            raise CommandError(selection.errors)
+
+        settlement = Settlement.objects.settle(**selection.validated_data)
+
+        executors.update(users.filter(
+            pk__in=[int(pk) for pk in settlement.executor_totals]
+        ).values_list('pk', 'email'))
+        for executor_id, (count, total) in \
+                settlement.executor_totals.items():
+            self.stdout.write(f'{executors[int(executor_id)]}: '
+                              f'{count} jobs, {total}')
+        self.stdout.write(f'settlement {settlement.pk}: '
+                          f'{settlement.job_count} jobs paid, '
+                          f'{settlement.total} in total')
@@ -0,0 +1,37 @@
+from django.contrib.postgres.fields import DateTimeRangeField
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job', '0007_auto_20190928_1052'),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.AlterField(
+            model_name='job',
+            name='duration',
+            field=DateTimeRangeField(),
+        ),
+        # no two jobs of an executor may overlap
+        migrations.RunSQL(
+            sql="ALTER TABLE job_job "
+                "ADD CONSTRAINT job_job_executor_duration_excl "
+                "EXCLUDE USING gist (executor_id WITH =, duration WITH &&)",
+            reverse_sql="ALTER TABLE job_job "
+                        "DROP CONSTRAINT job_job_executor_duration_excl",
+        ),
+        # no job of an executor may start in another one's recess,
+        # nor end less than a recess before the next one
+        migrations.RunSQL(
+            sql="ALTER TABLE job_job "
+                "ADD CONSTRAINT job_job_executor_recess_excl "
+                "EXCLUDE USING gist (executor_id WITH =, "
+                "tstzrange(lower(duration), upper(recess)) WITH &&)",
+            reverse_sql="ALTER TABLE job_job "
+                        "DROP CONSTRAINT job_job_executor_recess_excl",
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job', '0008_executor_exclusion_constraints'),
+    ]
+
+    # the keysets of the job list, see job.views
+    operations = [
+        migrations.RunSQL(
+            sql="CREATE INDEX job_job_lower_duration_id "
+                "ON job_job (lower(duration), id)",
+            reverse_sql="DROP INDEX job_job_lower_duration_id",
+        ),
+        migrations.RunSQL(
+            sql="CREATE INDEX job_job_executor_lower_duration_id "
+                "ON job_job (executor_id, lower(duration), id)",
+            reverse_sql="DROP INDEX job_job_executor_lower_duration_id",
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job', '0010_settlement'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='job',
+            name='job_status',
+            field=models.CharField(choices=[('incomplete', 'Incomplete'), ('in_progress', 'In progress'), ('complete', 'Complete'), ('cancelled', 'Cancelled')], default='incomplete', max_length=20),
+        ),
+        # cancelled jobs no longer hold their executor schedule
+        migrations.RunSQL(
+            sql=["ALTER TABLE job_job "
+                 "DROP CONSTRAINT job_job_executor_duration_excl",
+                 "ALTER TABLE job_job "
+                 "ADD CONSTRAINT job_job_executor_duration_excl "
+                 "EXCLUDE USING gist (executor_id WITH =, duration WITH &&) "
+                 "WHERE (job_status <> 'cancelled')"],
+            reverse_sql=["ALTER TABLE job_job "
+                         "DROP CONSTRAINT job_job_executor_duration_excl",
+                         "ALTER TABLE job_job "
+                         "ADD CONSTRAINT job_job_executor_duration_excl "
+                         "EXCLUDE USING gist (executor_id WITH =, "
+                         "duration WITH &&)"],
+        ),
+        migrations.RunSQL(
+            sql=["ALTER TABLE job_job "
+                 "DROP CONSTRAINT job_job_executor_recess_excl",
+                 "ALTER TABLE job_job "
+                 "ADD CONSTRAINT job_job_executor_recess_excl "
+                 "EXCLUDE USING gist (executor_id WITH =, "
+                 "tstzrange(lower(duration), upper(recess)) WITH &&) "
+                 "WHERE (job_status <> 'cancelled')"],
+            reverse_sql=["ALTER TABLE job_job "
+                         "DROP CONSTRAINT job_job_executor_recess_excl",
+                         "ALTER TABLE job_job "
+                         "ADD CONSTRAINT job_job_executor_recess_excl "
+                         "EXCLUDE USING gist (executor_id WITH =, "
+                         "tstzrange(lower(duration), upper(recess)) WITH &&)"],
+        ),
+    ]
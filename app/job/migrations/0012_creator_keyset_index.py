@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job', '0011_job_status_transitions'),
+    ]
+
+    # the job list of a user, next to the executor index of 0009
+    operations = [
+        migrations.RunSQL(
+            sql="CREATE INDEX job_job_creator_lower_duration_id "
+                "ON job_job (creator_id, lower(duration), id)",
+            reverse_sql="DROP INDEX job_job_creator_lower_duration_id",
+        ),
+    ]
@@ -1,92 +1,494 @@
+import collections
 import datetime
+import itertools
 
 from django.contrib.auth import get_user_model
-from django.contrib.postgres.fields import DateTimeRangeField
-from django.db import models
+from django.contrib.postgres.fields import DateTimeRangeField, JSONField
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import (
+    IntegrityError, connections, models, router, transaction
+)
+from django.db.models import signals
 
-from utilities.time import timeslot_continuity_check
+from timeslot.models import AvailabilityTemplate, TimeSlot, expand_templates
+from utilities import feasibility, intervals
+from utilities.cache import availability_cache
 from utilities.Exceptions.job import *
 from utilities.Exceptions.timeslot import *
-from .constants import RECESS_HOUR
+from utilities.instrumentation import query_budget
+from utilities.metrics import timed
+from utilities.routers import replica_lag_timeout
+from .constants import (
+    DURATION_EXCLUSION, JOB_CANCELLED, JOB_INCOMPLETE, JOB_STATUSES,
+    JOB_TRANSITIONS,
+    PAYMENT_PAID, PAYMENT_PENDING, RECESS_EXCLUSION, RECESS_HOUR
+)
+from . import sql
 
 from psycopg2.extras import DateTimeTZRange
 
 
+BulkJobResult = collections.namedtuple('BulkJobResult', ['job', 'error'])
+TransitionResult = collections.namedtuple('TransitionResult',
+                                          ['updated', 'conflicts', 'missing'])
+
+# rejections that availability templates may resolve
+SLOT_REASONS = [
+    feasibility.NO_TIMESLOTS,
+    feasibility.NOT_CONTINUOUS,
+    feasibility.NO_MATCH,
+]
+
+
+# the user fields shown next to a job or a review
+USER_SUMMARY_FIELDS = ['email', 'first_name', 'last_name']
+
+
+class JobQuerySet(models.QuerySet):
+
+    def scheduled(self):
+        """ the jobs holding their executor schedule, i.e not
+        cancelled"""
+        return self.exclude(job_status=JOB_CANCELLED)
+
+    def for_listing(self):
+        """ the jobs with their creator and executor joined in, loading
+        only the user fields of a listing"""
+        return self.select_related('creator', 'executor').only(
+            *[f.name for f in self.model._meta.concrete_fields],
+            *[f'{user}__{field}' for user in ('creator', 'executor')
+              for field in USER_SUMMARY_FIELDS])
+
+    def for_export(self, start=None, end=None, job_status=None,
+                   payment_status=None):
+        """ the jobs starting in start-end with the given statuses,
+        every filter being optional"""
+        queryset = self
+        if start is not None:
+            queryset = queryset.filter(duration__startswith__gte=start)
+        if end is not None:
+            queryset = queryset.filter(duration__startswith__lt=end)
+        if job_status:
+            queryset = queryset.filter(job_status=job_status)
+        if payment_status:
+            queryset = queryset.filter(payment_status=payment_status)
+        return queryset
+
+
 class JobManager(models.Manager):
 
+    def _book(self, job, using):
+        """ validates and inserts a job in a single round trip,
+        returns the verdict row of the booking statement"""
+        connection = connections[using]
+        fields = [f for f in self.model._meta.concrete_fields
+                  if not f.primary_key]
+        params = {
+            'duration': job.duration,
+            'recess': job.recess,
+            'executor_id': job.executor_id,
+            'cancelled': JOB_CANCELLED,
+        }
+        for field in fields:
+            params[field.attname] = field.get_db_prep_save(
+                field.pre_save(job, True), connection=connection)
+        statement = sql.BOOK_JOB.format(
+            columns=', '.join(connection.ops.quote_name(f.column)
+                              for f in fields),
+            values=', '.join(f'%({f.attname})s' for f in fields),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(statement, params)
+            return cursor.fetchone()
+
+    def _booking_error(self, reason, executor, duration):
+        """ the error for a rejected booking, given a reason code of
+        utilities.feasibility. The querysets are lazy, they are only
+        evaluated if the caller inspects the error"""
+        jobs_qs = self.model.objects.scheduled().filter(
+            executor=executor, duration__overlap=duration)
+        timeslot_qs = TimeSlot.objects.filter(creator=executor,
+                                              period__overlap=duration)
+        if reason == feasibility.INVALID_DURATION:
+            return ValueError(
+                "The End time should be greater than the Start time")
+        if reason == feasibility.ON_RECESS:
+            return JobOnRecessError(jobs_qs, duration,
+                                    "You cannot create a job on "
+                                    "Executor's recess time")
+        if reason == feasibility.OVERLAP:
+            return JobOverlapError(jobs_qs, duration,
+                                   "Executor has a job that overlaps "
+                                   "this duration")
+        if reason == feasibility.NO_TIMESLOTS:
+            return TimeSlotsNotFound(0,
+                                     "Executor has no time slots available")
+        if reason == feasibility.NOT_CONTINUOUS:
+            return TimeSlotsNotContinuousError(
+                timeslot_qs, "Executor has timeslots that is not continuous")
+        return TimeSlotsJobMatchError(
+            timeslot_qs,
+            "Executor has no time slots that matches the requested job")
+
     def _create_new_job(self, creator, executor,
                         price, duration, **extra_fields):
         """helper to create a new job model"""
         if creator == executor:
             raise ValueError("You cannot assign a job to yourself")
         if duration.lower >= duration.upper:
-            raise ValueError(
-                "The End time should be greater than the Start time")
+            raise self._booking_error(feasibility.INVALID_DURATION,
+                                      executor, duration)
+
+        job = self.model(
+            creator=creator,
+            executor=executor,
+            price=price,
+            duration=duration,
+            **extra_fields
+        )
+        job.recess = self.model.recess_for(duration)
+        using = self._db or router.db_for_write(self.model)
+        reason, has_templates = self._try_booking(job, using)
+        if reason in SLOT_REASONS and has_templates:
+            # the slots of the availability templates are only
+            # created for a booking, they are rolled back with it
+            with transaction.atomic(using=using):
+                if TimeSlot.objects.db_manager(using).materialize(
+                        executor, duration):
+                    reason, _ = self._try_booking(job, using)
+                if reason is not None:
+                    raise self._booking_error(reason, executor, duration)
+        if reason is not None:
+            raise self._booking_error(reason, executor, duration)
+        return job
+
+    def _try_booking(self, job, using):
+        """ runs the booking statement, sets the job id when it is
+        booked. Returns the reason code of a rejection, None if the
+        job was booked, and whether the executor has templates"""
+        try:
+            with transaction.mark_for_rollback_on_error(using):
+                verdict = self._book(job, using)
+        except IntegrityError as e:
+            # a concurrent booking won the race for this executor
+            reason = self._constraint_reason(e)
+            if reason is None:
+                raise
+            raise self._booking_error(reason, job.executor, job.duration)
+        (on_recess, overlaps, has_slots, has_templates, overlap_count,
+         covered, continuous, job_id) = verdict
+
+        if job_id is not None:
+            job.pk = job_id
+            job._state.adding = False
+            job._state.db = using
+            # the row is inserted by the booking statement, receivers
+            # get the signal a save would have sent
+            signals.post_save.send(sender=self.model, instance=job,
+                                   created=True, update_fields=None,
+                                   raw=False, using=using)
+            return None, has_templates
+
+        if on_recess:
+            reason = feasibility.ON_RECESS
+        elif overlaps:
+            reason = feasibility.OVERLAP
+        elif not has_slots and not has_templates:
+            reason = feasibility.NO_TIMESLOTS
+        elif overlap_count > 1 and not continuous:
+            reason = feasibility.NOT_CONTINUOUS
+        else:
+            reason = feasibility.NO_MATCH
+        return reason, has_templates
+
+    @staticmethod
+    def _constraint_reason(error):
+        """ the reason code for an exclusion constraint violation,
+        None for any other integrity error"""
+        constraint = getattr(getattr(error.__cause__, 'diag', None),
+                             'constraint_name', None)
+        return {
+            DURATION_EXCLUSION: feasibility.OVERLAP,
+            RECESS_EXCLUSION: feasibility.ON_RECESS,
+        }.get(constraint)
 
-        #check if executor has existing job
-        jobs_qs = self.model.objects.filter(duration__overlap=duration)
-        recess_qs = self.model.objects.filter(recess__overlap=duration)
-
-        if recess_qs:
-            raise JobOnRecessError(jobs_qs,
-                                  duration,
-                                  "You cannot create a job on Executor's recess time")
-
-        if jobs_qs.exists():
-            raise JobOverlapError(jobs_qs,
-                                  duration,
-                                  "Executor has a job that overlaps this duration")
-
-        # Check if executor has a time slot in the range of start and end
-        time_slots = executor.timesheet.all()
-        time_slots_count = time_slots.count()
-
-        if extra_fields.get('type', None) == 'test':
-            print(executor.timesheet.filter(period__contains=duration))
-            print(duration)
-            print(executor.timesheet.all())
-
-        if time_slots_count == 0:
-            raise TimeSlotsNotFound(time_slots_count,
-                                    "Executor has no time slots available")
-
-        timeslot_qs = executor.timesheet.filter(period__overlap=duration)
-        if timeslot_qs.count() == 1:
-            timeslot_qs_c = executor.timesheet.filter(period__contains=duration)
-            if timeslot_qs_c.exists():
-                job = self.model(
-                    creator=creator,
-                    executor=executor,
-                    price=price,
-                    duration=duration,
-                    **extra_fields
-                )
-                job.save(using=self._db)
-                return job
+    def timeslot_check(self, executor, duration, slots=None):
+        """ checks in memory that the executor time slots can hold
+        the duration, raises the same errors as create.
+        slots is an IntervalSet of the executor time slots, when not
+        given the slots and template occurrences around the duration
+        are loaded"""
+        if slots is None:
+            slots = TimeSlot.objects.interval_set(executor, window=duration)
+            if not len(slots) and not executor.timesheet.exists():
+                slots = None
+
+        if slots is None or not len(slots):
+            reason = feasibility.NO_TIMESLOTS
+        else:
+            overlapping = slots.overlapping(duration.lower, duration.upper)
+            if len(overlapping) > 1 and \
+                    not slots.is_continuous(duration.lower, duration.upper):
+                reason = feasibility.NOT_CONTINUOUS
+            elif overlapping and \
+                    slots.covers(duration.lower, duration.upper):
+                return overlapping
             else:
-                raise TimeSlotsJobMatchError(timeslot_qs,
-                                             "Executor has no time slots that matches the "
-                                             "requested job")
-        elif timeslot_qs.count() > 1:
-            continuity_check = timeslot_continuity_check(timeslot_qs)
-            if continuity_check:
-                job = self.model(
-                    creator=creator,
-                    executor=executor,
-                    price=price,
-                    duration=duration,
-                    **extra_fields
-                )
-                job.save(using=self._db)
-                return job
+                reason = feasibility.NO_MATCH
+        raise self._booking_error(reason, executor, duration)
+
+    def _schedules(self, executor_ids, durations):
+        """ loads the slots, template occurrences and jobs of the
+        executors around the durations, returns (periods, jobs,
+        has_slots) per executor id"""
+        if not durations:
+            return {pk: ([], [], True) for pk in executor_ids}
+        recess = datetime.timedelta(hours=RECESS_HOUR)
+        window = DateTimeTZRange(min(d.lower for d in durations) - recess,
+                                 max(d.upper for d in durations) + recess)
+        schedules = {pk: ([], [], True) for pk in executor_ids}
+
+        slots = TimeSlot.objects.filter(
+            creator_id__in=schedules, period__overlap=window
+        ).values_list('creator_id', 'period')
+        for creator_id, period in slots:
+            schedules[creator_id][0].append(period)
+        jobs = self.scheduled().filter(
+            executor_id__in=schedules, duration__overlap=window
+        ).values_list('executor_id', 'duration', 'recess')
+        for executor_id, duration, job_recess in jobs:
+            schedules[executor_id][1].append((duration, job_recess))
+
+        # template occurrences count as slots of the executor
+        templates = collections.defaultdict(list)
+        for template in AvailabilityTemplate.objects.filter(
+                creator_id__in=schedules).valid_in(window):
+            templates[template.creator_id].append(template)
+        for pk, executor_templates in templates.items():
+            periods = sorted(schedules[pk][0], key=lambda p: p.lower)
+            periods += expand_templates(executor_templates, window,
+                                        exclude=periods)
+            schedules[pk] = (periods, schedules[pk][1], True)
+
+        # executors without slots around the durations may have none
+        missing = [pk for pk, (periods, _, _) in schedules.items()
+                   if not periods and pk not in templates]
+        if missing:
+            with_slots = set(TimeSlot.objects.filter(
+                creator_id__in=missing
+            ).values_list('creator_id', flat=True).distinct())
+            for pk in missing:
+                periods, executor_jobs, _ = schedules[pk]
+                schedules[pk] = (periods, executor_jobs, pk in with_slots)
+        return schedules
+
+    @staticmethod
+    def _reasons(schedule, durations):
+        """ reason codes for durations against an executor schedule"""
+        periods, jobs, has_slots = schedule
+        return feasibility.batch_feasibility(
+            feasibility.ranges_to_epoch(periods),
+            feasibility.ranges_to_epoch(d for d, _ in jobs),
+            feasibility.ranges_to_epoch(r for _, r in jobs),
+            feasibility.to_epoch(d.lower for d in durations),
+            feasibility.to_epoch(d.upper for d in durations),
+            datetime.timedelta(hours=RECESS_HOUR) // feasibility.MICROSECOND,
+            has_slots=has_slots,
+        )
+
+    def feasibility(self, executor, durations):
+        """ checks many candidate durations for an executor at once.
+        Loads the executor slots, templates and jobs around the
+        candidates, returns
+        a boolean feasibility vector and the reason codes of
+        utilities.feasibility"""
+        durations = list(durations)
+        schedule = self._schedules([executor.pk], durations)[executor.pk]
+        reasons = self._reasons(schedule, durations)
+        return reasons == feasibility.FEASIBLE, reasons
+
+    def free_windows(self, executor, horizon, min_length=None):
+        """ the windows of the horizon in which the executor can take
+        any job, sorted DTrange objects. min_length is a timedelta,
+        shorter windows are left out. Results are cached per executor,
+        see utilities.cache"""
+        key = f'free:{horizon.lower.timestamp()}:' \
+            f'{horizon.upper.timestamp()}:' \
+            f'{min_length.total_seconds() if min_length else 0}'
+        return availability_cache.get_or_set(
+            executor.pk, key,
+            lambda: self._free_windows(executor, horizon, min_length),
+            timeout=replica_lag_timeout(self.model, DEFAULT_TIMEOUT))
+
+    def _free_windows(self, executor, horizon, min_length):
+        """ the slot and template blocks minus the jobs, their recess
+        and the recess a new job needs before each job"""
+        periods, jobs, _ = self._schedules([executor.pk],
+                                           [horizon])[executor.pk]
+        recess = datetime.timedelta(hours=RECESS_HOUR)
+        blocks = intervals.merge(sorted(
+            (max(p.lower, horizon.lower), min(p.upper, horizon.upper))
+            for p in periods
+            if p.lower < horizon.upper and p.upper > horizon.lower))
+        busy = sorted(
+            (duration.lower - recess, recess_range.upper or duration.upper)
+            for duration, recess_range in jobs)
+        windows = [DateTimeTZRange(lower, upper)
+                   for lower, upper in intervals.subtract(blocks, busy)]
+        if min_length is not None:
+            windows = [w for w in windows if w.upper - w.lower >= min_length]
+        return windows
+
+    def _bulk_insert(self, jobs, results, batch_size, using):
+        """ inserts the (row index, job) pairs. When a concurrent
+        booking violates the exclusion constraints, the jobs are
+        inserted one by one in savepoints and the conflicting rows get
+        the error create would have raised. Returns the inserted
+        pairs"""
+        try:
+            with transaction.atomic(using=using):
+                self.using(using).bulk_create(
+                    [job for _, job in jobs], batch_size=batch_size)
+            return jobs
+        except IntegrityError as e:
+            if self._constraint_reason(e) is None:
+                raise
+        inserted = []
+        for i, job in jobs:
+            try:
+                with transaction.atomic(using=using):
+                    self.using(using).bulk_create([job])
+            except IntegrityError as e:
+                reason = self._constraint_reason(e)
+                if reason is None:
+                    raise
+                results[i] = BulkJobResult(None, self._booking_error(
+                    reason, job.executor, job.duration))
             else:
-                raise TimeSlotsNotContinuousError(timeslot_qs,
-                                             "Executor has timeslots that is not continuous")
-        else:
-            raise TimeSlotsJobMatchError(timeslot_qs,
-                                         "Executor has no time slots that matches the "
-                                         "requested job")
+                inserted.append((i, job))
+        return inserted
+
+    def bulk_create_jobs(self, rows, batch_size=1000):
+        """ validates and creates many jobs with a few set based
+        queries. rows are dicts of the create arguments, returns a
+        BulkJobResult per row holding either the job or the error
+        create would have raised"""
+        rows = list(rows)
+        results = [None] * len(rows)
+        pending = collections.defaultdict(list)
+        for i, row in enumerate(rows):
+            duration = row['duration']
+            if row['creator'] == row['executor']:
+                error = ValueError("You cannot assign a job to yourself")
+                results[i] = BulkJobResult(None, error)
+            elif duration.lower >= duration.upper:
+                error = self._booking_error(feasibility.INVALID_DURATION,
+                                            row['executor'], duration)
+                results[i] = BulkJobResult(None, error)
+            else:
+                pending[row['executor'].pk].append(i)
+        if not pending:
+            return results
+
+        schedules = self._schedules(
+            pending, [rows[i]['duration'] for i in itertools.chain(
+                *pending.values())])
+        recess = datetime.timedelta(hours=RECESS_HOUR)
+        jobs = []
+        for executor_id, indexes in pending.items():
+            durations = [rows[i]['duration'] for i in indexes]
+            reasons = self._reasons(schedules[executor_id], durations)
+
+            # the rows of an executor are booked in start order, a row
+            # conflicting with an earlier accepted row of the batch
+            # is rejected like a conflict with an existing job
+            last = None
+            for reason, i in sorted(
+                    zip(reasons, indexes),
+                    key=lambda r: rows[r[1]]['duration'].lower):
+                row = dict(rows[i])
+                duration = row['duration']
+                if reason == feasibility.FEASIBLE and last is not None:
+                    if duration.lower < last.upper:
+                        reason = feasibility.OVERLAP
+                    elif duration.lower < last.upper + recess:
+                        reason = feasibility.ON_RECESS
+                if reason != feasibility.FEASIBLE:
+                    error = self._booking_error(reason, row['executor'],
+                                                duration)
+                    results[i] = BulkJobResult(None, error)
+                    continue
+                job = self.model(**row)
+                job.recess = self.model.recess_for(duration)
+                jobs.append((i, job))
+                results[i] = BulkJobResult(job, None)
+                last = duration
+
+        # the template occurrences the jobs were checked against become
+        # slots, like in create, over the window of each executor
+        windows = {}
+        for _, job in jobs:
+            window = windows.get(job.executor_id, job.duration)
+            windows[job.executor_id] = DateTimeTZRange(
+                min(window.lower, job.duration.lower),
+                max(window.upper, job.duration.upper))
+        using = self._db or router.db_for_write(self.model)
+        with transaction.atomic(using=using, savepoint=False):
+            TimeSlot.objects.db_manager(using).materialize_many(windows)
+            jobs = self._bulk_insert(jobs, results, batch_size, using)
+        availability_cache.invalidate(*{job.executor_id for _, job in jobs},
+                                      using=using)
+        return results
+
+    @staticmethod
+    def _check_transition(current, target):
+        if current not in JOB_TRANSITIONS.get(target, ()):
+            raise JobStatusError(current, target,
+                                 f"A job cannot go from {current} to "
+                                 f"{target}")
+
+    def transition(self, job, target, expected=None):
+        """ moves a job to the target status, if it still has the
+        expected status, by default the status it was read with. A
+        single compare and set UPDATE, raises JobStatusConflictError
+        when the status changed in between"""
+        if expected is None:
+            expected = job.job_status
+        self._check_transition(expected, target)
+        using = self._db or router.db_for_write(self.model)
+        updated = self.using(using).filter(
+            pk=job.pk, job_status=expected).update(job_status=target)
+        if not updated:
+            raise JobStatusConflictError(job, expected,
+                                         "The job status was changed "
+                                         "by another update")
+        job.job_status = target
+        if target == JOB_CANCELLED:
+            availability_cache.invalidate(job.executor_id, using=using)
+        return job
 
+    def bulk_transition(self, ids, target, expected):
+        """ moves the jobs that have the expected status to the target
+        status in a single UPDATE. Returns the number of updated jobs,
+        of conflicts, the jobs that did not have the expected status,
+        and of missing ids, which match no job"""
+        self._check_transition(expected, target)
+        ids = set(ids)
+        using = self._db or router.db_for_write(self.model)
+        existing = self.using(using).filter(pk__in=ids).count()
+        jobs = self.using(using).filter(pk__in=ids, job_status=expected)
+        if target == JOB_CANCELLED:
+            # the freed schedules are only known before the update
+            executor_ids = set(jobs.values_list('executor_id', flat=True))
+        updated = jobs.update(job_status=target)
+        if target == JOB_CANCELLED:
+            availability_cache.invalidate(*executor_ids, using=using)
+        return TransitionResult(updated, max(0, existing - updated),
+                                len(ids) - existing)
+
+    # one statement, more when availability templates are materialized
+    @timed('JobManager.create')
+    @query_budget(7)
     def create(self, creator, executor,
                price, duration, **extra_fields):
         """ creates a new job"""
@@ -105,22 +507,103 @@ class Job(models.Model):
                                  on_delete=models.CASCADE)
     price = models.DecimalField(max_digits=5, decimal_places=2)
     type = models.CharField(max_length=20)
-    duration = DateTimeRangeField(unique=True)
+    duration = DateTimeRangeField()
     recess = DateTimeRangeField(blank=True)
     comment = models.TextField(null=True, blank=True)
-    job_status = models.CharField(max_length=20, default="incomplete")
-    payment_status = models.CharField(max_length=20, default="pending")
+    job_status = models.CharField(max_length=20, choices=JOB_STATUSES,
+                                  default=JOB_INCOMPLETE)
+    payment_status = models.CharField(max_length=20, default=PAYMENT_PENDING)
+    settlement = models.ForeignKey('Settlement', related_name='jobs',
+                                   null=True, blank=True,
+                                   on_delete=models.SET_NULL)
 
-    objects = JobManager()
+    objects = JobManager.from_queryset(JobQuerySet)()
 
-    def save(self, *args, **kwargs):
+    @staticmethod
+    def recess_for(duration):
+        """ the recess window that follows a job duration"""
+        recess_lower = duration.upper
+        recess_upper = duration.upper + datetime.timedelta(hours=RECESS_HOUR)
+        return DateTimeTZRange(recess_lower, recess_upper)
 
-        recess_lower = self.duration.upper
-        recess_upper = self.duration.upper + datetime.timedelta(hours=RECESS_HOUR)
-        recess_range = DateTimeTZRange(recess_lower, recess_upper)
-        self.recess = recess_range
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        # the recess only follows the duration
+        if update_fields is None or 'duration' in update_fields:
+            self.recess = self.recess_for(self.duration)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'recess'}
 
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f'Job for {self.creator} @ {self.duration}'
+
+
+class SettlementManager(models.Manager):
+
+    def settle(self, executors=(), start=None, end=None, ids=(),
+               settled_by=None):
+        """ pays the pending jobs of the executors, starting in
+        start-end or with the given ids, at least one of them being
+        given. The jobs are updated in a single statement and the batch
+        is recorded as a settlement, which is returned"""
+        conditions = []
+        params = {'paid': PAYMENT_PAID, 'pending': PAYMENT_PENDING}
+        if executors:
+            conditions.append('executor_id = ANY(%(executor_ids)s)')
+            params['executor_ids'] = [getattr(e, 'pk', e) for e in executors]
+        if start is not None:
+            conditions.append('lower(duration) >= %(start)s')
+            params['start'] = start
+        if end is not None:
+            conditions.append('lower(duration) < %(end)s')
+            params['end'] = end
+        if ids:
+            conditions.append('id = ANY(%(ids)s)')
+            params['ids'] = list(ids)
+        if not conditions:
+            raise ValueError("Select the jobs to settle by executor, "
+                             "date range or ids")
+
+        using = self._db or router.db_for_write(self.model)
+        with transaction.atomic(using=using):
+            settlement = self.model(settled_by=settled_by, filters={
+                'executors': params.get('executor_ids', []),
+                'start': start.isoformat() if start else None,
+                'end': end.isoformat() if end else None,
+                'ids': params.get('ids', []),
+            })
+            settlement.save(using=using)
+            params['settlement_id'] = settlement.pk
+            with connections[using].cursor() as cursor:
+                cursor.execute(sql.SETTLE_JOBS.format(
+                    conditions=' AND '.join(conditions)), params)
+                totals = cursor.fetchall()
+            settlement.job_count = sum(count for _, count, _ in totals)
+            settlement.total = sum(total for _, _, total in totals)
+            settlement.executor_totals = {
+                str(executor_id): [count, str(total)]
+                for executor_id, count, total in totals}
+            settlement.save(using=using, update_fields=[
+                'job_count', 'total', 'executor_totals'])
+        return settlement
+
+
+class Settlement(models.Model):
+    """ A batch of jobs paid at once, the audit of a settle run"""
+    created_at = models.DateTimeField(auto_now_add=True)
+    settled_by = models.ForeignKey(get_user_model(),
+                                   related_name='settlements',
+                                   null=True, blank=True,
+                                   on_delete=models.SET_NULL)
+    filters = JSONField(default=dict)
+    job_count = models.PositiveIntegerField(default=0)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # executor id => [job count, price sum]
+    executor_totals = JSONField(default=dict)
+
+    objects = SettlementManager()
+
+    def __str__(self):
+        return f'Settlement of {self.job_count} jobs @ {self.created_at}'
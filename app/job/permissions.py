@@ -0,0 +1,20 @@
+from rest_framework import permissions
+
+from .constants import JOB_TRANSITION_ROLES
+
+
+class CanTransitionJob(permissions.BasePermission):
+    """ the executor moves a job forward, the creator and the
+    executor can cancel it, see JOB_TRANSITION_ROLES"""
+    message = "You cannot move this job to this status"
+
+    def has_object_permission(self, request, view, obj):
+        user = request.user
+        if user.is_staff:
+            return True
+        roles = {role for role, pk in (('creator', obj.creator_id),
+                                       ('executor', obj.executor_id))
+                 if pk == user.pk}
+        allowed = JOB_TRANSITION_ROLES.get(request.data.get('job_status'),
+                                           ())
+        return bool(roles & set(allowed))
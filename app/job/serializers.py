@@ -0,0 +1,64 @@
+from rest_framework import serializers
+
+from user.serializers import UserSummarySerializer
+from utilities.Exceptions.job import JobError
+from utilities.Exceptions.timeslot import TimeSlotError
+from utilities.fields import DateTimeRangeField
+from .constants import JOB_STATUSES, JOB_TRANSITIONS
+from .models import Job, Settlement
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """ expects the users to be joined in, see JobQuerySet.for_listing"""
+    duration = DateTimeRangeField()
+    recess = DateTimeRangeField(read_only=True)
+    creator_detail = UserSummarySerializer(source='creator', read_only=True)
+    executor_detail = UserSummarySerializer(source='executor',
+                                            read_only=True)
+
+    class Meta:
+        model = Job
+        fields = ['id', 'creator', 'executor', 'creator_detail',
+                  'executor_detail', 'price', 'type', 'duration',
+                  'recess', 'comment', 'job_status', 'payment_status']
+        read_only_fields = ['creator', 'job_status', 'payment_status']
+
+    def create(self, validated_data):
+        """ books the job for the requesting user"""
+        validated_data['creator'] = self.context['request'].user
+        try:
+            return Job.objects.create(**validated_data)
+        except (JobError, TimeSlotError, ValueError) as e:
+            raise serializers.ValidationError({'duration': [str(e)]})
+
+
+class SettlementRequestSerializer(serializers.Serializer):
+    """ the selection of the jobs to settle"""
+    executors = serializers.ListField(child=serializers.IntegerField(),
+                                      required=False)
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+    ids = serializers.ListField(child=serializers.IntegerField(),
+                                required=False)
+
+    def validate(self, data):
+        if not any(data.get(name) for name in self.fields):
+            raise serializers.ValidationError(
+                "Select the jobs to settle by executor, date range or ids")
+        return data
+
+
+class SettlementSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = Settlement
+        fields = ['id', 'created_at', 'settled_by', 'filters', 'job_count',
+                  'total', 'executor_totals']
+        read_only_fields = fields
+
+
+class TransitionSerializer(serializers.Serializer):
+    job_status = serializers.ChoiceField(choices=sorted(JOB_TRANSITIONS))
+    # the status the client read, the job status by default
+    expected_status = serializers.ChoiceField(
+        choices=[status for status, _ in JOB_STATUSES], required=False)
@@ -0,0 +1,18 @@
+""" Keeps the availability cache in line with the booking rows """
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from timeslot.models import AvailabilityTemplate, TimeSlot
+from utilities.cache import availability_cache
+from .models import Job
+
+
+@receiver([post_save, post_delete], sender=Job)
+def invalidate_executor(sender, instance, using, **kwargs):
+    availability_cache.invalidate(instance.executor_id, using=using)
+
+
+@receiver([post_save, post_delete], sender=TimeSlot)
+@receiver([post_save, post_delete], sender=AvailabilityTemplate)
+def invalidate_creator(sender, instance, using, **kwargs):
+    availability_cache.invalidate(instance.creator_id, using=using)
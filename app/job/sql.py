@@ -0,0 +1,74 @@
+""" Raw SQL used by the job manager """
+
+# Validates and books a job in a single statement.
+# The verdict row carries everything the manager needs to raise the
+# matching exception, ``job_id`` is only set when the insert happened.
+# Job and slot lookups are scoped to the executor, so they are served
+# by the GiST indexes behind the exclusion constraints. Cancelled jobs
+# do not hold the schedule, like in the constraints.
+BOOK_JOB = """
+WITH new_job AS (
+    SELECT %(duration)s::tstzrange AS duration,
+           %(recess)s::tstzrange AS recess
+), executor_jobs AS (
+    SELECT j.duration, j.recess
+    FROM job_job j
+    WHERE j.executor_id = %(executor_id)s
+      AND j.job_status <> %(cancelled)s
+), overlapping_slots AS (
+    SELECT t.period,
+           lag(upper(t.period)) OVER (ORDER BY lower(t.period)) AS prev_upper
+    FROM timeslot_timeslot t, new_job n
+    WHERE t.creator_id = %(executor_id)s
+      AND t.period && n.duration
+), verdict AS (
+    SELECT
+        EXISTS(SELECT 1 FROM executor_jobs j, new_job n
+               WHERE j.recess && n.duration
+                  OR (j.duration && n.recess
+                      AND NOT j.duration && n.duration)) AS on_recess,
+        EXISTS(SELECT 1 FROM executor_jobs j, new_job n
+               WHERE j.duration && n.duration) AS overlaps,
+        EXISTS(SELECT 1 FROM timeslot_timeslot t
+               WHERE t.creator_id = %(executor_id)s) AS has_slots,
+        EXISTS(SELECT 1 FROM timeslot_availabilitytemplate a
+               WHERE a.creator_id = %(executor_id)s) AS has_templates,
+        (SELECT count(*) FROM overlapping_slots) AS overlap_count,
+        COALESCE((SELECT min(lower(o.period)) <= lower(n.duration)
+                         AND max(upper(o.period)) >= upper(n.duration)
+                  FROM overlapping_slots o, new_job n
+                  GROUP BY n.duration), false) AS covered,
+        COALESCE((SELECT bool_and(o.prev_upper IS NULL
+                                  OR o.prev_upper = lower(o.period))
+                  FROM overlapping_slots o), false) AS continuous
+), inserted AS (
+    INSERT INTO job_job ({columns})
+    SELECT {values}
+    FROM verdict v
+    WHERE NOT v.on_recess
+      AND NOT v.overlaps
+      AND v.covered
+      AND (v.overlap_count = 1 OR v.continuous)
+    RETURNING id
+)
+SELECT v.on_recess, v.overlaps, v.has_slots, v.has_templates,
+       v.overlap_count, v.covered, v.continuous, (SELECT id FROM inserted)
+FROM verdict v
+"""
+
+# Marks the selected pending jobs as paid by a settlement and returns
+# the totals per executor, in a single statement.
+# ``conditions`` are the selection filters joined with AND.
+SETTLE_JOBS = """
+WITH settled AS (
+    UPDATE job_job
+    SET payment_status = %(paid)s, settlement_id = %(settlement_id)s
+    WHERE payment_status = %(pending)s
+      AND {conditions}
+    RETURNING executor_id, price
+)
+SELECT s.executor_id, count(*), sum(s.price)
+FROM settled s
+GROUP BY s.executor_id
+ORDER BY s.executor_id
+"""
@@ -0,0 +1,161 @@
+import datetime
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from job.models import Job, Settlement
+
+from utilities import samples
+
+
+class JobApiTests(TestCase):
+
+    def setUp(self):
+        self.creator = samples.sample_user()
+        self.executor = samples.sample_user(email='tito123@pluto.com')
+        self.client = APIClient()
+        self.client.force_authenticate(self.creator)
+
+    def test_create_job(self):
+        """ To check that a job is booked for the requesting user"""
+        samples.sample_timeslot(self.executor)  # 12-16
+
+        response = self.client.post('/api/jobs/', {
+            'executor': self.executor.pk,
+            'price': '30.05',
+            'type': 'turnover',
+            'duration': {'lower': '2019-12-27T13:00:00Z',
+                         'upper': '2019-12-27T15:00:00Z'},
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        job = Job.objects.get()
+        self.assertEqual(job.creator, self.creator)
+        self.assertEqual(response.data['recess']['lower'],
+                         '2019-12-27T15:00:00Z')
+
+    def test_create_job_rejected(self):
+        """ To check that a booking error is a validation error"""
+        response = self.client.post('/api/jobs/', {
+            'executor': self.executor.pk,
+            'price': '30.05',
+            'type': 'turnover',
+            'duration': {'lower': '2019-12-27T13:00:00Z',
+                         'upper': '2019-12-27T15:00:00Z'},
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('duration', response.data)
+        self.assertFalse(Job.objects.exists())
+
+    def test_list_jobs_keyset_pages(self):
+        """ To check that the job list pages by start time and id
+        without an offset
+        """
+        samples.sample_timeslot(self.executor, period=samples.sample_duration(
+            start=datetime.datetime(2019, 12, 27, 0, 0), delta=24))
+        jobs = [
+            Job.objects.create(self.creator, self.executor, 30.05,
+                               samples.sample_duration(
+                                   start=datetime.datetime(
+                                       2019, 12, 27, hour, 0), delta=1),
+                               type='turnover')
+            for hour in [14, 0, 8, 4, 18]
+        ]
+        # jobs of other users are not listed
+        other = samples.sample_user(email='other@pluto.com')
+        Job.objects.create(other, self.executor, 30.05,
+                           samples.sample_duration(delta=1))
+
+        ids = []
+        url = '/api/jobs/?page_size=2'
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(queries), 1)
+            self.assertNotIn('OFFSET', queries[0]['sql'])
+            ids += [job['id'] for job in response.data['results']]
+            url = response.data['next']
+
+        self.assertEqual(ids, [job.pk for job in sorted(
+            jobs, key=lambda job: job.duration.lower)])
+
+    def test_list_jobs_invalid_cursor(self):
+        response = self.client.get('/api/jobs/?cursor=nope')
+        self.assertEqual(response.status_code, 404)
+
+    def test_list_jobs_invalid_executor(self):
+        response = self.client.get('/api/jobs/?executor=abc')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('executor', response.data)
+
+    def test_list_jobs_query_count(self):
+        """ To check that listing jobs costs a single query whatever
+        the page size"""
+        samples.sample_timeslot(self.executor, period=samples.sample_duration(
+            start=datetime.datetime(2019, 12, 27, 0, 0), delta=24))
+        for hour in range(0, 24, 2):
+            Job.objects.create(self.creator, self.executor, 30.05,
+                               samples.sample_duration(start=datetime.datetime(
+                                   2019, 12, 27, hour, 0), delta=1))
+
+        for page_size in [1, 5, 12]:
+            with self.assertNumQueries(1):
+                response = self.client.get(f'/api/jobs/?page_size={page_size}')
+            self.assertEqual(len(response.data['results']), page_size)
+        self.assertEqual(response.data['results'][0]['executor_detail'],
+                         {'id': self.executor.pk, 'email': 'tito123@pluto.com',
+                          'first_name': '', 'last_name': ''})
+
+    def test_settle_jobs(self):
+        """ To check that staff members settle jobs by ids"""
+        samples.sample_timeslot(self.executor)  # 12-16
+        job = Job.objects.create(self.creator, self.executor, 30.05,
+                                 samples.sample_duration(delta=1))
+        self.assertEqual(self.client.post('/api/jobs/settle/', {
+            'ids': [job.pk]}, format='json').status_code, 403)
+
+        self.creator.is_staff = True
+        self.creator.save()
+        self.assertEqual(self.client.post('/api/jobs/settle/', {},
+                                          format='json').status_code, 400)
+        response = self.client.post('/api/jobs/settle/', {'ids': [job.pk]},
+                                    format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['total'], '30.05')
+        self.assertEqual(Settlement.objects.get().settled_by, self.creator)
+        job.refresh_from_db()
+        self.assertEqual(job.payment_status, 'paid')
+
+    def test_job_status_transition(self):
+        """ To check the transition endpoint, its conflict answer and
+        who can move a job
+        e.g ==> the executor starts the job, the creator cancels it
+        """
+        samples.sample_timeslot(self.executor)  # 12-16
+        job = Job.objects.create(self.creator, self.executor, 30.05,
+                                 samples.sample_duration(delta=1))
+        url = f'/api/jobs/{job.pk}/transition/'
+        executor_client = APIClient()
+        executor_client.force_authenticate(self.executor)
+
+        def post(client, job_status, **data):
+            return client.post(url, dict(data, job_status=job_status),
+                               format='json')
+
+        self.assertEqual(post(self.client, 'in_progress').status_code, 403)
+        response = post(executor_client, 'in_progress',
+                        expected_status='incomplete')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['job_status'], 'in_progress')
+        self.assertEqual(post(executor_client, 'in_progress').status_code,
+                         400)
+        # the client read the job before it started
+        self.assertEqual(post(self.client, 'cancelled',
+                              expected_status='incomplete').status_code, 409)
+        self.assertEqual(post(self.client, 'cancelled',
+                              expected_status='in_progress').status_code, 200)
@@ -0,0 +1,62 @@
+import datetime
+import io
+import json
+
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from job.models import Job
+
+from utilities import samples
+
+
+class JobExportTests(TestCase):
+
+    def setUp(self):
+        self.creator = samples.sample_user()
+        self.executor = samples.sample_user(email='tito123@pluto.com')
+        samples.sample_timeslot(self.executor, period=samples.sample_duration(
+            start=datetime.datetime(2019, 12, 27, 0, 0), delta=24))
+        for hour in [8, 2, 14]:
+            Job.objects.create(self.creator, self.executor, 30.05,
+                               samples.sample_duration(start=datetime.datetime(
+                                   2019, 12, 27, hour, 0), delta=1),
+                               type='turnover')
+        Job.objects.filter(duration__startswith__hour=14).update(
+            job_status='complete')
+
+    def test_export_jobs_command(self):
+        """ To check that the export streams the filtered jobs as CSV
+        in start order"""
+        out = io.StringIO()
+        call_command('export_jobs', '--format', 'csv', '--chunk-size', '1',
+                     '--start', '2019-12-27T04:00:00+00:00',
+                     '--job-status', 'incomplete', stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], 'id,creator,executor,type,start,end,'
+                                   'price,job_status,payment_status')
+        self.assertEqual(lines[1].split(',')[2:], [
+            'tito123@pluto.com', 'turnover', '2019-12-27T08:00:00+00:00',
+            '2019-12-27T09:00:00+00:00', '30.05', 'incomplete', 'pending'])
+        self.assertEqual(len(lines), 2)
+
+    def test_export_jobs_endpoint(self):
+        """ To check that staff members stream every job as NDJSON"""
+        client = APIClient()
+        client.force_authenticate(self.creator)
+        self.assertEqual(client.get('/api/jobs/export/').status_code, 403)
+
+        self.creator.is_staff = True
+        self.creator.save()
+        response = client.get('/api/jobs/export/?job_status=complete')
+
+        self.assertTrue(response.streaming)
+        rows = [json.loads(line) for line in
+                b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([(row['start'], row['job_status']) for row in rows],
+                         [('2019-12-27T14:00:00+00:00', 'complete')])
+        self.assertEqual(
+            client.get('/api/jobs/export/?export_format=xml').status_code,
+            400)
@@ -1,19 +1,29 @@
 import datetime
+import io
+from unittest import mock
 
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
 from django.test import TestCase
 from django.utils.timezone import make_aware
 
 from psycopg2.extras import DateTimeTZRange
 
-from job.models import Job
+from job.models import Job, Settlement
+from timeslot.models import AvailabilityTemplate, TimeSlot
 
-from utilities import samples
+from utilities import feasibility, samples
+from utilities.cache import availability_cache
 from utilities.Exceptions.job import *
 from utilities.Exceptions.timeslot import *
 
 
 class JobModelTests(TestCase):
 
+    def setUp(self):
+        availability_cache.cache.clear()
+        availability_cache.reset_stats()
+
     # Job Tests
 
     def test_executor_with_job_in_range_cannot_create(self):
@@ -92,6 +102,74 @@ class JobModelTests(TestCase):
         with self.assertRaises(JobOnRecessError):
             Job.objects.create(**job_kwargs)
 
+    def test_executor_cannot_create_job_ending_in_recess(self):
+        """ To check that a new job cannot end less than a recess
+        before an existing job of the executor
+        e.g ==> Existing job: 12-16
+                New job request: 9-11:30 (recess 11:30-12:30)
+        """
+        creator = samples.sample_user()
+        executor = samples.sample_user(email='tito123@pluto.com')
+        samples.sample_timeslot(executor,
+                                datetime.datetime(2019, 12, 27, 8, 0),
+                                datetime.datetime(2019, 12, 27, 12, 0))
+        samples.sample_job(creator, executor)
+
+        job_start = make_aware(datetime.datetime(2019, 12, 27, 9, 0))
+        job_end = job_start + datetime.timedelta(hours=2, minutes=30)
+        job_kwargs = dict(
+            creator=creator,
+            executor=executor,
+            duration=DateTimeTZRange(job_start, job_end),
+            type='turnover',
+            price=30.05,
+        )
+        with self.assertRaises(JobOnRecessError):
+            Job.objects.create(**job_kwargs)
+
+    def test_jobs_of_different_executors_can_overlap(self):
+        """ To check that job overlaps are only checked against
+        the jobs of the same executor
+        """
+        creator = samples.sample_user()
+        executor1 = samples.sample_user(email='tito123@pluto.com')
+        executor2 = samples.sample_user(email='tim@pluto.com')
+        samples.sample_job(creator, executor1)
+
+        samples.sample_timeslot(executor2, period=samples.sample_duration())
+        job = Job.objects.create(
+            creator=creator,
+            executor=executor2,
+            duration=samples.sample_duration(),
+            type='turnover',
+            price=30.05,
+        )
+
+        self.assertEqual(job.executor, executor2)
+        self.assertEqual(Job.objects.all().count(), 2)
+
+    def test_database_rejects_overlapping_jobs(self):
+        """ To check that the exclusion constraints reject
+        overlapping jobs that bypass the manager checks
+        """
+        creator = samples.sample_user()
+        executor = samples.sample_user(email='tito123@pluto.com')
+        existing = samples.sample_job(creator, executor)
+
+        # overlaps the existing duration
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                Job(creator=creator, executor=executor, price=30.05,
+                    duration=samples.sample_duration(delta=2)).save()
+
+        # starts in the existing recess
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                Job(creator=creator, executor=executor, price=30.05,
+                    duration=DateTimeTZRange(
+                        existing.recess.lower,
+                        existing.recess.upper)).save()
+
     # Timeslot Tests
     def test_executor_with_no_timeslot_cannot_create_job(self):
         """ To check that the executor of job has a
@@ -283,7 +361,7 @@ class JobModelTests(TestCase):
         timeslot_period3 = DateTimeTZRange(timeslot_start3, timeslot_end3)
 
         job_start = make_aware(datetime.datetime(2019, 12, 27, 14, 0))
-        job_end = job_start + datetime.timedelta(hours=18)  # 18
+        job_end = job_start + datetime.timedelta(hours=4)  # 18
         job_duration = DateTimeTZRange(job_start, job_end)
 
         # create  timeslots for the executor
@@ -387,3 +465,507 @@ class JobModelTests(TestCase):
         )
         with self.assertRaises(TimeSlotsNotContinuousError):
             Job.objects.create(**job_kwargs)
+
+    # Query count tests
+    def test_create_job_single_query(self):
+        """ To check that booking a job validates and inserts
+        in a single round trip
+        """
+        creator = samples.sample_user()
+        executor = samples.sample_user(email='tito123@pluto.com')
+        samples.sample_timeslot(executor, period=samples.sample_duration())
+
+        job_kwargs = dict(
+            creator=creator,
+            executor=executor,
+            duration=samples.sample_duration(delta=3),
+            type='turnover',
+            price=30.05,
+        )
+        with self.assertNumQueries(1):
+            job = Job.objects.create(**job_kwargs)
+
+        self.assertIsNotNone(job.pk)
+        self.assertEqual(job.recess.lower, job.duration.upper)
+        self.assertEqual(Job.objects.get(pk=job.pk).recess, job.recess)
+
+    def test_rejected_job_single_query(self):
+        """ To check that a rejected booking costs a single
+        round trip and does not insert anything
+        """
+        creator = samples.sample_user()
+        executor = samples.sample_user(email='tito123@pluto.com')
+        samples.sample_job(creator, executor)
+
+        job_kwargs = dict(
+            creator=creator,
+            executor=executor,
+            duration=samples.sample_duration(delta=2),
+            type='turnover',
+            price=30.05,
+        )
+        with self.assertNumQueries(1):
+            with self.assertRaises(JobOverlapError):
+                Job.objects.create(**job_kwargs)
+        self.assertEqual(Job.objects.all().count(), 1)
+
+    def test_timeslot_check_matches_create(self):
+        """ To check that the in memory timeslot check raises
+        the same errors as the booking statement and the feasibility
+        vector, continuous slots must also cover the whole duration
+        e.g ==> 11-12, 13-15 and 15-18
+        """
+        creator = samples.sample_user()
+        executor = samples.sample_user(email='tito123@pluto.com')
+        for start, end in [(11, 12), (13, 15), (15, 18)]:
+            samples.sample_timeslot(executor,
+                                    datetime.datetime(2019, 12, 27, start, 0),
+                                    datetime.datetime(2019, 12, 27, end, 0))
+        slots = TimeSlot.objects.interval_set(executor)
+
+        cases = [
+            ((11, 17), TimeSlotsNotContinuousError),
+            ((9, 10), TimeSlotsJobMatchError),
+            ((11, 13), TimeSlotsJobMatchError),
+            # continuous slots not covering the start or the end
+            ((12, 16), TimeSlotsJobMatchError),
+            ((14, 19), TimeSlotsJobMatchError),
+        ]
+        for (start, end), error in cases:
+            duration = DateTimeTZRange(
+                make_aware(datetime.datetime(2019, 12, 27, start, 0)),
+                make_aware(datetime.datetime(2019, 12, 27, end, 0)))
+            with self.assertRaises(error):
+                Job.objects.timeslot_check(executor, duration, slots)
+            with self.assertRaises(error):
+                Job.objects.create(creator, executor, 30.05, duration)
+            _, reasons = Job.objects.feasibility(executor, [duration])
+            self.assertIs(feasibility.REASONS[reasons[0]], error)
+
+        duration = DateTimeTZRange(
+            make_aware(datetime.datetime(2019, 12, 27, 14, 0)),
+            make_aware(datetime.datetime(2019, 12, 27, 17, 0)))
+        with self.assertNumQueries(0):
+            covering = Job.objects.timeslot_check(executor, duration, slots)
+        self.assertEqual(len(covering), 2)
+        with self.assertRaises(TimeSlotsNotFound):
+            Job.objects.timeslot_check(creator, duration)
+
+    def test_batch_feasibility_matches_create(self):
+        """ To check that the batch feasibility check gives the
+        same verdict as create for many candidate durations
+        e.g ==> timeslots 8-11, 12-16 and 16-20, job 16-18
+        """
+        creator = samples.sample_user()
+        executor = samples.sample_user(email='tito123@pluto.com')
+        for start, end in [(8, 11), (12, 16), (16, 20)]:
+            samples.sample_timeslot(executor,
+                                    datetime.datetime(2019, 12, 27, start, 0),
+                                    datetime.datetime(2019, 12, 27, end, 0))
+        Job.objects.create(creator, executor, 30.05, samples.sample_duration(
+            start=datetime.datetime(2019, 12, 27, 16, 0), delta=2))
+
+        base = make_aware(datetime.datetime(2019, 12, 27, 7, 0))
+        candidates = [
+            DateTimeTZRange(base + datetime.timedelta(minutes=start),
+                            base + datetime.timedelta(minutes=start + length))
+            for start in range(0, 14 * 60, 30)
+            for length in (-30, 60, 150, 240)
+        ]
+        with self.assertNumQueries(3):
+            feasible, reasons = Job.objects.feasibility(executor, candidates)
+
+        for duration, ok, reason in zip(candidates, feasible, reasons):
+            try:
+                with transaction.atomic():
+                    Job.objects.create(creator, executor, 30.05, duration)
+                    transaction.set_rollback(True)
+                expected = feasibility.FEASIBLE
+            except Exception as error:
+                expected = next(code for code, exc
+                                in feasibility.REASONS.items()
+                                if type(error) is exc)
+            self.assertEqual(reason, expected, duration)
+            self.assertEqual(ok, expected == feasibility.FEASIBLE)
+        self.assertIn(feasibility.ON_RECESS, reasons)
+        self.assertIn(feasibility.NOT_CONTINUOUS, reasons)
+
+        feasible, reasons = Job.objects.feasibility(creator, candidates[:3])
+        self.assertFalse(feasible.any())
+        self.assertEqual(list(reasons), [feasibility.INVALID_DURATION,
+                                         feasibility.NO_TIMESLOTS,
+                                         feasibility.NO_TIMESLOTS])
+
+        with self.assertNumQueries(0):
+            feasible, reasons = Job.objects.feasibility(executor, [])
+        self.assertEqual((len(feasible), len(reasons)), (0, 0))
+
+    # Bulk creation tests
+    def test_bulk_create_jobs(self):
+        """ To check that a batch of jobs is validated against the
+        existing jobs, the timeslots and the batch itself
+        e.g ==> timeslot 8-20, existing job 12-14
+        """
+        creator = samples.sample_user()
+        executor = samples.sample_user(email='tito123@pluto.com')
+        idle = samples.sample_user(email='tim@pluto.com')
+        samples.sample_timeslot(executor,
+                                datetime.datetime(2019, 12, 27, 8, 0),
+                                datetime.datetime(2019, 12, 27, 20, 0))
+        Job.objects.create(creator, executor, 30.05,
+                           samples.sample_duration(delta=2))
+
+        def row(start, end, executor=executor):
+            return dict(creator=creator, executor=executor, price=30.05,
+                        type='turnover', duration=DateTimeTZRange(
+                            make_aware(datetime.datetime(2019, 12, 27,
+                                                         *start)),
+                            make_aware(datetime.datetime(2019, 12, 27,
+                                                         *end))))
+
+        rows = [
+            row((17, 0), (18, 0)),
+            row((8, 0), (10, 0)),
+            row((12, 30), (13, 30)),  # overlaps the existing job
+            row((17, 30), (19, 0)),  # overlaps the batch
+            row((18, 30), (19, 30)),  # in the recess of the batch
+            row((10, 30), (11, 0)),  # starts in the recess of the 8-10 row
+            row((9, 0), (10, 0), executor=idle),
+            row((9, 0), (10, 0), executor=creator),
+        ]
+        with self.assertNumQueries(8):
+            results = Job.objects.bulk_create_jobs(rows)
+
+        errors = [type(error) if error else None for _, error in results]
+        self.assertEqual(errors, [
+            None, None, JobOverlapError, JobOverlapError, JobOnRecessError,
+            JobOnRecessError, TimeSlotsNotFound, ValueError,
+        ])
+        self.assertEqual(Job.objects.all().count(), 3)
+        job = Job.objects.get(pk=results[0].job.pk)
+        self.assertEqual(job.recess, Job.recess_for(job.duration))
+
+    def test_bulk_create_jobs_materializes_template_slots(self):
+        """ To check that a batch booked on an availability template
+        creates the slots its jobs use, like create, with a fixed
+        number of queries
+        e.g ==> template: fridays 8-12 and 14-18
+                Jobs: friday 2019-12-27 8-9, 10-11, 14-15 and 16-17
+        """
+        creator = samples.sample_user()
+        executor = samples.sample_user(email='tito123@pluto.com')
+        for start, end in [(8, 12), (14, 18)]:
+            AvailabilityTemplate.objects.create(
+                creator=executor, weekday=4,
+                start_time=datetime.time(start), end_time=datetime.time(end),
+                valid_from=datetime.date(2019, 12, 1))
+
+        with self.assertNumQueries(9):
+            results = Job.objects.bulk_create_jobs([
+                dict(creator=creator, executor=executor, price=30.05,
+                     duration=samples.sample_duration(
+                         start=datetime.datetime(2019, 12, 27, hour, 0),
+                         delta=1))
+                for hour in (8, 10, 14, 16)])
+
+        self.assertEqual([error for _, error in results], [None] * 4)
+        self.assertEqual(
+            list(TimeSlot.objects.filter(creator=executor).order_by(
+                'period').values_list('period', flat=True)),
+            [samples.sample_duration(
+                start=datetime.datetime(2019, 12, 27, start, 0), delta=4)
+             for start in (8, 14)])
+
+    def test_bulk_create_jobs_concurrent_booking(self):
+        """ To check that a job booked between the checks and the insert
+        of a batch only rejects the rows it conflicts with
+        e.g ==> timeslot 8-20, batch 9-10 and 14-15
+                concurrent job: 9-10
+        """
+        creator = samples.sample_user()
+        executor = samples.sample_user(email='tito123@pluto.com')
+        samples.sample_timeslot(executor,
+                                datetime.datetime(2019, 12, 27, 8, 0),
+                                datetime.datetime(2019, 12, 27, 20, 0))
+
+        def durations(*hours):
+            return [samples.sample_duration(
+                start=datetime.datetime(2019, 12, 27, hour, 0), delta=1)
+                for hour in hours]
+
+        schedules = Job.objects._schedules
+
+        def concurrent(*args):
+            loaded = schedules(*args)
+            Job.objects.create(creator, executor, 10, durations(9)[0])
+            return loaded
+
+        with mock.patch.object(Job.objects, '_schedules', concurrent):
+            results = Job.objects.bulk_create_jobs([
+                dict(creator=creator, executor=executor, price=30.05,
+                     duration=duration) for duration in durations(9, 14)])
+
+        self.assertIsInstance(results[0].error, JobOverlapError)
+        self.assertIsNone(results[1].error)
+        self.assertEqual(
+            sorted(str(price) for price in
+                   Job.objects.values_list('price', flat=True)),
+            ['10.00', '30.05'])
+
+    # Availability template tests
+    def test_create_job_materializes_template_slots(self):
+        """ To check that a job can be booked on an availability
+        template, creating the slots it needs
+        e.g ==> template: fridays 12-16 and 16-20
+                Job: friday 2019-12-27 14-18
+        """
+        creator = samples.sample_user()
+        executor = samples.sample_user(email='tito123@pluto.com')
+        for start, end in [(12, 16), (16, 20)]:
+            AvailabilityTemplate.objects.create(
+                creator=executor, weekday=4, comment='weekly',
+                start_time=datetime.time(start), end_time=datetime.time(end),
+                valid_from=datetime.date(2019, 12, 1))
+
+        job = Job.objects.create(creator, executor, 30.05, DateTimeTZRange(
+            make_aware(datetime.datetime(2019, 12, 27, 14, 0)),
+            make_aware(datetime.datetime(2019, 12, 27, 18, 0))))
+
+        self.assertIsNotNone(job.pk)
+        slot = TimeSlot.objects.get(creator=executor)
+        self.assertEqual(slot.period, samples.sample_duration(delta=8))
+        self.assertEqual(slot.comment, 'weekly')
+
+    def test_rejected_job_does_not_materialize_template_slots(self):
+        """ To check that a job rejected on an availability template
+        leaves no slots behind
+        e.g ==> template: fridays 12-16
+                Job: friday 2019-12-27 15-17
+        """
+        creator = samples.sample_user()
+        executor = samples.sample_user(email='tito123@pluto.com')
+        AvailabilityTemplate.objects.create(
+            creator=executor, weekday=4,
+            start_time=datetime.time(12), end_time=datetime.time(16),
+            valid_from=datetime.date(2019, 12, 1))
+        duration = samples.sample_duration(
+            start=datetime.datetime(2019, 12, 27, 15, 0), delta=2)
+
+        with self.assertRaises(TimeSlotsJobMatchError):
+            Job.objects.create(creator, executor, 30.05, duration)
+        self.assertFalse(TimeSlot.objects.exists())
+
+        feasible, reasons = Job.objects.feasibility(executor, [
+            duration, samples.sample_duration(delta=3)])
+        self.assertEqual(list(feasible), [False, True])
+
+    # Free/busy tests
+    def test_free_windows(self):
+        """ To check the free windows of an executor around a job
+        and its recess
+        e.g ==> slots: 8-12, 12-16, 18-20
+                Job: 11-12, recess 12-13
+                free: 8-10, 13-16, 18-20
+        """
+        creator = samples.sample_user()
+        executor = samples.sample_user(email='tito123@pluto.com')
+        samples.sample_timeslot(executor)  # 12-16
+        for start, delta in [(8, 4), (18, 2)]:
+            samples.sample_timeslot(executor, period=samples.sample_duration(
+                start=datetime.datetime(2019, 12, 27, start, 0), delta=delta))
+        Job.objects.create(creator, executor, 30.05, samples.sample_duration(
+            start=datetime.datetime(2019, 12, 27, 11, 0), delta=1))
+        horizon = samples.sample_duration(
+            start=datetime.datetime(2019, 12, 27, 0, 0), delta=24)
+
+        with self.assertNumQueries(3):
+            windows = Job.objects.free_windows(executor, horizon)
+
+        self.assertEqual(windows, [
+            samples.sample_duration(
+                start=datetime.datetime(2019, 12, 27, 8, 0), delta=2),
+            samples.sample_duration(
+                start=datetime.datetime(2019, 12, 27, 13, 0), delta=3),
+            samples.sample_duration(
+                start=datetime.datetime(2019, 12, 27, 18, 0), delta=2),
+        ])
+        self.assertEqual(
+            Job.objects.free_windows(executor, horizon,
+                                     min_length=datetime.timedelta(hours=3)),
+            windows[1:2])
+        # every free window can be booked
+        feasible, _ = Job.objects.feasibility(executor, windows)
+        self.assertTrue(feasible.all())
+
+    def test_free_windows_are_cached(self):
+        """ To check that free windows are served from the cache until
+        a job, slot or template of the executor changes
+        """
+        creator = samples.sample_user()
+        executor = samples.sample_user(email='tito123@pluto.com')
+        slot = samples.sample_timeslot(executor)  # 12-16
+        horizon = samples.sample_duration(
+            start=datetime.datetime(2019, 12, 27, 0, 0), delta=24)
+        windows = Job.objects.free_windows(executor, horizon)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(Job.objects.free_windows(executor, horizon),
+                             windows)
+        self.assertEqual(availability_cache.stats(),
+                         {'hits': 1, 'misses': 1, 'invalidations': 1})
+
+        Job.objects.create(creator, executor, 30.05, samples.sample_duration(
+            delta=1))
+        self.assertEqual(Job.objects.free_windows(executor, horizon), [
+            samples.sample_duration(
+                start=datetime.datetime(2019, 12, 27, 14, 0), delta=2)])
+
+        slot.delete()
+        self.assertEqual(Job.objects.free_windows(executor, horizon), [])
+
+        AvailabilityTemplate.objects.create(
+            creator=executor, weekday=4,
+            start_time=datetime.time(18), end_time=datetime.time(20),
+            valid_from=datetime.date(2019, 12, 1))
+        self.assertEqual(Job.objects.free_windows(executor, horizon), [
+            samples.sample_duration(
+                start=datetime.datetime(2019, 12, 27, 18, 0), delta=2)])
+        self.assertEqual(availability_cache.stats()['misses'], 4)
+
+    # Settlement tests
+    def test_settle_payments(self):
+        """ To check that the pending jobs of a selection are paid in
+        a single batch recorded with the totals per executor
+        """
+        creator = samples.sample_user()
+        executors = [samples.sample_user(email=f'tito{i}@pluto.com')
+                     for i in range(2)]
+        jobs = []
+        for executor in executors:
+            samples.sample_timeslot(executor, period=samples.sample_duration(
+                start=datetime.datetime(2019, 12, 27, 0, 0), delta=24))
+            for hour, price in [(2, 10), (8, 20.5), (14, 30)]:
+                jobs.append(Job.objects.create(
+                    creator, executor, price, samples.sample_duration(
+                        start=datetime.datetime(2019, 12, 27, hour, 0),
+                        delta=1)))
+        Job.objects.filter(pk=jobs[0].pk).update(payment_status='paid')
+
+        with self.assertNumQueries(5):
+            settlement = Settlement.objects.settle(
+                executors=executors,
+                end=make_aware(datetime.datetime(2019, 12, 27, 12, 0)),
+                settled_by=creator)
+
+        self.assertEqual(settlement.job_count, 3)
+        self.assertEqual(str(settlement.total), '51.00')
+        self.assertEqual(settlement.executor_totals, {
+            str(executors[0].pk): [1, '20.50'],
+            str(executors[1].pk): [2, '30.50'],
+        })
+        self.assertEqual(set(settlement.jobs.values_list('pk', flat=True)),
+                         {jobs[1].pk, jobs[3].pk, jobs[4].pk})
+        self.assertEqual(
+            Job.objects.filter(payment_status='pending').count(), 2)
+
+        # paid jobs are not settled twice
+        settlement = Settlement.objects.settle(ids=[jobs[1].pk, jobs[2].pk])
+        self.assertEqual(settlement.job_count, 1)
+        with self.assertRaises(ValueError):
+            Settlement.objects.settle()
+
+        out = io.StringIO()
+        call_command('settle_payments', '--executor', 'tito1@pluto.com',
+                     stdout=out)
+        self.assertEqual(out.getvalue().splitlines()[0],
+                         'tito1@pluto.com: 1 jobs, 30.00')
+
+    # Status transition tests
+    def test_job_status_transitions(self):
+        """ To check that status changes are compare and set updates
+        following the state machine
+        """
+        creator = samples.sample_user()
+        executor = samples.sample_user(email='tito123@pluto.com')
+        job = samples.sample_job(creator, executor)
+        stale = Job.objects.get(pk=job.pk)
+
+        with self.assertRaises(JobStatusError):
+            Job.objects.transition(job, 'complete')
+        with self.assertNumQueries(1):
+            Job.objects.transition(job, 'in_progress')
+        with self.assertRaises(JobStatusConflictError):
+            Job.objects.transition(stale, 'cancelled')
+        Job.objects.transition(job, 'complete')
+
+        job.refresh_from_db()
+        self.assertEqual(job.job_status, 'complete')
+
+    def test_cancelled_job_frees_the_schedule(self):
+        """ To check that a cancelled job no longer blocks its
+        duration and recess
+        e.g ==> slot: 12-16
+                Job: 12-14, cancelled, then 12-14 again
+        """
+        creator = samples.sample_user()
+        executor = samples.sample_user(email='tito123@pluto.com')
+        samples.sample_timeslot(executor)  # 12-16
+        duration = samples.sample_duration(delta=2)
+        job = Job.objects.create(creator, executor, 30.05, duration)
+        horizon = samples.sample_duration(delta=4)
+        self.assertEqual(Job.objects.free_windows(executor, horizon), [
+            samples.sample_duration(
+                start=datetime.datetime(2019, 12, 27, 15, 0), delta=1)])
+
+        Job.objects.transition(job, 'cancelled')
+
+        self.assertEqual(Job.objects.free_windows(executor, horizon),
+                         [horizon])
+        self.assertIsNotNone(
+            Job.objects.create(creator, executor, 30.05, duration).pk)
+
+    def test_bulk_job_status_transition(self):
+        """ To check that a bulk transition reports the jobs that did
+        not have the expected status as conflicts, and unknown ids
+        apart
+        """
+        creator = samples.sample_user()
+        executor = samples.sample_user(email='tito123@pluto.com')
+        samples.sample_timeslot(executor, period=samples.sample_duration(
+            start=datetime.datetime(2019, 12, 27, 0, 0), delta=24))
+        jobs = [Job.objects.create(creator, executor, 30.05,
+                                   samples.sample_duration(
+                                       start=datetime.datetime(
+                                           2019, 12, 27, hour, 0), delta=1))
+                for hour in [2, 8, 14]]
+        Job.objects.transition(jobs[0], 'in_progress')
+
+        unknown = max(job.pk for job in jobs) + 1
+        with self.assertNumQueries(2):
+            result = Job.objects.bulk_transition(
+                [job.pk for job in jobs] + [unknown], 'in_progress',
+                'incomplete')
+
+        self.assertEqual(result, (2, 1, 1))
+        self.assertEqual(
+            Job.objects.filter(job_status='in_progress').count(), 3)
+        with self.assertRaises(JobStatusError):
+            Job.objects.bulk_transition([jobs[0].pk], 'incomplete',
+                                        'in_progress')
+
+    def test_save_recomputes_recess_with_the_duration(self):
+        """ To check that the recess follows duration changes only"""
+        creator = samples.sample_user()
+        executor = samples.sample_user(email='tito123@pluto.com')
+        job = samples.sample_job(creator, executor)  # 12-16
+        job.recess = samples.sample_duration(delta=1)
+        job.save(update_fields=['comment'])
+        job.refresh_from_db()
+        self.assertEqual(job.recess, samples.sample_duration(
+            start=datetime.datetime(2019, 12, 27, 16, 0), delta=1))
+
+        job.duration = samples.sample_duration(delta=2)
+        job.save(update_fields=['duration'])
+        job.refresh_from_db()
+        self.assertEqual(job.recess, samples.sample_duration(
+            start=datetime.datetime(2019, 12, 27, 14, 0), delta=1))
@@ -1,3 +1,99 @@
-# from django.shortcuts import render
+from django.db.models import F, Q
+from django.http import StreamingHttpResponse
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
 
-# Create your views here.
+from utilities.Exceptions.job import JobStatusConflictError, JobStatusError
+from utilities.pagination import KeysetPagination, RangeLower
+from utilities.params import id_param
+from .export import FORMATS, export_rows
+from .forms import JobExportForm
+from .models import Job, Settlement
+from .permissions import CanTransitionJob
+from .serializers import (
+    JobSerializer, SettlementRequestSerializer, SettlementSerializer,
+    TransitionSerializer
+)
+
+
+class Conflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_code = 'conflict'
+
+
+class JobViewSet(mixins.CreateModelMixin,
+                 mixins.ListModelMixin,
+                 mixins.RetrieveModelMixin,
+                 viewsets.GenericViewSet):
+    """ the jobs the requesting user created or executes, by
+    start time"""
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    # see utilities.instrumentation, session authentication takes 2
+    query_budgets = {'list': 3, 'retrieve': 3, 'create': 10,
+                     'transition': 4, 'settle': 7}
+    # served by the lower(duration), id indexes of migrations 0009 and
+    # 0012. The creator or executor filter of a user is a BitmapOr of
+    # the creator and executor indexes and a sort of the user's jobs,
+    # not an ordered index scan, bounded by the jobs of a single user
+    keyset = [('start', RangeLower('duration')), ('id', F('id'))]
+
+    def get_queryset(self):
+        user = self.request.user
+        queryset = Job.objects.for_listing().filter(
+            Q(creator=user) | Q(executor=user))
+        executor = id_param(self.request, 'executor')
+        if executor is not None:
+            queryset = queryset.filter(executor_id=executor)
+        return queryset
+
+    @action(detail=False, permission_classes=[IsAdminUser])
+    def export(self, request):
+        """ streams every job in NDJSON or CSV, ?export_format=,
+        start=, end=, job_status= and payment_status= filter them"""
+        form = JobExportForm(request.query_params)
+        if not form.is_valid():
+            raise ValidationError(form.errors)
+        options = dict(form.cleaned_data)
+        export_format = options.pop('export_format') or 'ndjson'
+        lines, content_type = FORMATS[export_format]
+        rows = export_rows(Job.objects.for_export(**options))
+        response = StreamingHttpResponse(lines(rows),
+                                         content_type=content_type)
+        response['Content-Disposition'] = \
+            f'attachment; filename="jobs.{export_format}"'
+        return response
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
+    def settle(self, request):
+        """ pays the pending jobs selected by executors, start-end or
+        ids, see SettlementManager.settle"""
+        selection = SettlementRequestSerializer(data=request.data)
+        selection.is_valid(raise_exception=True)
+        settlement = Settlement.objects.settle(
+            settled_by=request.user, **selection.validated_data)
+        return Response(SettlementSerializer(settlement).data,
+                        status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['post'],
+            permission_classes=[IsAuthenticated, CanTransitionJob])
+    def transition(self, request, pk=None):
+        """ moves the job to the posted job_status, if it still has
+        the posted expected_status, or nobody changed its status since
+        it was read"""
+        target = TransitionSerializer(data=request.data)
+        target.is_valid(raise_exception=True)
+        job = self.get_object()
+        try:
+            Job.objects.transition(
+                job, target.validated_data['job_status'],
+                expected=target.validated_data.get('expected_status'))
+        except JobStatusError as e:
+            raise ValidationError({'job_status': [str(e)]})
+        except JobStatusConflictError as e:
+            raise Conflict(str(e))
+        return Response(self.get_serializer(job).data)
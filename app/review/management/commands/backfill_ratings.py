@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from review.models import ExecutorRating
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the rating stats of every executor from the reviews'
+
+    def handle(self, *args, **options):
+        count = ExecutorRating.objects.backfill()
+        self.stdout.write(f'rating stats of {count} executors backfilled')
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from review.models import ExecutorRating
+
+
+class Command(BaseCommand):
+    help = ('Compares the rating stats of the executors with their '
+            'reviews, fails on any difference')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true',
+                            help='backfill the stats when they differ')
+
+    def handle(self, *args, **options):
+        inconsistencies = ExecutorRating.objects.inconsistencies()
+        for executor_id, stored, actual in inconsistencies:
+            self.stderr.write(f'executor {executor_id}: stored count/sum '
+                              f'{stored}, reviews {actual}')
+        if not inconsistencies:
+            self.stdout.write('rating stats are consistent')
+        elif options['fix']:
+            ExecutorRating.objects.backfill()
+            self.stdout.write(f'{len(inconsistencies)} executors fixed')
+        else:
+            raise CommandError(
+                f'{len(inconsistencies)} executors have inconsistent '
+                f'rating stats')
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from review.models import Leaderboard
+
+
+class Command(BaseCommand):
+    help = ('Refreshes the executor leaderboard view, meant to run on a '
+            'schedule, e.g a cron entry every 10 minutes')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--blocking', action='store_true',
+                            help='refresh without CONCURRENTLY, faster but '
+                                 'blocks the leaderboard reads')
+
+    def handle(self, *args, **options):
+        Leaderboard.objects.refresh(concurrently=not options['blocking'])
+        self.stdout.write('leaderboard refreshed')
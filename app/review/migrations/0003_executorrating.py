@@ -0,0 +1,34 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0006_remove_user_timesheet'),
+        ('review', '0002_auto_20190915_1614'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExecutorRating',
+            fields=[
+                ('executor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rating', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.BigIntegerField(default=0)),
+                ('rating_avg', models.FloatField(blank=True, db_index=True, null=True)),
+            ],
+        ),
+        # stats of the existing reviews
+        migrations.RunSQL(
+            sql="INSERT INTO review_executorrating "
+                "(executor_id, rating_count, rating_sum, rating_avg) "
+                "SELECT executor_id, count(*), sum(rating), "
+                "sum(rating)::float8 / count(*) "
+                "FROM review_review GROUP BY executor_id",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
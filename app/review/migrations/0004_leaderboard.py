@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('job', '0009_keyset_indexes'),
+        ('review', '0003_executorrating'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+            CREATE MATERIALIZED VIEW review_leaderboard AS
+            SELECT u.id AS executor_id,
+                   COALESCE(r.rating_count, 0) AS rating_count,
+                   r.rating_avg,
+                   COALESCE(j.completed_jobs, 0) AS completed_jobs
+            FROM user_user u
+            LEFT JOIN (SELECT executor_id, count(*) AS rating_count,
+                              avg(rating)::float8 AS rating_avg
+                       FROM review_review
+                       GROUP BY executor_id) r ON r.executor_id = u.id
+            LEFT JOIN (SELECT executor_id, count(*) AS completed_jobs
+                       FROM job_job
+                       WHERE job_status = 'complete'
+                       GROUP BY executor_id) j ON j.executor_id = u.id
+            WHERE r.executor_id IS NOT NULL OR j.executor_id IS NOT NULL
+            """,
+            reverse_sql="DROP MATERIALIZED VIEW review_leaderboard",
+        ),
+        # a unique index is required to refresh concurrently
+        migrations.RunSQL(
+            sql="CREATE UNIQUE INDEX review_leaderboard_executor_id "
+                "ON review_leaderboard (executor_id)",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        # the order of LeaderboardManager.top
+        migrations.RunSQL(
+            sql="CREATE INDEX review_leaderboard_rank "
+                "ON review_leaderboard (rating_avg DESC NULLS LAST, "
+                "completed_jobs DESC, executor_id)",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.CreateModel(
+            name='Leaderboard',
+            fields=[
+                ('executor', models.OneToOneField(on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='+', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('rating_count', models.PositiveIntegerField()),
+                ('rating_avg', models.FloatField(null=True)),
+                ('completed_jobs', models.PositiveIntegerField()),
+            ],
+            options={
+                'db_table': 'review_leaderboard',
+                'managed': False,
+            },
+        ),
+    ]
@@ -1,6 +1,21 @@
-from django.db import models
+from django.db import connections, models, router, transaction
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast, NullIf
 from django.contrib.auth import get_user_model
-from job.models import Job
+
+from . import sql
+from job.models import USER_SUMMARY_FIELDS, Job
+
+
+class ReviewQuerySet(models.QuerySet):
+
+    def for_listing(self):
+        """ the reviews with their creator and executor joined in,
+        loading only the user fields of a listing"""
+        return self.select_related('creator', 'executor').only(
+            'id', 'job', 'creator', 'executor', 'rating', 'note',
+            *[f'{user}__{field}' for user in ('creator', 'executor')
+              for field in USER_SUMMARY_FIELDS])
 
 
 class ReviewManager(models.Manager):
@@ -8,9 +23,10 @@ class ReviewManager(models.Manager):
     def _create_new_review(self, creator, executor,
                            job, rating, **extra_fields):
         """helper to create a new job model"""
-        if creator != job.creator:
+        # compared by id, the job users are not loaded
+        if creator.pk != job.creator_id:
             raise ValueError("You can only review a job you assigned")
-        if executor != job.executor:
+        if executor.pk != job.executor_id:
             raise ValueError("The review executor must match with the"
                              " job executor")
 
@@ -21,7 +37,11 @@ class ReviewManager(models.Manager):
             rating=rating,
             **extra_fields
         )
-        review.save(using=self._db)
+        using = self._db or router.db_for_write(self.model)
+        with transaction.atomic(using=using):
+            review.save(using=using)
+            ExecutorRating.objects.db_manager(using).add(
+                executor.pk, rating)
         return review
 
     def create(self, creator, executor, job, rating, **extra_fields):
@@ -43,4 +63,97 @@ class Review(models.Model):
     note = models.CharField(max_length=255,
                             blank=True)
 
-    objects = ReviewManager()
+    objects = ReviewManager.from_queryset(ReviewQuerySet)()
+
+
+class ExecutorRatingManager(models.Manager):
+
+    def add(self, executor_id, rating, count=1):
+        """ adds count ratings to the stats of an executor, a negative
+        count removes them. A single UPDATE with F expressions, so
+        concurrent reviews do not lose each other's ratings"""
+        rating_count = F('rating_count') + count
+        rating_sum = F('rating_sum') + rating * count
+        updated = self.filter(executor_id=executor_id).update(
+            rating_count=rating_count,
+            rating_sum=rating_sum,
+            rating_avg=Cast(rating_sum, FloatField())
+            / NullIf(rating_count, 0),
+        )
+        if not updated and count > 0:
+            self.get_or_create(executor_id=executor_id)
+            self.add(executor_id, rating, count)
+
+    def backfill(self):
+        """ recomputes the stats of every executor from the reviews,
+        returns the number of executors with reviews"""
+        using = self._db or router.db_for_write(self.model)
+        with transaction.atomic(using=using), \
+                connections[using].cursor() as cursor:
+            cursor.execute(sql.BACKFILL_RATINGS)
+            return cursor.rowcount
+
+    def inconsistencies(self):
+        """ (executor_id, stored, actual) tuples of the executors whose
+        stats do not match their reviews, stats being (count, sum)
+        pairs"""
+        using = self._db or router.db_for_read(self.model)
+        with connections[using].cursor() as cursor:
+            cursor.execute(sql.RATING_INCONSISTENCIES)
+            return [(executor_id, (count, total), (actual_count, actual_sum))
+                    for executor_id, count, total, actual_count, actual_sum
+                    in cursor.fetchall()]
+
+
+class ExecutorRating(models.Model):
+    """ The review stats of an executor, maintained along with the
+    reviews so that executors sort by rating without aggregating"""
+    executor = models.OneToOneField(get_user_model(), primary_key=True,
+                                    related_name='rating',
+                                    on_delete=models.CASCADE)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.BigIntegerField(default=0)
+    rating_avg = models.FloatField(null=True, blank=True, db_index=True)
+
+    objects = ExecutorRatingManager()
+
+    def __str__(self):
+        return f'{self.executor} rated {self.rating_avg} ' \
+            f'by {self.rating_count} reviews'
+
+
+class LeaderboardManager(models.Manager):
+
+    def top(self, limit=10):
+        """ the best rated executors, ties broken by completed jobs.
+        An index scan of the leaderboard view"""
+        return self.select_related('executor').only(
+            'rating_count', 'rating_avg', 'completed_jobs',
+            *[f'executor__{field}' for field in USER_SUMMARY_FIELDS]
+        ).order_by(F('rating_avg').desc(nulls_last=True),
+                   '-completed_jobs', 'executor_id')[:limit]
+
+    def refresh(self, concurrently=True):
+        """ recomputes the leaderboard view. Concurrently, reads are
+        not blocked while it runs"""
+        using = self._db or router.db_for_write(self.model)
+        with connections[using].cursor() as cursor:
+            cursor.execute(sql.REFRESH_LEADERBOARD.format(
+                concurrently='CONCURRENTLY' if concurrently else ''))
+
+
+class Leaderboard(models.Model):
+    """ The rating and completed jobs of the executors, a materialized
+    view refreshed by the refresh_leaderboard command"""
+    executor = models.OneToOneField(get_user_model(), primary_key=True,
+                                    related_name='+',
+                                    on_delete=models.DO_NOTHING)
+    rating_count = models.PositiveIntegerField()
+    rating_avg = models.FloatField(null=True)
+    completed_jobs = models.PositiveIntegerField()
+
+    objects = LeaderboardManager()
+
+    class Meta:
+        managed = False
+        db_table = 'review_leaderboard'
@@ -0,0 +1,31 @@
+from rest_framework import serializers
+
+from job.models import Job
+from user.serializers import UserSummarySerializer
+from .models import Review
+
+
+class ReviewSerializer(serializers.ModelSerializer):
+    """ expects the users to be joined in, see
+    ReviewQuerySet.for_listing"""
+    job = serializers.PrimaryKeyRelatedField(
+        queryset=Job.objects.select_related('executor'))
+    creator_detail = UserSummarySerializer(source='creator', read_only=True)
+    executor_detail = UserSummarySerializer(source='executor',
+                                            read_only=True)
+
+    class Meta:
+        model = Review
+        fields = ['id', 'creator', 'executor', 'creator_detail',
+                  'executor_detail', 'job', 'rating', 'note']
+        read_only_fields = ['creator', 'executor']
+
+    def create(self, validated_data):
+        """ reviews a job assigned by the requesting user"""
+        job = validated_data.pop('job')
+        try:
+            return Review.objects.create(
+                self.context['request'].user, job.executor, job,
+                **validated_data)
+        except ValueError as e:
+            raise serializers.ValidationError({'job': [str(e)]})
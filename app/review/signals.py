@@ -0,0 +1,11 @@
+""" Keeps the executor rating stats in line with the reviews """
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import ExecutorRating, Review
+
+
+@receiver(post_delete, sender=Review)
+def remove_rating(sender, instance, using, **kwargs):
+    ExecutorRating.objects.db_manager(using).add(
+        instance.executor_id, instance.rating, count=-1)
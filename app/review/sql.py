@@ -0,0 +1,47 @@
+""" Raw SQL used by the review managers """
+
+# Rewrites the stats of every executor from the reviews in one pass,
+# executors left without reviews are reset
+BACKFILL_RATINGS = """
+WITH actual AS (
+    SELECT r.executor_id, count(*) AS rating_count,
+           sum(r.rating) AS rating_sum
+    FROM review_review r
+    GROUP BY r.executor_id
+), reset AS (
+    UPDATE review_executorrating s
+    SET rating_count = 0, rating_sum = 0, rating_avg = NULL
+    WHERE s.executor_id NOT IN (SELECT executor_id FROM actual)
+)
+INSERT INTO review_executorrating
+    (executor_id, rating_count, rating_sum, rating_avg)
+SELECT a.executor_id, a.rating_count, a.rating_sum,
+       a.rating_sum::float8 / a.rating_count
+FROM actual a
+ON CONFLICT (executor_id) DO UPDATE
+SET rating_count = EXCLUDED.rating_count,
+    rating_sum = EXCLUDED.rating_sum,
+    rating_avg = EXCLUDED.rating_avg
+"""
+
+# The executors whose stored stats differ from their reviews
+RATING_INCONSISTENCIES = """
+WITH actual AS (
+    SELECT r.executor_id, count(*) AS rating_count,
+           sum(r.rating) AS rating_sum
+    FROM review_review r
+    GROUP BY r.executor_id
+)
+SELECT COALESCE(s.executor_id, a.executor_id),
+       COALESCE(s.rating_count, 0), COALESCE(s.rating_sum, 0),
+       COALESCE(a.rating_count, 0), COALESCE(a.rating_sum, 0)
+FROM review_executorrating s
+FULL JOIN actual a ON a.executor_id = s.executor_id
+WHERE COALESCE(s.rating_count, 0) <> COALESCE(a.rating_count, 0)
+   OR COALESCE(s.rating_sum, 0) <> COALESCE(a.rating_sum, 0)
+ORDER BY 1
+"""
+
+REFRESH_LEADERBOARD = """
+REFRESH MATERIALIZED VIEW {concurrently} review_leaderboard
+"""
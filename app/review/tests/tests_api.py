@@ -0,0 +1,63 @@
+import datetime
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from job.models import Job
+from review.models import Review
+
+from utilities import samples
+
+
+class ReviewApiTests(TestCase):
+
+    def test_create_review(self):
+        """ To check that the creator of a job reviews its executor"""
+        creator = samples.sample_user()
+        executor = samples.sample_user(email='tito123@pluto.com')
+        job = samples.sample_job(creator, executor)
+        client = APIClient()
+
+        client.force_authenticate(executor)
+        response = client.post('/api/reviews/', {'job': job.pk, 'rating': 5},
+                               format='json')
+        self.assertEqual(response.status_code, 400)
+
+        client.force_authenticate(creator)
+        response = client.post('/api/reviews/', {'job': job.pk, 'rating': 5},
+                               format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Review.objects.get().executor, executor)
+        self.assertEqual(client.get('/api/reviews/').data['results'][0]['id'],
+                         response.data['id'])
+
+    def test_list_reviews_invalid_executor(self):
+        client = APIClient()
+        client.force_authenticate(samples.sample_user())
+        response = client.get('/api/reviews/?executor=abc')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('executor', response.data)
+
+    def test_list_reviews_query_count(self):
+        """ To check that listing reviews costs a single query whatever
+        the page size"""
+        creator = samples.sample_user()
+        executor = samples.sample_user(email='tito123@pluto.com')
+        samples.sample_timeslot(executor, period=samples.sample_duration(
+            start=datetime.datetime(2019, 12, 27, 0, 0), delta=24))
+        for hour in range(0, 24, 2):
+            job = Job.objects.create(creator, executor, 30.05,
+                                     samples.sample_duration(
+                                         start=datetime.datetime(
+                                             2019, 12, 27, hour, 0), delta=1))
+            Review.objects.create(creator, executor, job, 4)
+        client = APIClient()
+        client.force_authenticate(creator)
+
+        for page_size in [1, 5, 12]:
+            with self.assertNumQueries(1):
+                response = client.get(f'/api/reviews/?page_size={page_size}')
+            self.assertEqual(len(response.data['results']), page_size)
+        self.assertEqual(
+            response.data['results'][0]['creator_detail']['email'],
+            'tito@pluto.com')
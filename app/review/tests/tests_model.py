@@ -1,3 +1,107 @@
+import datetime
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db.models import F
+from django.test import TestCase
+
+from job.models import Job
+from review.models import ExecutorRating, Leaderboard, Review
+
+from utilities import samples
+
+
+class ExecutorRatingTests(TestCase):
+
+    def setUp(self):
+        self.creator = samples.sample_user()
+        self.executor = samples.sample_user(email='tito123@pluto.com')
+        samples.sample_timeslot(self.executor, period=samples.sample_duration(
+            start=datetime.datetime(2019, 12, 27, 0, 0), delta=24))
+
+    def sample_review(self, hour, rating):
+        job = Job.objects.create(self.creator, self.executor, 30.05,
+                                 samples.sample_duration(
+                                     start=datetime.datetime(
+                                         2019, 12, 27, hour, 0), delta=1))
+        return Review.objects.create(self.creator, self.executor, job, rating)
+
+    def test_rating_stats_follow_reviews(self):
+        """ To check that creating and deleting reviews maintains the
+        executor stats"""
+        self.sample_review(0, 5)
+        review = self.sample_review(2, 2)
+        self.sample_review(4, 4)
+
+        stats = ExecutorRating.objects.get(executor=self.executor)
+        self.assertEqual((stats.rating_count, stats.rating_sum), (3, 11))
+        self.assertAlmostEqual(stats.rating_avg, 11 / 3)
+
+        review.delete()
+        stats.refresh_from_db()
+        self.assertEqual((stats.rating_count, stats.rating_sum), (2, 9))
+        self.assertEqual(stats.rating_avg, 4.5)
+
+        # deleting the jobs cascades to the reviews
+        Job.objects.all().delete()
+        stats.refresh_from_db()
+        self.assertEqual((stats.rating_count, stats.rating_sum), (0, 0))
+        self.assertIsNone(stats.rating_avg)
+
+    def test_executors_sort_by_rating(self):
+        """ To check that executors sort by rating without reviews
+        aggregation"""
+        self.sample_review(0, 3)
+        other = samples.sample_user(email='tim@pluto.com')
+
+        executors = get_user_model().objects.order_by(
+            F('rating__rating_avg').desc(nulls_last=True))
+
+        self.assertEqual(list(executors)[0], self.executor)
+        self.assertNotIn('review_review', str(executors.query))
+        self.assertIn(other, executors)
+
+    def test_check_and_backfill_ratings(self):
+        """ To check that the checker reports stats drifting from the
+        reviews and that the backfill fixes them"""
+        self.sample_review(0, 5)
+        self.sample_review(2, 3)
+        ExecutorRating.objects.update(rating_count=7)
+
+        with self.assertRaises(CommandError):
+            call_command('check_ratings', stderr=io.StringIO())
+
+        out = io.StringIO()
+        call_command('check_ratings', '--fix', stdout=out,
+                     stderr=io.StringIO())
+        self.assertIn('1 executors fixed', out.getvalue())
+        stats = ExecutorRating.objects.get()
+        self.assertEqual((stats.rating_count, stats.rating_sum,
+                          stats.rating_avg), (2, 8, 4.0))
+        self.assertEqual(ExecutorRating.objects.inconsistencies(), [])
+
+    def test_leaderboard(self):
+        """ To check that the leaderboard ranks executors by rating,
+        then completed jobs, once refreshed"""
+        self.sample_review(0, 3)
+        Job.objects.update(job_status='complete')
+        other = samples.sample_user(email='tim@pluto.com')
+        samples.sample_timeslot(other)  # 12-16
+        job = Job.objects.create(self.creator, other, 30.05,
+                                 samples.sample_duration(delta=1))
+        Review.objects.create(self.creator, other, job, 3)
+        self.assertEqual(list(Leaderboard.objects.top()), [])
+
+        call_command('refresh_leaderboard', stdout=io.StringIO())
+
+        with self.assertNumQueries(1):
+            top = [(row.executor.email, row.rating_avg, row.completed_jobs)
+                   for row in Leaderboard.objects.top()]
+        self.assertEqual(top, [('tito123@pluto.com', 3.0, 1),
+                               ('tim@pluto.com', 3.0, 0)])
+
+
 # from django.test import TestCase
 # from django.contrib.auth import get_user_model
 # from django.utils import timezone
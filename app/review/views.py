@@ -1,3 +1,27 @@
-# from django.shortcuts import render
+from django.db.models import F
+from rest_framework import mixins, viewsets
+from rest_framework.permissions import IsAuthenticated
 
-# Create your views here.
+from utilities.pagination import KeysetPagination
+from utilities.params import id_param
+from .models import Review
+from .serializers import ReviewSerializer
+
+
+class ReviewViewSet(mixins.CreateModelMixin,
+                    mixins.ListModelMixin,
+                    mixins.RetrieveModelMixin,
+                    viewsets.GenericViewSet):
+    """ the reviews of all executors, ?executor= narrows them to
+    one executor"""
+    serializer_class = ReviewSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset = [('id', F('id'))]
+
+    def get_queryset(self):
+        queryset = Review.objects.for_listing()
+        executor = id_param(self.request, 'executor')
+        if executor is not None:
+            queryset = queryset.filter(executor_id=executor)
+        return queryset
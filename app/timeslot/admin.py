@@ -1,13 +1,24 @@
 from django.contrib import admin
-from .models import TimeSlot
+from .models import AvailabilityTemplate, TimeSlot
 
 
 # Register your models here.
 class TimeSlotAdmin(admin.ModelAdmin):
     list_display = ['creator', 'period', 'comment']
+    list_select_related = ['creator']
 
     class meta:
         model = TimeSlot
 
 
+class AvailabilityTemplateAdmin(admin.ModelAdmin):
+    list_display = ['creator', 'weekday', 'start_time', 'end_time',
+                    'interval', 'valid_from', 'valid_until']
+    list_select_related = ['creator']
+
+    class meta:
+        model = AvailabilityTemplate
+
+
 admin.site.register(TimeSlot, TimeSlotAdmin)
+admin.site.register(AvailabilityTemplate, AvailabilityTemplateAdmin)
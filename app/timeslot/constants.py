@@ -0,0 +1,2 @@
+# exclusion constraint guarding a creator's time slots
+PERIOD_EXCLUSION = 'timeslot_timeslot_creator_period_excl'
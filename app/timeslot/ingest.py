@@ -0,0 +1,181 @@
+""" Bulk time slot ingestion from CSV or JSONL files """
+import collections
+import csv
+import datetime
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connections, router, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from psycopg2.extras import DateTimeTZRange
+
+from utilities.cache import availability_cache
+from utilities.Exceptions.timeslot import TimeSlotsOverlapError
+
+IngestResult = collections.namedtuple('IngestResult', ['created', 'rejected'])
+
+# the rows overlapping existing slots, in a single range join
+EXISTING_OVERLAPS = """
+SELECT DISTINCT b.n
+FROM unnest(%s::int[], %s::int[], %s::timestamptz[], %s::timestamptz[])
+     AS b(n, creator_id, lower, upper)
+JOIN timeslot_timeslot t
+  ON t.creator_id = b.creator_id
+ AND t.period && tstzrange(b.lower, b.upper)
+"""
+
+COPY_SLOTS = """
+COPY timeslot_timeslot (creator_id, period, comment)
+FROM STDIN WITH (FORMAT csv, FORCE_NOT_NULL (comment))
+"""
+
+
+def read_csv(stream):
+    """ reads records from a CSV file with a header row"""
+    return csv.DictReader(stream)
+
+
+def read_jsonl(stream):
+    """ reads records from a file with a JSON object per line, a line
+    which does not parse gives its error in place of the record"""
+    for line in stream:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield e
+
+
+READERS = {
+    'csv': read_csv,
+    'jsonl': read_jsonl,
+}
+
+
+def _to_datetime(value):
+    """ parses an ISO 8601 string, naive values are made aware
+    in the current time zone"""
+    if isinstance(value, str):
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise ValueError(f"Invalid date time {value!r}")
+        value = parsed
+    elif not isinstance(value, datetime.datetime):
+        raise TypeError(f"Invalid date time {value!r}")
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def _creator_key(value):
+    """ the email or the integer id a creator value names"""
+    value = str(value)
+    if '@' in value:
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Unknown creator {value!r}")
+
+
+def _resolve_creators(keys, using):
+    """ maps creator emails and ids to user ids"""
+    User = get_user_model()
+    emails = {key for key in keys if isinstance(key, str)}
+    ids = {key for key in keys if isinstance(key, int)}
+    users = User.objects.using(using).filter(email__in=emails) \
+        | User.objects.using(using).filter(pk__in=ids)
+    creators = {}
+    for pk, email in users.values_list('pk', 'email'):
+        creators[pk] = creators[email] = pk
+    return creators
+
+
+def ingest(manager, records):
+    """ bulk loads time slots. records are dicts with a creator email
+    or id, start, end and an optional comment.
+    Records which are not dicts, like the errors of read_jsonl, are
+    rejected. Rows are checked against each other and against the
+    existing slots of their creator, the accepted ones are loaded with
+    COPY. Returns the number of created slots and the rejected
+    (row, error) pairs, rows being numbered from 1"""
+    using = manager._db or router.db_for_write(manager.model)
+    rejected = []
+    parsed = []
+    for number, record in enumerate(records, start=1):
+        try:
+            if isinstance(record, Exception):
+                raise ValueError(f"Invalid record: {record}")
+            if not isinstance(record, dict):
+                raise TypeError(f"Expected an object, got {record!r}")
+            creator = _creator_key(record.get('creator'))
+            lower = _to_datetime(record['start'])
+            upper = _to_datetime(record['end'])
+            if lower >= upper:
+                raise ValueError(
+                    "The End time should be greater than the Start time")
+        except (KeyError, TypeError, ValueError) as e:
+            rejected.append((number, e))
+            continue
+        parsed.append((number, creator, lower, upper,
+                       record.get('comment') or ''))
+
+    creators = _resolve_creators({row[1] for row in parsed}, using)
+    rows = []
+    for number, creator, lower, upper, comment in parsed:
+        if creator not in creators:
+            rejected.append((number, ValueError(
+                f"Unknown creator {creator!r}")))
+        else:
+            rows.append((number, creators[creator], lower, upper, comment))
+
+    # overlaps within the file, the earliest row wins
+    rows.sort(key=lambda r: (r[1], r[2]))
+    accepted = []
+    for row in rows:
+        previous = accepted[-1] if accepted else None
+        if previous and previous[1] == row[1] and row[2] < previous[3]:
+            rejected.append((row[0], TimeSlotsOverlapError(
+                None, f"The time slot overlaps row {previous[0]}")))
+        else:
+            accepted.append(row)
+
+    with transaction.atomic(using=using):
+        connection = connections[using]
+        with connection.cursor() as cursor:
+            overlapping = set()
+            if accepted:
+                numbers, creator_ids, lowers, uppers, _ = zip(*accepted)
+                cursor.execute(EXISTING_OVERLAPS, [
+                    list(numbers), list(creator_ids),
+                    list(lowers), list(uppers)])
+                overlapping = {number for number, in cursor.fetchall()}
+            for row in accepted:
+                if row[0] in overlapping:
+                    rejected.append((row[0], TimeSlotsOverlapError(
+                        manager.filter(creator_id=row[1],
+                                       period__overlap=DateTimeTZRange(
+                                           row[2], row[3])),
+                        "The time slot overlaps with an existing "
+                        "time slot")))
+            accepted = [row for row in accepted if row[0] not in overlapping]
+
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for _, creator_id, lower, upper, comment in accepted:
+                writer.writerow([
+                    creator_id,
+                    f'[{lower.isoformat()},{upper.isoformat()})',
+                    comment,
+                ])
+            buffer.seek(0)
+            if accepted:
+                cursor.copy_expert(COPY_SLOTS, buffer)
+        availability_cache.invalidate(*{row[1] for row in accepted},
+                                      using=using)
+
+    rejected.sort(key=lambda r: r[0])
+    return IngestResult(len(accepted), rejected)
@@ -0,0 +1,100 @@
+import datetime
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils.timezone import make_aware
+
+from psycopg2.extras import DateTimeTZRange
+
+from job.models import Job
+from utilities.Exceptions.timeslot import TimeSlotError
+
+POPULATE_USERS = """
+INSERT INTO user_user (email, password, first_name, last_name, mode,
+                       gender, location, is_active, is_staff, is_admin,
+                       is_superuser, date_joined, date_updated, headline,
+                       about_me, phone_number)
+SELECT 'bench' || g || '@pluto.com', '', '', '', '', '', '', true, false,
+       false, false, now(), now(), '', '', ''
+FROM generate_series(0, %(executors)s) g
+"""
+
+# 2 hour slots every 3 hours for each executor
+POPULATE_SLOTS = """
+INSERT INTO timeslot_timeslot (creator_id, period, comment)
+SELECT u.id,
+       tstzrange(%(start)s + s * interval '3 hours',
+                 %(start)s + s * interval '3 hours' + interval '2 hours'),
+       ''
+FROM user_user u, generate_series(0, %(slots)s - 1) s
+WHERE u.email <> 'bench0@pluto.com'
+"""
+
+
+class Command(BaseCommand):
+    help = ('Times the executor availability lookups against a throwaway '
+            'database filled with synthetic time slots')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--executors', type=int, default=1000)
+        parser.add_argument('--slots', type=int, default=1000,
+                            help='time slots per executor')
+        parser.add_argument('--lookups', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        test_db = connection.creation.create_test_db(verbosity=0)
+        try:
+            self._populate(options)
+            self._run(options)
+        finally:
+            connection.creation.destroy_test_db(test_db, verbosity=0)
+
+    def _populate(self, options):
+        start = make_aware(datetime.datetime(2019, 1, 1))
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute(POPULATE_USERS,
+                           {'executors': options['executors']})
+            cursor.execute(POPULATE_SLOTS,
+                           {'start': start, 'slots': options['slots']})
+            cursor.execute('ANALYZE')
+        self.stdout.write(
+            f"populated {options['executors'] * options['slots']} slots "
+            f"in {time.perf_counter() - started:.1f}s")
+
+    def _run(self, options):
+        User = get_user_model()
+        creator = User.objects.get(email='bench0@pluto.com')
+        executors = list(User.objects.exclude(pk=creator.pk))
+        start = make_aware(datetime.datetime(2019, 1, 1))
+        rnd = random.Random(options['seed'])
+
+        # windows in the gaps between slots, so bookings are rejected
+        # and the data set stays the same during the run
+        samples = []
+        for _ in range(options['lookups']):
+            lower = start + datetime.timedelta(
+                hours=3 * rnd.randrange(options['slots']) + 2, minutes=20)
+            samples.append((rnd.choice(executors), DateTimeTZRange(
+                lower, lower + datetime.timedelta(minutes=20))))
+
+        cases = [
+            ('timesheet overlap lookup',
+             lambda e, d: e.timesheet.filter(period__overlap=d).count()),
+            ('rejected booking',
+             lambda e, d: Job.objects.create(creator, e, 10, d)),
+        ]
+        for label, case in cases:
+            started = time.perf_counter()
+            for executor, duration in samples:
+                try:
+                    case(executor, duration)
+                except TimeSlotError:
+                    pass
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'{label}: {elapsed / len(samples) * 1000:.3f} ms/op')
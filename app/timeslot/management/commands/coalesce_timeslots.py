@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from timeslot.models import TimeSlot
+
+
+class Command(BaseCommand):
+    help = 'Merges back to back time slots into one slot per block'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--creator', help='email of a single creator')
+
+    def handle(self, *args, **options):
+        creator = None
+        if options['creator']:
+            try:
+                creator = get_user_model().objects.get(
+                    email=options['creator'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"Unknown creator {options['creator']!r}")
+
+        deleted = TimeSlot.objects.coalesce(creator)
+        self.stdout.write(f'{deleted} time slots merged')
@@ -0,0 +1,31 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from timeslot.ingest import READERS
+from timeslot.models import TimeSlot
+
+
+class Command(BaseCommand):
+    help = ('Bulk loads time slots from a CSV file with a '
+            'creator,start,end,comment header or from a JSONL file')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=sorted(READERS),
+                            help='defaults to the file extension')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or \
+            os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format not in READERS:
+            raise CommandError(f'Unknown format {file_format!r}')
+
+        with open(path, newline='') as stream:
+            result = TimeSlot.objects.ingest(READERS[file_format](stream))
+
+        for row, error in result.rejected:
+            self.stderr.write(f'row {row}: {error}')
+        self.stdout.write(f'{result.created} time slots created, '
+                          f'{len(result.rejected)} rows rejected')
@@ -0,0 +1,32 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from psycopg2.extras import DateTimeTZRange
+
+from timeslot.models import AvailabilityTemplate, TimeSlot
+
+
+class Command(BaseCommand):
+    help = ('Creates the time slots of the availability templates '
+            'for the coming days')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=28)
+        parser.add_argument('--creator', help='email of a single creator')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        window = DateTimeTZRange(
+            now, now + datetime.timedelta(days=options['days']))
+        creators = get_user_model().objects.filter(
+            pk__in=AvailabilityTemplate.objects.values('creator'))
+        if options['creator']:
+            creators = creators.filter(email=options['creator'])
+
+        created = 0
+        for creator in creators:
+            created += len(TimeSlot.objects.materialize(creator, window))
+        self.stdout.write(f'{created} time slots created')
@@ -0,0 +1,33 @@
+from django.contrib.postgres.fields import DateTimeRangeField
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timeslot', '0007_auto_20190927_0347'),
+        ('user', '0006_remove_user_timesheet'),
+    ]
+
+    operations = [
+        # the job constraints may already depend on the extension,
+        # so it is left in place when migrating backwards
+        migrations.RunSQL(
+            sql="CREATE EXTENSION IF NOT EXISTS btree_gist",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name='timeslot',
+            name='period',
+            field=DateTimeRangeField(),
+        ),
+        # no two slots of a creator may overlap, the GiST index behind
+        # the constraint also serves the (creator, period) lookups
+        migrations.RunSQL(
+            sql="ALTER TABLE timeslot_timeslot "
+                "ADD CONSTRAINT timeslot_timeslot_creator_period_excl "
+                "EXCLUDE USING gist (creator_id WITH =, period WITH &&)",
+            reverse_sql="ALTER TABLE timeslot_timeslot "
+                        "DROP CONSTRAINT timeslot_timeslot_creator_period_excl",
+        ),
+    ]
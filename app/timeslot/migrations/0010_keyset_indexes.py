@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timeslot', '0009_availabilitytemplate'),
+    ]
+
+    # the keysets of the time slot list, see timeslot.views
+    operations = [
+        migrations.RunSQL(
+            sql="CREATE INDEX timeslot_timeslot_lower_period_id "
+                "ON timeslot_timeslot (lower(period), id)",
+            reverse_sql="DROP INDEX timeslot_timeslot_lower_period_id",
+        ),
+        migrations.RunSQL(
+            sql="CREATE INDEX timeslot_timeslot_creator_lower_period_id "
+                "ON timeslot_timeslot (creator_id, lower(period), id)",
+            reverse_sql="DROP INDEX timeslot_timeslot_creator_lower_period_id",
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-18 10:10
+
+from django.db import migrations, models
+import django.db.models.expressions
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timeslot', '0010_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='availabilitytemplate',
+            constraint=models.CheckConstraint(check=models.Q(start_time__lt=django.db.models.expressions.F('end_time')), name='availabilitytemplate_start_before_end'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.28 on 2026-10-18 10:26
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timeslot', '0011_availabilitytemplate_start_before_end'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='availabilitytemplate',
+            name='interval',
+            field=models.PositiveSmallIntegerField(default=1, help_text='Repeats every interval weeks', validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.AddConstraint(
+            model_name='availabilitytemplate',
+            constraint=models.CheckConstraint(check=models.Q(interval__gte=1), name='availabilitytemplate_interval_positive'),
+        ),
+    ]
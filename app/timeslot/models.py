@@ -1,17 +1,43 @@
-from django.db import models
+import bisect
+import collections
+import datetime
+
+from django.db import (
+    IntegrityError, connections, models, router, transaction
+)
 from django.contrib.postgres.fields import DateTimeRangeField
 from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator
+from django.utils import timezone
+
+from psycopg2.extras import DateTimeTZRange
+import pytz
 
+from utilities.cache import availability_cache
+from utilities.intervals import IntervalSet, subtract
+from utilities.metrics import timed
 from utilities.Exceptions.timeslot import *
+from . import sql
+from .constants import PERIOD_EXCLUSION
+from .ingest import ingest as ingest_slots
+
+
+def merge_comments(comments):
+    """ joins the non empty comments of merged slots, dropping
+    repeated ones"""
+    return '\n'.join(dict.fromkeys(c for c in comments if c))
 
 
 class TimeSlotManager(models.Manager):
 
-    def _create_new_slot(self, creator, period, **extra_fields):
+    def _create_new_slot(self, creator, period, coalesce=False,
+                         **extra_fields):
         """helper to create a new time slot"""
 
         # check if overlap exist with existing time slot
-        timeslot_qs = self.model.objects.filter(period__overlap=period)
+        timeslot_qs = self.model.objects.filter(creator=creator,
+                                                period__overlap=period)
         if timeslot_qs.exists():
             raise TimeSlotsOverlapError(timeslot_qs,
                                         "The time slot overlaps with an existing "
@@ -27,24 +53,296 @@ class TimeSlotManager(models.Manager):
             period=period,
             **extra_fields
         )
-        slot.save(using=self._db)
+        using = self._db or router.db_for_write(self.model)
+        try:
+            if coalesce:
+                with transaction.atomic(using=using):
+                    self._absorb_neighbours(slot, using)
+                    slot.save(using=using)
+            else:
+                with transaction.mark_for_rollback_on_error(using):
+                    slot.save(using=using)
+        except IntegrityError as e:
+            # a concurrent insert won the race for this period
+            constraint = getattr(getattr(e.__cause__, 'diag', None),
+                                 'constraint_name', None)
+            if constraint == PERIOD_EXCLUSION:
+                raise TimeSlotsOverlapError(timeslot_qs,
+                                            "The time slot overlaps with an "
+                                            "existing time slot")
+            raise
         return slot
 
-    def create(self, creator, period, **extra_fields):
-        """ creates a new time slot"""
-        slot = self._create_new_slot(creator, period, **extra_fields)
-        creator.timesheet.add(slot)
-        return slot
+    def _absorb_neighbours(self, slot, using):
+        """ widens an unsaved slot over the slots of its creator that
+        end where it starts or start where it ends, deleting them"""
+        neighbours = list(
+            self.using(using).select_for_update()
+            .filter(creator=slot.creator, period__adjacent_to=slot.period)
+            .order_by('period'))
+        if not neighbours:
+            return
+        slots = sorted(neighbours + [slot], key=lambda s: s.period.lower)
+        slot.period = DateTimeTZRange(slots[0].period.lower,
+                                      slots[-1].period.upper)
+        slot.comment = merge_comments(s.comment for s in slots)
+        self.using(using).filter(
+            pk__in=[s.pk for s in neighbours]).delete()
+
+    @timed('TimeSlotManager.create')
+    def create(self, creator, period, coalesce=None, **extra_fields):
+        """ creates a new time slot. With coalesce, the slot is merged
+        with the adjacent slots of its creator, defaults to the
+        TIMESLOT_COALESCE setting"""
+        if coalesce is None:
+            coalesce = getattr(settings, 'TIMESLOT_COALESCE', False)
+        return self._create_new_slot(creator, period, coalesce=coalesce,
+                                     **extra_fields)
+
+    def coalesce(self, creator=None):
+        """ merges the back to back slots of a creator, or of all
+        creators, into one slot per continuous block. The earliest slot
+        of a block is kept and widened. Returns the number of deleted
+        slots"""
+        using = self._db or router.db_for_write(self.model)
+        with transaction.atomic(using=using), \
+                connections[using].cursor() as cursor:
+            cursor.execute(sql.ADJACENT_BLOCKS, {
+                'creator_id': getattr(creator, 'pk', creator)})
+            blocks = cursor.fetchall()
+            if not blocks:
+                return 0
+            creator_ids, blocks = zip(*((b[0], b[1:]) for b in blocks))
+            kept = [ids[0] for ids, _, _, _ in blocks]
+            deleted = [pk for ids, _, _, _ in blocks for pk in ids[1:]]
+            cursor.execute('DELETE FROM timeslot_timeslot WHERE id = ANY(%s)',
+                           [deleted])
+            cursor.execute(sql.UPDATE_BLOCKS, [
+                kept,
+                [lower for _, lower, _, _ in blocks],
+                [upper for _, _, upper, _ in blocks],
+                [merge_comments(comments) for _, _, _, comments in blocks],
+            ])
+        availability_cache.invalidate(*set(creator_ids), using=using)
+        return len(deleted)
+
+    def ingest(self, records):
+        """ bulk loads time slots from records, see timeslot.ingest"""
+        return ingest_slots(self, records)
+
+    def interval_set(self, creator, window=None):
+        """ loads the time slots of a creator into an IntervalSet
+        keyed by the slot id. Given a window, only the slots around it
+        are loaded, along with the availability template occurrences
+        that are not materialized yet, keyed by None"""
+        slots = self.filter(creator=creator)
+        if window is not None:
+            slots = slots.filter(period__overlap=window)
+        periods = sorted(slots.values_list('period', 'id'),
+                         key=lambda slot: slot[0].lower)
+        intervals = [(period.lower, period.upper, pk)
+                     for period, pk in periods]
+        if window is not None:
+            occurrences = AvailabilityTemplate.objects.expand(
+                creator, window, exclude=[period for period, _ in periods])
+            intervals += [(period.lower, period.upper, None)
+                          for period in occurrences]
+        return IntervalSet(intervals)
+
+    def materialize(self, creator, window):
+        """ creates the time slots of the creator availability
+        templates overlapping the window, around the existing slots"""
+        existing = self.filter(creator=creator, period__overlap=window) \
+            .order_by('period').values_list('period', flat=True)
+        slots = [
+            self.model(creator=creator, period=period,
+                       comment=comment)
+            for period, comment in AvailabilityTemplate.objects.expand(
+                creator, window, exclude=existing, comments=True)
+        ]
+        using = self._db or router.db_for_write(self.model)
+        slots = self.using(using).bulk_create(slots)
+        if slots:
+            availability_cache.invalidate(creator.pk, using=using)
+        return slots
+
+    def materialize_many(self, windows):
+        """ materialize for many creators at once, windows maps creator
+        ids to their window. The templates and the existing slots are
+        loaded with a query each, the new slots created with one
+        bulk_create"""
+        if not windows:
+            return []
+        using = self._db or router.db_for_write(self.model)
+        span = DateTimeTZRange(min(w.lower for w in windows.values()),
+                               max(w.upper for w in windows.values()))
+        templates = collections.defaultdict(list)
+        for template in AvailabilityTemplate.objects.using(using).filter(
+                creator_id__in=windows).valid_in(span):
+            templates[template.creator_id].append(template)
+        if not templates:
+            return []
+        existing = collections.defaultdict(list)
+        for creator_id, period in self.using(using).filter(
+                creator_id__in=templates, period__overlap=span
+        ).order_by('period').values_list('creator_id', 'period'):
+            existing[creator_id].append(period)
+
+        slots = [
+            self.model(creator_id=creator_id, period=period, comment=comment)
+            for creator_id, creator_templates in templates.items()
+            for period, comment in expand_templates(
+                creator_templates, windows[creator_id],
+                exclude=existing[creator_id], comments=True)
+        ]
+        slots = self.using(using).bulk_create(slots)
+        availability_cache.invalidate(*{slot.creator_id for slot in slots},
+                                      using=using)
+        return slots
 
 
 class TimeSlot(models.Model):
     creator = models.ForeignKey(settings.AUTH_USER_MODEL,
                                 related_name='timeslots',
                                 on_delete=models.CASCADE)
-    period = DateTimeRangeField(unique=True)
+    period = DateTimeRangeField()
     comment = models.TextField(blank=True)
 
     objects = TimeSlotManager()
 
     def __str__(self):
         return f'{self.creator} @ {self.period}'
+
+
+class AvailabilityTemplateManager(models.Manager):
+
+    def expand(self, creator, window, exclude=(), comments=False):
+        """ the periods of the creator templates overlapping the
+        window, sorted and without the parts covered by the sorted
+        exclude periods. With comments, (period, comment) pairs are
+        returned"""
+        templates = self.filter(creator=creator).valid_in(window)
+        return expand_templates(templates, window, exclude, comments)
+
+
+class AvailabilityTemplateQuerySet(models.QuerySet):
+
+    def valid_in(self, window):
+        """ the templates that may have occurrences in the window"""
+        return self.filter(
+            models.Q(valid_until__isnull=True)
+            | models.Q(valid_until__gte=window.lower.date()
+                       - datetime.timedelta(days=1)),
+            valid_from__lte=window.upper.date() + datetime.timedelta(days=1),
+        )
+
+
+def expand_templates(templates, window, exclude=(), comments=False):
+    """ expands availability templates over a window, see
+    AvailabilityTemplateManager.expand"""
+    occurrences = sorted(
+        (period.lower, period.upper, template.comment)
+        for template in templates
+        for period in template.occurrences(window))
+    # overlapping templates are merged
+    merged = []
+    for lower, upper, comment in occurrences:
+        if merged and lower <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], upper)
+        else:
+            merged.append([lower, upper, comment])
+    parts = subtract(((lower, upper) for lower, upper, _ in merged),
+                     ((p.lower, p.upper) for p in exclude))
+    lowers = [lower for lower, _, _ in merged]
+    periods = []
+    for part in parts:
+        period = DateTimeTZRange(*part)
+        if comments:
+            comment = merged[bisect.bisect_right(lowers, part[0]) - 1][2]
+            period = (period, comment)
+        periods.append(period)
+    return periods
+
+
+def _localize(value, tz):
+    """ value in tz across the DST changes: the first of an ambiguous
+    time, and a time skipped by the clock moving forward is shifted by
+    the gap"""
+    try:
+        return timezone.make_aware(value, tz)
+    except pytz.AmbiguousTimeError:
+        return timezone.make_aware(value, tz, is_dst=True)
+    except pytz.NonExistentTimeError:
+        return tz.normalize(timezone.make_aware(value, tz, is_dst=False))
+
+
+class AvailabilityTemplate(models.Model):
+    """ A weekly recurring availability, in the spirit of an
+    RRULE with FREQ=WEEKLY, BYDAY, INTERVAL, DTSTART and UNTIL.
+    Times are local to the project time zone"""
+    WEEKDAYS = [
+        (0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'),
+        (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday'),
+    ]
+
+    creator = models.ForeignKey(settings.AUTH_USER_MODEL,
+                                related_name='availability_templates',
+                                on_delete=models.CASCADE)
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAYS)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    interval = models.PositiveSmallIntegerField(
+        default=1, validators=[MinValueValidator(1)],
+        help_text='Repeats every interval weeks')
+    valid_from = models.DateField()
+    valid_until = models.DateField(null=True, blank=True)
+    comment = models.TextField(blank=True)
+
+    objects = AvailabilityTemplateManager.from_queryset(
+        AvailabilityTemplateQuerySet)()
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(start_time__lt=models.F('end_time')),
+                name='availabilitytemplate_start_before_end'),
+            models.CheckConstraint(
+                check=models.Q(interval__gte=1),
+                name='availabilitytemplate_interval_positive'),
+        ]
+
+    def clean(self):
+        if self.start_time >= self.end_time:
+            raise ValidationError(
+                "The End time should be greater than the Start time")
+
+    def occurrences(self, window):
+        """ the periods of this template overlapping the window"""
+        tz = timezone.get_default_timezone()
+        first = self.valid_from + datetime.timedelta(
+            days=(self.weekday - self.valid_from.weekday()) % 7)
+        step = datetime.timedelta(weeks=self.interval)
+
+        # the first repetition that may overlap the window
+        start_day = timezone.localtime(window.lower, tz).date() \
+            - datetime.timedelta(days=1)
+        skipped = max(0, (start_day - first).days) // step.days
+        day = first + skipped * step
+        last_day = timezone.localtime(window.upper, tz).date()
+        if self.valid_until is not None:
+            last_day = min(last_day, self.valid_until)
+
+        periods = []
+        while day <= last_day:
+            lower = _localize(
+                datetime.datetime.combine(day, self.start_time), tz)
+            upper = _localize(
+                datetime.datetime.combine(day, self.end_time), tz)
+            if lower < window.upper and upper > window.lower:
+                periods.append(DateTimeTZRange(lower, upper))
+            day += step
+        return periods
+
+    def __str__(self):
+        return f'{self.creator} @ {self.get_weekday_display()} ' \
+            f'{self.start_time}-{self.end_time}'
@@ -0,0 +1,22 @@
+from rest_framework import serializers
+
+from utilities.Exceptions.timeslot import TimeSlotError
+from utilities.fields import DateTimeRangeField
+from .models import TimeSlot
+
+
+class TimeSlotSerializer(serializers.ModelSerializer):
+    period = DateTimeRangeField()
+
+    class Meta:
+        model = TimeSlot
+        fields = ['id', 'creator', 'period', 'comment']
+        read_only_fields = ['creator']
+
+    def create(self, validated_data):
+        """ creates the time slot for the requesting user"""
+        try:
+            return TimeSlot.objects.create(
+                self.context['request'].user, **validated_data)
+        except (TimeSlotError, ValueError) as e:
+            raise serializers.ValidationError({'period': [str(e)]})
@@ -0,0 +1,36 @@
+""" Raw SQL used by the time slot manager """
+
+# Groups the back to back slots of each creator into blocks, classic
+# gaps and islands: a slot starts a new block unless the previous slot
+# of its creator ends where it starts. Only blocks of several slots
+# are returned, with their slots in period order.
+ADJACENT_BLOCKS = """
+WITH ordered AS (
+    SELECT t.id, t.creator_id, t.period, t.comment,
+           CASE WHEN lag(upper(t.period)) OVER w = lower(t.period)
+                THEN 0 ELSE 1 END AS starts_block
+    FROM timeslot_timeslot t
+    WHERE %(creator_id)s::int IS NULL OR t.creator_id = %(creator_id)s
+    WINDOW w AS (PARTITION BY t.creator_id ORDER BY lower(t.period))
+), numbered AS (
+    SELECT o.*,
+           sum(o.starts_block) OVER (PARTITION BY o.creator_id
+                                     ORDER BY lower(o.period)) AS block
+    FROM ordered o
+)
+SELECT n.creator_id, array_agg(n.id ORDER BY lower(n.period)),
+       min(lower(n.period)), max(upper(n.period)),
+       array_agg(n.comment ORDER BY lower(n.period))
+FROM numbered n
+GROUP BY n.creator_id, n.block
+HAVING count(*) > 1
+"""
+
+# Widens the first slot of each block, once the others are deleted
+UPDATE_BLOCKS = """
+UPDATE timeslot_timeslot t
+SET period = tstzrange(b.lower, b.upper), comment = b.comment
+FROM unnest(%s::int[], %s::timestamptz[], %s::timestamptz[], %s::text[])
+     AS b(id, lower, upper, comment)
+WHERE t.id = b.id
+"""
@@ -0,0 +1,69 @@
+import datetime
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from timeslot.models import TimeSlot
+
+from utilities import samples
+
+
+class TimeSlotApiTests(TestCase):
+
+    def setUp(self):
+        self.creator = samples.sample_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.creator)
+
+    def test_create_timeslot(self):
+        """ To check that a slot is created for the requesting user
+        and an overlapping one is rejected"""
+        payload = {'period': {'lower': '2019-12-27T12:00:00Z',
+                              'upper': '2019-12-27T16:00:00Z'},
+                   'comment': 'afternoons'}
+
+        response = self.client.post('/api/timeslots/', payload,
+                                    format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(TimeSlot.objects.get().creator, self.creator)
+
+        response = self.client.post('/api/timeslots/', payload,
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('period', response.data)
+
+    def test_list_timeslots_invalid_creator(self):
+        response = self.client.get('/api/timeslots/?creator=abc')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('creator', response.data)
+
+    def test_list_timeslots_of_a_creator(self):
+        """ To check that the slots of a creator are listed by start
+        time over several pages"""
+        other = samples.sample_user(email='tito123@pluto.com')
+        samples.sample_timeslot(other)
+        for day in [29, 27, 28]:
+            samples.sample_timeslot(
+                self.creator, period=samples.sample_duration(
+                    start=datetime.datetime(2019, 12, day, 8, 0)))
+
+        first = self.client.get(
+            f'/api/timeslots/?creator={self.creator.pk}&page_size=2')
+        second = self.client.get(first.data['next'])
+
+        periods = [slot['period']['lower'] for slot in
+                   first.data['results'] + second.data['results']]
+        self.assertEqual(periods, ['2019-12-27T08:00:00Z',
+                                   '2019-12-28T08:00:00Z',
+                                   '2019-12-29T08:00:00Z'])
+        self.assertIsNone(second.data['next'])
+
+    def test_delete_timeslot_of_another_user(self):
+        """ To check that only the creator deletes a slot"""
+        other = samples.sample_user(email='tito123@pluto.com')
+        slot = samples.sample_timeslot(other)
+
+        response = self.client.delete(f'/api/timeslots/{slot.pk}/')
+
+        self.assertEqual(response.status_code, 403)
+        self.assertTrue(TimeSlot.objects.exists())
@@ -1,11 +1,18 @@
 import datetime
+import io
+import os
+import tempfile
 
-from django.test import TestCase
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
 from django.utils.timezone import make_aware
 
 from psycopg2.extras import DateTimeTZRange
 
-from timeslot.models import TimeSlot
+from timeslot.ingest import read_csv, read_jsonl
+from timeslot.models import AvailabilityTemplate, TimeSlot
 
 from utilities import samples
 from utilities.Exceptions.timeslot import *
@@ -65,3 +72,225 @@ class TimeSheetModelTests(TestCase):
                 creator=creator,
                 period=DateTimeTZRange(start2, end2)
             )
+
+    def test_timeslots_of_different_creators_can_overlap(self):
+        """ To check that time slot overlaps are only checked
+        against the slots of the same creator
+        """
+        creator1 = samples.sample_user()
+        creator2 = samples.sample_user(email='tito123@pluto.com')
+        period = samples.sample_duration()
+
+        TimeSlot.objects.create(creator=creator1, period=period)
+        TimeSlot.objects.create(creator=creator2, period=period)
+
+        self.assertEqual(TimeSlot.objects.all().count(), 2)
+        self.assertEqual(creator2.timesheet.get().period, period)
+
+    # Ingestion tests
+    def test_ingest_rejects_rows_without_aborting(self):
+        """ To check that bulk ingestion loads the valid rows and
+        reports the rejected ones
+        """
+        creator = samples.sample_user()
+        samples.sample_timeslot(creator)  # 12-16
+        stream = io.StringIO(
+            'creator,start,end,comment\n'
+            'tito@pluto.com,2019-12-28T08:00:00,2019-12-28T12:00:00,am\n'
+            'nobody@pluto.com,2019-12-28T08:00:00,2019-12-28T12:00:00,\n'
+            'tito@pluto.com,2019-12-28T11:00:00,2019-12-28T13:00:00,\n'
+            'tito@pluto.com,2019-12-27T15:00:00,2019-12-27T18:00:00,\n'
+            'tito@pluto.com,2019-12-28T14:00:00,2019-12-28T13:00:00,\n'
+            'tito@pluto.com,yesterday,2019-12-28T13:00:00,\n'
+            f'{creator.pk},2019-12-28T12:00:00,2019-12-28T16:00:00,pm\n'
+        )
+
+        result = TimeSlot.objects.ingest(read_csv(stream))
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual([row for row, _ in result.rejected],
+                         [2, 3, 4, 5, 6])
+        self.assertIsInstance(result.rejected[1][1], TimeSlotsOverlapError)
+        self.assertIsInstance(result.rejected[2][1], TimeSlotsOverlapError)
+        self.assertEqual(
+            list(creator.timesheet.order_by('period')
+                 .values_list('comment', flat=True)),
+            ['i am available for good price', 'am', 'pm'])
+
+    def test_ingest_rejects_malformed_json_lines(self):
+        """ To check that malformed, non object lines and non string
+        dates of a JSONL file are rejected row by row
+        """
+        creator = samples.sample_user()
+        stream = io.StringIO(
+            '{"creator": "tito@pluto.com", '
+            '"start": "2019-12-28T08:00:00", "end": "2019-12-28T12:00:00"}\n'
+            '{"creator": "tito@pluto.com", "start": \n'
+            '[1, 2]\n'
+            '"tito@pluto.com"\n'
+            f'{{"creator": {creator.pk}, "start": 1577520000, '
+            '"end": "2019-12-28T16:00:00"}\n'
+            '{"creator": "tito@pluto.com", '
+            '"start": "2019-12-28T14:00:00", "end": "2019-12-28T16:00:00"}\n'
+            # a digit that int() does not parse
+            '{"creator": "\u00b2", '
+            '"start": "2019-12-28T18:00:00", "end": "2019-12-28T20:00:00"}\n'
+        )
+
+        result = TimeSlot.objects.ingest(read_jsonl(stream))
+
+        self.assertEqual(result.created, 2)
+        self.assertEqual([row for row, _ in result.rejected],
+                         [2, 3, 4, 5, 7])
+        self.assertIsInstance(result.rejected[0][1], ValueError)
+        self.assertIsInstance(result.rejected[3][1], TypeError)
+        self.assertIn('Unknown creator', str(result.rejected[4][1]))
+        self.assertEqual(creator.timesheet.count(), 2)
+
+    def test_import_timeslots_command(self):
+        """ To check that the import command loads a JSONL file"""
+        creator = samples.sample_user()
+        handle, path = tempfile.mkstemp(suffix='.jsonl')
+        with os.fdopen(handle, 'w') as stream:
+            stream.write(
+                '{"creator": "tito@pluto.com", '
+                '"start": "2019-12-28T08:00:00+00:00", '
+                '"end": "2019-12-28T12:00:00+00:00"}\n')
+        self.addCleanup(os.remove, path)
+
+        out = io.StringIO()
+        call_command('import_timeslots', path, stdout=out)
+
+        self.assertIn('1 time slots created', out.getvalue())
+        self.assertEqual(creator.timesheet.count(), 1)
+
+    def test_availability_template_expansion(self):
+        """ To check that templates expand around the existing slots
+        e.g ==> template: fridays 10-18, every other week
+                slot: 2019-12-27 12-16
+        """
+        creator = samples.sample_user()
+        samples.sample_timeslot(creator)  # 12-16
+        AvailabilityTemplate.objects.create(
+            creator=creator, weekday=4, interval=2, comment='fortnightly',
+            start_time=datetime.time(10), end_time=datetime.time(18),
+            valid_from=datetime.date(2019, 12, 13),
+            valid_until=datetime.date(2020, 1, 20))
+        window = DateTimeTZRange(
+            make_aware(datetime.datetime(2019, 12, 1)),
+            make_aware(datetime.datetime(2020, 2, 1)))
+
+        slots = TimeSlot.objects.materialize(creator, window)
+
+        def at(day, hour):
+            return make_aware(datetime.datetime(*day, hour))
+        self.assertEqual(
+            sorted((slot.period.lower, slot.period.upper) for slot in slots),
+            [(at((2019, 12, 13), 10), at((2019, 12, 13), 18)),
+             (at((2019, 12, 27), 10), at((2019, 12, 27), 12)),
+             (at((2019, 12, 27), 16), at((2019, 12, 27), 18)),
+             (at((2020, 1, 10), 10), at((2020, 1, 10), 18))])
+        self.assertEqual(creator.timesheet.count(), 5)
+        # nothing is left to materialize
+        self.assertEqual(TimeSlot.objects.materialize(creator, window), [])
+
+    @override_settings(TIME_ZONE='America/New_York')
+    def test_availability_template_across_dst(self):
+        """ To check that templates expand on the days the clock changes
+        e.g ==> template: sundays 1:30-2:30
+                2019-11-03: 1:30 is ambiguous, the first one is taken
+                2020-03-08: 2:30 is skipped, shifted to 3:30
+        """
+        creator = samples.sample_user()
+        template = AvailabilityTemplate.objects.create(
+            creator=creator, weekday=6,
+            start_time=datetime.time(1, 30), end_time=datetime.time(2, 30),
+            valid_from=datetime.date(2019, 11, 3))
+        window = DateTimeTZRange(
+            datetime.datetime(2019, 11, 3, tzinfo=datetime.timezone.utc),
+            datetime.datetime(2020, 3, 9, tzinfo=datetime.timezone.utc))
+
+        periods = template.occurrences(window)
+
+        def utc(*args):
+            return datetime.datetime(*args, tzinfo=datetime.timezone.utc)
+        self.assertEqual((periods[0].lower, periods[0].upper),
+                         (utc(2019, 11, 3, 5, 30), utc(2019, 11, 3, 7, 30)))
+        self.assertEqual((periods[-1].lower, periods[-1].upper),
+                         (utc(2020, 3, 8, 6, 30), utc(2020, 3, 8, 7, 30)))
+
+    def test_availability_template_start_before_end(self):
+        """ To check that the database rejects templates ending before
+        they start"""
+        with self.assertRaises(IntegrityError):
+            AvailabilityTemplate.objects.create(
+                creator=samples.sample_user(), weekday=4,
+                start_time=datetime.time(18), end_time=datetime.time(10),
+                valid_from=datetime.date(2019, 12, 1))
+
+    def test_availability_template_interval_positive(self):
+        """ To check that templates repeating every 0 weeks are
+        rejected, by validation and by the database"""
+        template = AvailabilityTemplate(
+            creator=samples.sample_user(), weekday=4, interval=0,
+            start_time=datetime.time(10), end_time=datetime.time(18),
+            valid_from=datetime.date(2019, 12, 1))
+        with self.assertRaises(ValidationError):
+            template.full_clean()
+        with self.assertRaises(IntegrityError):
+            template.save()
+
+    def test_create_coalesced_timeslot(self):
+        """ To check that a coalesced slot absorbs the adjacent slots
+        of its creator only
+        e.g ==> slots: 8-12, 16-20, other user 12-16
+                new: 12-16
+        """
+        creator = samples.sample_user()
+        other = samples.sample_user(email='tito123@pluto.com')
+        samples.sample_timeslot(creator, start=datetime.datetime(
+            2019, 12, 27, 8, 0), end=datetime.datetime(2019, 12, 27, 12, 0))
+        samples.sample_timeslot(creator, start=datetime.datetime(
+            2019, 12, 27, 16, 0), end=datetime.datetime(2019, 12, 27, 20, 0))
+        samples.sample_timeslot(other)  # 12-16
+
+        slot = TimeSlot.objects.create(
+            creator, samples.sample_duration(), coalesce=True,
+            comment='afternoons')
+
+        self.assertEqual(slot.period, samples.sample_duration(
+            start=datetime.datetime(2019, 12, 27, 8, 0), delta=12))
+        self.assertEqual(slot.comment,
+                         'i am available for good price\nafternoons')
+        self.assertEqual(list(creator.timesheet.all()), [slot])
+        self.assertEqual(other.timesheet.count(), 1)
+
+    def test_coalesce_timeslots_command(self):
+        """ To check that the compaction merges each continuous block
+        into its earliest slot
+        e.g ==> slots: 8-10, 10-12, 12-14, 16-18, 18-20, 22-23
+        """
+        creator = samples.sample_user()
+        other = samples.sample_user(email='tito123@pluto.com')
+        for start, end, comment in [(8, 10, 'a'), (10, 12, ''),
+                                    (12, 14, 'b'), (16, 18, 'a'),
+                                    (18, 20, 'a'), (22, 23, 'c')]:
+            TimeSlot.objects.create(creator, samples.sample_duration(
+                start=datetime.datetime(2019, 12, 27, start, 0),
+                delta=end - start), comment=comment)
+        first = TimeSlot.objects.order_by('period').first()
+        samples.sample_timeslot(other, start=datetime.datetime(
+            2019, 12, 27, 14, 0), end=datetime.datetime(2019, 12, 27, 16, 0))
+
+        out = io.StringIO()
+        call_command('coalesce_timeslots', stdout=out)
+
+        self.assertIn('3 time slots merged', out.getvalue())
+        slots = creator.timesheet.order_by('period')
+        self.assertEqual(
+            [(s.period.lower.hour, s.period.upper.hour, s.comment)
+             for s in slots],
+            [(8, 14, 'a\nb'), (16, 20, 'a'), (22, 23, 'c')])
+        self.assertEqual(slots[0].pk, first.pk)
+        self.assertEqual(other.timesheet.count(), 1)
+        self.assertEqual(TimeSlot.objects.coalesce(creator), 0)
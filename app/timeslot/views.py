@@ -1,3 +1,37 @@
-# from django.shortcuts import render
+from django.db.models import F
+from rest_framework import mixins, viewsets
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.permissions import IsAuthenticated
 
-# Create your views here.
+from utilities.pagination import KeysetPagination, RangeLower
+from utilities.params import id_param
+from .models import TimeSlot
+from .serializers import TimeSlotSerializer
+
+
+class TimeSlotViewSet(mixins.CreateModelMixin,
+                      mixins.ListModelMixin,
+                      mixins.RetrieveModelMixin,
+                      mixins.DestroyModelMixin,
+                      viewsets.GenericViewSet):
+    """ the time slots of all executors by start time, ?creator=
+    narrows them to one executor"""
+    serializer_class = TimeSlotSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    # see utilities.instrumentation, session authentication takes 2
+    query_budgets = {'list': 3, 'retrieve': 3, 'create': 5, 'destroy': 5}
+    # served by the lower(period), id indexes of migration 0010
+    keyset = [('start', RangeLower('period')), ('id', F('id'))]
+
+    def get_queryset(self):
+        queryset = TimeSlot.objects.all()
+        creator = id_param(self.request, 'creator')
+        if creator is not None:
+            queryset = queryset.filter(creator_id=creator)
+        return queryset
+
+    def perform_destroy(self, instance):
+        if instance.creator_id != self.request.user.pk:
+            raise PermissionDenied("You can only delete your time slots")
+        instance.delete()
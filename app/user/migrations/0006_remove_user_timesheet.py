@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('timeslot', '0007_auto_20190927_0347'),
+        ('user', '0005_user_timesheet'),
+    ]
+
+    operations = [
+        # the timesheet owner becomes the slot creator, which is
+        # what availability lookups go through from now on
+        migrations.RunSQL(
+            sql="UPDATE timeslot_timeslot t SET creator_id = ut.user_id "
+                "FROM user_user_timesheet ut "
+                "WHERE ut.timeslot_id = t.id AND t.creator_id <> ut.user_id",
+            reverse_sql="INSERT INTO user_user_timesheet (user_id, timeslot_id) "
+                        "SELECT creator_id, id FROM timeslot_timeslot",
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='timesheet',
+        ),
+    ]
@@ -5,8 +5,6 @@ from django.contrib.auth.models import (
 from django.core.mail import send_mail
 from django.utils.translation import ugettext_lazy as _
 
-from timeslot.models import TimeSlot
-
 
 class UserManager(BaseUserManager):
     use_in_migrations = True
@@ -70,7 +68,6 @@ class User(AbstractBaseUser, PermissionsMixin):
                                       null=True, blank=True)
     phone_number = models.CharField(_('phone number'), max_length=15,
                                     blank=True)
-    timesheet = models.ManyToManyField(TimeSlot)
 
     objects = UserManager()
 
@@ -84,6 +81,13 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return f'{self.email}'
 
+    @property
+    def timesheet(self):
+        """
+        The time slots created by this User.
+        """
+        return self.timeslots
+
     def get_full_name(self):
         '''
         Returns the first_name plus the last_name, with a space in between.
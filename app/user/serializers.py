@@ -0,0 +1,12 @@
+from django.contrib.auth import get_user_model
+from rest_framework import serializers
+
+
+class UserSummarySerializer(serializers.ModelSerializer):
+    """ the user fields shown next to a job or a review, see
+    job.models.USER_SUMMARY_FIELDS"""
+
+    class Meta:
+        model = get_user_model()
+        fields = ['id', 'email', 'first_name', 'last_name']
+        read_only_fields = fields
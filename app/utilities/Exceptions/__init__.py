@@ -1 +1 @@
-__all__ = ['job', 'timeslot']
+__all__ = ['instrumentation', 'job', 'timeslot']
@@ -0,0 +1,8 @@
+class QueryBudgetExceeded(AssertionError):
+    """ A view or a code path ran more queries than its budget"""
+
+    def __init__(self, name, count, limit, msg):
+        AssertionError.__init__(self, msg)
+        self.name = name
+        self.count = count
+        self.limit = limit
@@ -29,3 +29,20 @@ class JobUnknownError(JobError):
     def __init__(self, msg):
         JobError.__init__(self, msg)
 
+
+class JobStatusError(JobError):
+    """ A job status change that the state machine does not allow"""
+
+    def __init__(self, current, target, msg):
+        JobError.__init__(self, msg)
+        self.current = current
+        self.target = target
+
+
+class JobStatusConflictError(JobError):
+    """ The job status was changed by someone else in between"""
+
+    def __init__(self, job, expected, msg):
+        JobError.__init__(self, msg)
+        self.job = job
+        self.expected = expected
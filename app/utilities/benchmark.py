@@ -0,0 +1,61 @@
+""" A small benchmark runner recording wall time and query counts,
+compared against a stored baseline """
+import json
+import math
+import statistics
+import time
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def measure(operation, arguments):
+    """ calls operation once per argument, returns the mean and 95th
+    percentile wall time in milliseconds and the mean query count"""
+    timings = []
+    queries = 0
+    for argument in arguments:
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            operation(argument)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries += len(captured)
+    timings.sort()
+    return {
+        'ms': round(statistics.mean(timings), 3),
+        'p95_ms': round(timings[math.ceil(0.95 * len(timings)) - 1], 3),
+        'queries': round(queries / len(timings), 2),
+    }
+
+
+def regressions(results, baseline, tolerance=0.5):
+    """ the (size, case, reason) of the results worse than the
+    baseline: more queries, or a mean time more than tolerance above
+    it. Results and baseline map sizes to cases to measures"""
+    found = []
+    for size, cases in results.items():
+        for case, result in cases.items():
+            expected = baseline.get(size, {}).get(case)
+            if expected is None:
+                continue
+            if result['queries'] > expected['queries']:
+                found.append((size, case, f"{result['queries']} queries, "
+                                          f"baseline {expected['queries']}"))
+            if result['ms'] > expected['ms'] * (1 + tolerance):
+                found.append((size, case, f"{result['ms']} ms, "
+                                          f"baseline {expected['ms']}"))
+    return found
+
+
+def load(path):
+    try:
+        with open(path) as stream:
+            return json.load(stream)
+    except FileNotFoundError:
+        return {}
+
+
+def save(path, results):
+    with open(path, 'w') as stream:
+        json.dump(results, stream, indent=2, sort_keys=True)
+        stream.write('\n')
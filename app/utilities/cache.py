@@ -0,0 +1,87 @@
+""" Per executor cache of availability results """
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import transaction
+
+from utilities import metrics
+
+
+class AvailabilityCache:
+    """ Caches results computed from the time slots, templates and
+    jobs of an executor, in the cache named by the AVAILABILITY_CACHE
+    setting. Eviction is left to the backend, e.g TIMEOUT and
+    MAX_ENTRIES of the locmem backend.
+
+    Every executor has a generation token stored next to the results,
+    results are keyed by it. Invalidating an executor replaces the
+    token, so its results are never read again and age out of the
+    backend.
+    """
+
+    def __init__(self, alias=None):
+        self._alias = alias
+        self._lock = threading.Lock()
+        self._counts = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    @property
+    def cache(self):
+        return caches[self._alias or settings.AVAILABILITY_CACHE]
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+        # summed over the worker processes at /metrics
+        metrics.registry.cache_event(name)
+
+    def _generation(self, executor_id):
+        """ the current generation token of an executor"""
+        key = f'availability:{executor_id}'
+        generation = self.cache.get(key)
+        if generation is None:
+            self.cache.add(key, uuid.uuid4().hex, timeout=None)
+            generation = self.cache.get(key)
+        return generation
+
+    def get_or_set(self, executor_id, key, compute, timeout=DEFAULT_TIMEOUT):
+        """ the cached result of key for an executor, compute is
+        called on a miss"""
+        key = f'availability:{executor_id}:{self._generation(executor_id)}' \
+            f':{key}'
+        result = self.cache.get(key)
+        if result is not None:
+            self._count('hits')
+            return result
+        self._count('misses')
+        result = compute()
+        self.cache.set(key, result, timeout)
+        return result
+
+    def invalidate(self, *executor_ids, using=None):
+        """ drops the cached results of the executors, now and again
+        when the current transaction commits so that results computed
+        from the old rows in between are dropped too"""
+        def drop():
+            self.cache.delete_many(
+                [f'availability:{pk}' for pk in executor_ids])
+        if not executor_ids:
+            return
+        self._count('invalidations')
+        drop()
+        transaction.on_commit(drop, using=using)
+
+    def stats(self):
+        """ the hit, miss and invalidation counters of this process"""
+        with self._lock:
+            return dict(self._counts)
+
+    def reset_stats(self):
+        with self._lock:
+            for name in self._counts:
+                self._counts[name] = 0
+
+
+availability_cache = AvailabilityCache()
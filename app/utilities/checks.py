@@ -0,0 +1,33 @@
+""" System checks of the deployment settings """
+from django.conf import settings
+from django.core.checks import Warning, register
+
+LOCMEM = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+def _shared_caches():
+    """ the aliases of the caches invalidated across the worker
+    processes, the default one holds the replica pins"""
+    aliases = [settings.AVAILABILITY_CACHE]
+    if settings.REPLICAS:
+        aliases.append('default')
+    return aliases
+
+
+@register(deploy=True)
+def check_shared_caches(app_configs, **kwargs):
+    """ a locmem cache is local to its process, the invalidations of
+    one worker do not reach the others"""
+    errors = []
+    for alias in _shared_caches():
+        if not settings.DEBUG and \
+                settings.CACHES[alias]['BACKEND'] == LOCMEM:
+            errors.append(Warning(
+                f"The {alias!r} cache is local to each process",
+                hint="Invalidations do not reach the other worker "
+                     "processes, configure a shared backend in the "
+                     "caches section of the settings unless the "
+                     "server runs a single process.",
+                id='utilities.W001',
+            ))
+    return errors
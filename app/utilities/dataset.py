@@ -0,0 +1,222 @@
+""" Deterministic synthetic data sets of realistic shape, loaded with
+COPY. See the generate_dataset command """
+import csv
+import datetime
+import io
+import random
+
+from django.db import connection
+
+from job.constants import (
+    JOB_CANCELLED, JOB_COMPLETE, JOB_INCOMPLETE, PAYMENT_PAID,
+    PAYMENT_PENDING, RECESS_HOUR
+)
+
+RECESS = datetime.timedelta(hours=RECESS_HOUR)
+HOUR = datetime.timedelta(hours=1)
+
+# slot lengths in hours and their weights, half days dominate
+SLOT_HOURS = [1, 2, 3, 4, 6, 8]
+SLOT_WEIGHTS = [5, 20, 20, 30, 15, 10]
+# the gap in hours before the next slot of a day, 0 being back to back
+GAP_HOURS = [0, 1, 2, 4]
+GAP_WEIGHTS = [30, 30, 25, 15]
+JOB_HOURS = [1, 2, 3, 4]
+JOB_WEIGHTS = [35, 35, 20, 10]
+# review ratings 1 to 5
+RATING_WEIGHTS = [5, 5, 15, 35, 40]
+# the share of the jobs of an executor already done
+PAST_FRACTION = 0.8
+
+USER_COLUMNS = [
+    'email', 'password', 'first_name', 'last_name', 'mode', 'gender',
+    'location', 'is_active', 'is_staff', 'is_admin', 'is_superuser',
+    'date_joined', 'date_updated', 'headline', 'about_me', 'phone_number',
+]
+SLOT_COLUMNS = ['creator_id', 'period', 'comment']
+JOB_COLUMNS = [
+    'creator_id', 'executor_id', 'price', 'type', 'duration', 'recess',
+    'comment', 'job_status', 'payment_status',
+]
+JOB_TYPES = ['turnover', 'cleaning', 'laundry', 'inspection']
+
+CREATE_REVIEWS = """
+INSERT INTO review_review (creator_id, executor_id, job_id, rating, note)
+SELECT j.creator_id, j.executor_id, j.id,
+       CASE WHEN r < %(r1)s THEN 1 WHEN r < %(r2)s THEN 2
+            WHEN r < %(r3)s THEN 3 WHEN r < %(r4)s THEN 4 ELSE 5 END,
+       ''
+FROM (SELECT p.*, random() AS r
+      FROM (SELECT j.*
+            FROM (SELECT * FROM job_job
+                  WHERE job_status = %(complete)s
+                    AND executor_id = ANY(%(executor_ids)s)
+                  ORDER BY id) j
+            ORDER BY random()
+            LIMIT %(limit)s) p) j
+"""
+
+
+def _range(lower, upper):
+    return f'[{lower.isoformat()},{upper.isoformat()})'
+
+
+def copy_rows(cursor, table, columns, rows, batch_size):
+    """ loads rows with COPY, batch_size rows at a time so memory
+    does not grow with the data set. Returns the row count"""
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN " \
+        f"WITH (FORMAT csv)"
+    count = 0
+    buffer = io.StringIO()
+    # quoted, empty strings are not read as NULL
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % batch_size == 0:
+            buffer.seek(0)
+            cursor.copy_expert(statement, buffer)
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        buffer.seek(0)
+        cursor.copy_expert(statement, buffer)
+    return count
+
+
+def user_rows(emails, joined):
+    for email in emails:
+        yield [email, '', '', '', '', '', '', True, False, False, False,
+               joined, joined, '', '', '']
+
+
+def shares(total, weights):
+    """ splits total in integer parts proportional to weights"""
+    scale = total / sum(weights)
+    parts = [int(weight * scale) for weight in weights]
+    for n in range(total - sum(parts)):
+        parts[n % len(parts)] += 1
+    return parts
+
+
+def executor_profiles(count, timeslots, jobs, rnd):
+    """ (slot count, jobs per slot, working day probability) per
+    executor. Workloads are log-normal, a few executors offer most of
+    the slots, and busy executors get more of their slots booked"""
+    workloads = [min(rnd.lognormvariate(0, 0.75), 8) for _ in range(count)]
+    mean = sum(workloads) / count
+    ratio = jobs / timeslots if timeslots else 0
+    return [(slot_count, ratio * min(workload / mean, 2),
+             rnd.uniform(0.4, 1.0))
+            for slot_count, workload in
+            zip(shares(timeslots, workloads), workloads)]
+
+
+def schedule(start, profile, rnd):
+    """ the slots and jobs of an executor as lists of (lower, upper).
+    Slots are chained within a working day, jobs sit inside the slots
+    and keep the recess between them"""
+    slot_count, jobs_per_slot, day_probability = profile
+    slots, jobs = [], []
+    free_from = start
+    day = start
+    while len(slots) < slot_count:
+        day += datetime.timedelta(days=1)
+        if rnd.random() >= day_probability:
+            continue
+        lower = day + HOUR * rnd.randint(6, 12)
+        end_of_day = day + HOUR * 22
+        for _ in range(rnd.choice([1, 1, 2, 3])):
+            upper = lower + HOUR * rnd.choices(SLOT_HOURS, SLOT_WEIGHTS)[0]
+            if upper > end_of_day or len(slots) == slot_count:
+                break
+            slots.append((lower, upper))
+            cursor = max(lower, free_from)
+            # the whole part of jobs_per_slot plus one more by chance
+            attempts = int(jobs_per_slot) + \
+                (rnd.random() < jobs_per_slot % 1)
+            for _ in range(attempts):
+                job_upper = cursor + HOUR * rnd.choices(JOB_HOURS,
+                                                        JOB_WEIGHTS)[0]
+                if job_upper > upper:
+                    break
+                jobs.append((cursor, job_upper))
+                free_from = job_upper + RECESS
+                cursor = free_from + HOUR * rnd.choice([0, 0, 1])
+            lower = upper + HOUR * rnd.choices(GAP_HOURS, GAP_WEIGHTS)[0]
+    return slots, jobs
+
+
+def job_status(past, rnd):
+    """ past jobs are mostly complete and paid, later ones pending"""
+    if not past:
+        return JOB_INCOMPLETE, PAYMENT_PENDING
+    if rnd.random() < 0.1:
+        return JOB_CANCELLED, PAYMENT_PENDING
+    return JOB_COMPLETE, PAYMENT_PAID if rnd.random() < 0.7 \
+        else PAYMENT_PENDING
+
+
+def generate(users, timeslots, jobs, reviews, start, executor_share=0.2,
+             seed=1, prefix='gen', batch_size=10000):
+    """ creates the users, slots, jobs and reviews of a synthetic data
+    set, the same seed giving the same data. jobs and reviews are upper
+    bounds, a slot only takes the jobs fitting in it. Returns the row
+    counts"""
+    rnd = random.Random(seed)
+    executors = max(1, round(users * executor_share))
+    creators = max(1, users - executors)
+    counts = {}
+    with connection.cursor() as cursor:
+        emails = [f'{prefix}-executor{n}@pluto.com' for n in range(executors)]
+        emails += [f'{prefix}-creator{n}@pluto.com' for n in range(creators)]
+        counts['users'] = copy_rows(cursor, 'user_user', USER_COLUMNS,
+                                    user_rows(emails, start), batch_size)
+        cursor.execute('SELECT email, id FROM user_user WHERE email = ANY(%s)',
+                       [emails])
+        ids = dict(cursor.fetchall())
+        executor_ids = [ids[email] for email in emails[:executors]]
+        creator_ids = [ids[email] for email in emails[executors:]]
+
+        profiles = executor_profiles(executors, timeslots, jobs, rnd)
+        booked = []
+
+        def slot_rows():
+            for executor_id, profile in zip(executor_ids, profiles):
+                slots, executor_jobs = schedule(start, profile, rnd)
+                booked.append((executor_id, executor_jobs))
+                for lower, upper in slots:
+                    yield [executor_id, _range(lower, upper), '']
+
+        def job_rows():
+            count = 0
+            for executor_id, executor_jobs in booked:
+                past = len(executor_jobs) * PAST_FRACTION
+                for n, (lower, upper) in enumerate(executor_jobs):
+                    if count == jobs:
+                        return
+                    count += 1
+                    status, payment = job_status(n < past, rnd)
+                    price = round(min(rnd.lognormvariate(4, 0.5), 999), 2)
+                    yield [rnd.choice(creator_ids), executor_id, price,
+                           rnd.choice(JOB_TYPES), _range(lower, upper),
+                           _range(upper, upper + RECESS), '', status,
+                           payment]
+                # written, no need to keep them
+                executor_jobs.clear()
+
+        counts['timeslots'] = copy_rows(cursor, 'timeslot_timeslot',
+                                        SLOT_COLUMNS, slot_rows(), batch_size)
+        counts['jobs'] = copy_rows(cursor, 'job_job', JOB_COLUMNS,
+                                   job_rows(), batch_size)
+
+        # reviews are drawn in SQL, seeded for determinism
+        cursor.execute('SELECT setseed(%s)', [rnd.random() * 2 - 1])
+        total = sum(RATING_WEIGHTS)
+        bounds = [sum(RATING_WEIGHTS[:n + 1]) / total for n in range(4)]
+        cursor.execute(CREATE_REVIEWS, {
+            'r1': bounds[0], 'r2': bounds[1], 'r3': bounds[2],
+            'r4': bounds[3], 'complete': JOB_COMPLETE,
+            'executor_ids': executor_ids, 'limit': reviews})
+        counts['reviews'] = cursor.rowcount
+    return counts
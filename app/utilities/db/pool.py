@@ -0,0 +1,201 @@
+""" Pools of PostgreSQL connections shared by the threads of a process,
+see the utilities.db.pooled backend """
+import json
+import os
+import threading
+import time
+
+import psycopg2
+from psycopg2 import pool
+
+_pools = {}
+_lock = threading.Lock()
+_pid = os.getpid()
+# the pools inherited from the parent of a forked process, kept alive
+# so that collecting them does not close the sockets the parent uses
+_inherited = []
+
+
+class ConnectionPool(pool.ThreadedConnectionPool):
+    """ psycopg2's threaded pool with a health check on checkout, a
+    maximum connection lifetime and counters.
+
+    Up to maxconn connections are open and kept idle between
+    checkouts, those above minconn are closed once idle for
+    idle_timeout seconds. A checkout waits up to timeout seconds for a
+    free connection. A connection idle for check_after seconds or more
+    is pinged before it is handed out, one older than max_lifetime is
+    closed.
+    """
+
+    def __init__(self, minconn, maxconn, max_lifetime=1800, check_after=30,
+                 timeout=10, idle_timeout=300, **kwargs):
+        self.max_lifetime = max_lifetime
+        self.idle_timeout = idle_timeout
+        self.check_after = check_after
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._created = {}
+        self._returned = {}
+        self._counts = {'connects': 0, 'checkouts': 0, 'expired': 0,
+                        'broken': 0, 'timeouts': 0, 'idle_closed': 0}
+        super().__init__(minconn, maxconn, **kwargs)
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def _connect(self, key=None):
+        # under the pool lock, or in __init__
+        conn = super()._connect(key)
+        self._created[id(conn)] = time.monotonic()
+        if key is None:
+            # created idle by __init__
+            self._returned[id(conn)] = self._created[id(conn)]
+        self._counts['connects'] += 1
+        return conn
+
+    def _putconn(self, conn, key=None, close=False):
+        # under the pool lock. psycopg2 closes the connections given
+        # back when minconn are idle, they are kept up to maxconn and
+        # closed by _close_idle instead
+        minconn, self.minconn = self.minconn, self.maxconn
+        try:
+            super()._putconn(conn, key, close)
+        finally:
+            self.minconn = minconn
+
+    def _close_idle(self):
+        """ closes the connections above minconn idle for idle_timeout
+        seconds, getconn takes the most recently returned first"""
+        now = time.monotonic()
+        with self._lock:
+            while len(self._pool) > self.minconn and now - self._returned[
+                    id(self._pool[0])] >= self.idle_timeout:
+                conn = self._pool.pop(0)
+                conn.close()
+                self._created.pop(id(conn), None)
+                self._returned.pop(id(conn), None)
+                self._counts['idle_closed'] += 1
+
+    def _expired(self, conn):
+        return time.monotonic() - self._created[id(conn)] >= \
+            self.max_lifetime
+
+    def _healthy(self, conn):
+        if conn.closed:
+            return False
+        idle = time.monotonic() - self._returned[id(conn)]
+        if idle < self.check_after:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if not conn.autocommit:
+                conn.rollback()
+        except psycopg2.Error:
+            return False
+        return True
+
+    def _discard(self, conn, reason):
+        self._count(reason)
+        self._created.pop(id(conn), None)
+        self._returned.pop(id(conn), None)
+        self.putconn(conn, close=True)
+
+    def checkout(self):
+        """ a healthy connection, waiting for one when all are used"""
+        if not self._slots.acquire(timeout=self.timeout):
+            self._count('timeouts')
+            raise pool.PoolError('connection pool exhausted')
+        try:
+            while True:
+                conn = self.getconn()
+                if id(conn) not in self._returned:
+                    # just connected
+                    self._count('checkouts')
+                    return conn
+                if self._expired(conn):
+                    self._discard(conn, 'expired')
+                elif not self._healthy(conn):
+                    self._discard(conn, 'broken')
+                else:
+                    self._count('checkouts')
+                    return conn
+        except Exception:
+            self._slots.release()
+            raise
+
+    def checkin(self, conn):
+        """ gives back a connection, it is rolled back or closed by
+        putconn when left in a transaction"""
+        try:
+            if conn.closed or self._expired(conn):
+                self._discard(conn, 'expired' if not conn.closed
+                              else 'broken')
+            else:
+                self._returned[id(conn)] = time.monotonic()
+                self.putconn(conn)
+                if conn.closed:
+                    # closed by putconn, the server connection was lost
+                    self._created.pop(id(conn), None)
+                    self._returned.pop(id(conn), None)
+                self._close_idle()
+        finally:
+            self._slots.release()
+
+    def stats(self):
+        """ the open, idle and used connections and the counters"""
+        with self._lock:
+            return dict(self._counts, idle=len(self._pool),
+                        used=len(self._used),
+                        open=len(self._pool) + len(self._used))
+
+
+def _forget_inherited():
+    """ drops the pools created before a fork, under the lock. A
+    forked worker opens its own connections"""
+    global _pid
+    if _pid != os.getpid():
+        _pid = os.getpid()
+        _inherited.extend(_pools.values())
+        _pools.clear()
+
+
+def get_pool(alias, conn_params, options):
+    """ the pool of a database alias and connection parameters,
+    created on first use from the POOL settings of the database"""
+    key = (alias, json.dumps(conn_params, sort_keys=True, default=str))
+    with _lock:
+        _forget_inherited()
+        if key not in _pools:
+            _pools[key] = ConnectionPool(
+                options.get('MIN_SIZE', 1), options.get('MAX_SIZE', 10),
+                max_lifetime=options.get('MAX_LIFETIME', 1800),
+                check_after=options.get('CHECK_AFTER', 30),
+                timeout=options.get('TIMEOUT', 10),
+                idle_timeout=options.get('IDLE_TIMEOUT', 300),
+                **conn_params)
+        return _pools[key]
+
+
+def stats():
+    """ the stats of the pools of this process by alias and database"""
+    with _lock:
+        _forget_inherited()
+        return {(alias, json.loads(params).get('database')):
+                connection_pool.stats()
+                for (alias, params), connection_pool in _pools.items()}
+
+
+def close_pools(database=None, alias=None):
+    """ closes the pools, only those of a database name or alias if
+    given"""
+    with _lock:
+        _forget_inherited()
+        for (key_alias, params), connection_pool in list(_pools.items()):
+            if alias not in (None, key_alias) or database not in (
+                    None, json.loads(params).get('database')):
+                continue
+            connection_pool.closeall()
+            del _pools[(key_alias, params)]
@@ -0,0 +1,101 @@
+""" Set based synthetic data factories, the bulk counterparts of
+utilities.samples for benchmarks and load tests.
+
+Executors get 2 hour slots every 3 hours from start, the slot k of an
+executor covering [3k, 3k + 2) hours. Jobs take the first hour of the
+even slots, so the odd slots and the 1 hour gaps are left free.
+"""
+import datetime
+
+from django.db import connection
+from django.utils.timezone import make_aware
+
+from psycopg2.extras import DateTimeTZRange
+
+from job.constants import RECESS_HOUR
+
+START = make_aware(datetime.datetime(2019, 1, 1))
+SLOT_EVERY = datetime.timedelta(hours=3)
+SLOT_LENGTH = datetime.timedelta(hours=2)
+JOB_LENGTH = datetime.timedelta(hours=1)
+
+CREATE_USERS = """
+INSERT INTO user_user (email, password, first_name, last_name, mode,
+                       gender, location, is_active, is_staff, is_admin,
+                       is_superuser, date_joined, date_updated, headline,
+                       about_me, phone_number)
+SELECT %(prefix)s || g || '@pluto.com', '', '', '', '', '', '', true,
+       false, false, false, now(), now(), '', '', ''
+FROM generate_series(1, %(count)s) g
+RETURNING id
+"""
+
+CREATE_SLOTS = """
+INSERT INTO timeslot_timeslot (creator_id, period, comment)
+SELECT e.id,
+       tstzrange(%(start)s + k * %(every)s,
+                 %(start)s + k * %(every)s + %(length)s),
+       ''
+FROM unnest(%(executor_ids)s::int[]) e(id),
+     generate_series(0, %(per_executor)s - 1) k
+"""
+
+CREATE_JOBS = """
+INSERT INTO job_job (creator_id, executor_id, price, type, duration,
+                     recess, comment, job_status, payment_status)
+SELECT %(creator_id)s, e.id, 10 + k %% 90, 'turnover',
+       tstzrange(%(start)s + k * %(every)s,
+                 %(start)s + k * %(every)s + %(length)s),
+       tstzrange(%(start)s + k * %(every)s + %(length)s,
+                 %(start)s + k * %(every)s + %(length)s + %(recess)s),
+       '', 'incomplete', 'pending'
+FROM unnest(%(executor_ids)s::int[]) e(id),
+     generate_series(0, %(per_executor)s - 1, 2) k
+"""
+
+
+def slot_period(k):
+    """ the period of the slot k of an executor"""
+    lower = START + k * SLOT_EVERY
+    return DateTimeTZRange(lower, lower + SLOT_LENGTH)
+
+
+def create_users(count, prefix='bench'):
+    """ creates count users named <prefix><n>@pluto.com, returns
+    their ids"""
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_USERS, {'prefix': prefix, 'count': count})
+        return [pk for pk, in cursor.fetchall()]
+
+
+def create_slots(executor_ids, per_executor):
+    """ creates per_executor slots for each executor"""
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_SLOTS, {
+            'executor_ids': list(executor_ids), 'per_executor': per_executor,
+            'start': START, 'every': SLOT_EVERY, 'length': SLOT_LENGTH})
+
+
+def create_jobs(creator_id, executor_ids, per_executor):
+    """ books the first hour of the even slots of each executor, see
+    create_slots"""
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_JOBS, {
+            'creator_id': creator_id, 'executor_ids': list(executor_ids),
+            'per_executor': per_executor, 'start': START,
+            'every': SLOT_EVERY, 'length': JOB_LENGTH,
+            'recess': datetime.timedelta(hours=RECESS_HOUR)})
+
+
+def create_schedules(size, per_executor=1000, prefix='bench'):
+    """ creates a creator and executors holding size slots in total,
+    with a job on every other slot. Returns the creator id, the
+    executor ids and the slots per executor"""
+    per_executor = min(size, per_executor)
+    creator_id, = create_users(1, prefix=f'{prefix}-creator-')
+    executor_ids = create_users(max(1, size // per_executor), prefix=prefix)
+    create_slots(executor_ids, per_executor)
+    create_jobs(creator_id, executor_ids, per_executor)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return creator_id, executor_ids, per_executor
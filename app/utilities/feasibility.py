@@ -0,0 +1,111 @@
+import datetime
+
+import numpy as np
+
+from .Exceptions.job import JobOnRecessError, JobOverlapError
+from .Exceptions.timeslot import (
+    TimeSlotsJobMatchError, TimeSlotsNotContinuousError, TimeSlotsNotFound
+)
+
+# reason codes of a batch feasibility check
+FEASIBLE = 0
+INVALID_DURATION = 1
+ON_RECESS = 2
+OVERLAP = 3
+NO_TIMESLOTS = 4
+NOT_CONTINUOUS = 5
+NO_MATCH = 6
+
+# the error create would raise for each reason code
+REASONS = {
+    INVALID_DURATION: ValueError,
+    ON_RECESS: JobOnRecessError,
+    OVERLAP: JobOverlapError,
+    NO_TIMESLOTS: TimeSlotsNotFound,
+    NOT_CONTINUOUS: TimeSlotsNotContinuousError,
+    NO_MATCH: TimeSlotsJobMatchError,
+}
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def to_epoch(values):
+    """ converts aware datetimes to an int64 array of epoch
+    microseconds"""
+    return np.array([(value - EPOCH) // MICROSECOND for value in values],
+                    dtype=np.int64)
+
+
+def ranges_to_epoch(ranges):
+    """ converts DTrange objects to sorted lower and upper epoch
+    arrays, the ranges must not overlap each other"""
+    ranges = sorted(ranges, key=lambda r: r.lower)
+    return (to_epoch(r.lower for r in ranges),
+            to_epoch(r.upper for r in ranges))
+
+
+def overlap_bounds(lowers, uppers, lower, upper):
+    """ index ranges of the sorted intervals overlapping each
+    lower-upper candidate"""
+    start = np.searchsorted(uppers, lower, side='right')
+    end = np.maximum(np.searchsorted(lowers, upper, side='left'), start)
+    return start, end
+
+
+def batch_feasibility(slots, jobs, recesses, lower, upper, recess,
+                      has_slots=None):
+    """ checks N candidate durations of a single executor in one pass.
+
+    slots, jobs and recesses are (lowers, uppers) tuples of sorted
+    epoch arrays, lower and upper hold the candidates and recess is the
+    recess length in microseconds. has_slots tells if the executor has
+    slots outside of the given ones. Returns an int8 array of reason
+    codes, following the order of the checks in JobManager.create
+    """
+    lower = np.asarray(lower, dtype=np.int64)
+    upper = np.asarray(upper, dtype=np.int64)
+    reasons = np.full(lower.shape, FEASIBLE, dtype=np.int8)
+
+    # a job may not start in an existing recess, nor end less than
+    # a recess before an existing job it does not overlap
+    job_start, job_end = overlap_bounds(*jobs, lower, upper)
+    recess_start, recess_end = overlap_bounds(*recesses, lower, upper)
+    after_start, after_end = overlap_bounds(*jobs, upper, upper + recess)
+    shared = np.maximum(0, np.minimum(job_end, after_end)
+                        - np.maximum(job_start, after_start))
+    on_recess = (recess_end > recess_start) | \
+        ((after_end - after_start) > shared)
+    overlaps = job_end > job_start
+
+    slot_lowers, slot_uppers = slots
+    if has_slots is None:
+        has_slots = len(slot_lowers) > 0
+    slot_start, slot_end = overlap_bounds(slot_lowers, slot_uppers,
+                                          lower, upper)
+    count = slot_end - slot_start
+    if len(slot_lowers):
+        first = np.minimum(slot_start, len(slot_lowers) - 1)
+        last = np.maximum(slot_end - 1, 0)
+        # the overlapping slots span the candidate
+        covered = (count > 0) & (slot_lowers[first] <= lower) & \
+            (slot_uppers[last] >= upper)
+        # slots sharing a block id are back to back
+        block = np.concatenate(
+            ([0], np.cumsum(slot_lowers[1:] != slot_uppers[:-1])))
+        continuous = (count > 1) & (block[first] == block[last])
+    else:
+        covered = continuous = np.zeros(lower.shape, dtype=bool)
+
+    checks = [
+        (lower >= upper, INVALID_DURATION),
+        (on_recess, ON_RECESS),
+        (overlaps, OVERLAP),
+        (np.full(lower.shape, not has_slots), NO_TIMESLOTS),
+        ((count > 1) & ~continuous, NOT_CONTINUOUS),
+        (~covered, NO_MATCH),
+    ]
+    # the first failing check gives the reason
+    for failed, code in reversed(checks):
+        reasons[failed] = code
+    return reasons
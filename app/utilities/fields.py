@@ -0,0 +1,28 @@
+""" Serializer fields shared by the API """
+from psycopg2.extras import DateTimeTZRange
+from rest_framework import serializers
+
+
+class DateTimeRangeField(serializers.Field):
+    """ a DTrange object as a {"lower": ..., "upper": ...} object of
+    ISO 8601 date times"""
+    default_error_messages = {
+        'invalid': 'Expected an object with lower and upper date times.',
+    }
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.bound = serializers.DateTimeField()
+
+    def to_representation(self, value):
+        return {
+            'lower': self.bound.to_representation(value.lower),
+            'upper': self.bound.to_representation(value.upper),
+        }
+
+    def to_internal_value(self, data):
+        if not isinstance(data, dict) or \
+                not {'lower', 'upper'} <= set(data):
+            self.fail('invalid')
+        return DateTimeTZRange(self.bound.to_internal_value(data['lower']),
+                               self.bound.to_internal_value(data['upper']))
@@ -0,0 +1,106 @@
+""" Per request SQL instrumentation and query budgets """
+import contextlib
+import functools
+import logging
+import time
+
+from django.conf import settings
+from django.db import connections
+
+from utilities.Exceptions.instrumentation import QueryBudgetExceeded
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """ An execute wrapper counting and timing the queries it sees,
+    see connection.execute_wrapper"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+    @contextlib.contextmanager
+    def record(self):
+        """ counts the queries of every database while the block runs"""
+        with contextlib.ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(self))
+            yield self
+
+
+def check_budget(name, count, limit):
+    """ raises QueryBudgetExceeded when count goes over limit if the
+    QUERY_BUDGET_RAISE setting is on, logs a warning otherwise"""
+    if count <= limit:
+        return
+    msg = f'{name} ran {count} queries, its budget is {limit}'
+    if settings.QUERY_BUDGET_RAISE:
+        raise QueryBudgetExceeded(name, count, limit, msg)
+    logger.warning(msg)
+
+
+def query_budget(limit, name=None):
+    """ decorates a function whose calls must not run more than limit
+    queries, see check_budget"""
+    def decorator(function):
+        label = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with QueryStats().record() as stats:
+                result = function(*args, **kwargs)
+            check_budget(label, stats.count, limit)
+            return result
+        return wrapper
+    return decorator
+
+
+def view_budget(view_func, method):
+    """ the (name, limit) budget of a viewset action, given in the
+    query_budgets dict of the viewset. limit is None without one, other
+    views can be decorated with query_budget"""
+    cls = getattr(view_func, 'cls', None)
+    actions = getattr(view_func, 'actions', None)
+    if cls is None or not actions:
+        return None, None
+    action = actions.get(method.lower())
+    return (f'{cls.__name__}.{action}',
+            getattr(cls, 'query_budgets', {}).get(action))
+
+
+class QueryInstrumentationMiddleware:
+    """ Counts and times the queries of every request. The numbers go
+    to a Server-Timing header and to the log, and are checked against
+    the query budget of the view"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        with QueryStats().record() as stats:
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        response['Server-Timing'] = \
+            f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} ' \
+            f'queries", total;dur={total * 1000:.1f}'
+        logger.info('%s %s %s %d queries db %.1f ms total %.1f ms',
+                    request.method, request.path, response.status_code,
+                    stats.count, stats.duration * 1000, total * 1000)
+        name, limit = getattr(request, 'query_budget', (None, None))
+        if limit is not None:
+            check_budget(name, stats.count, limit)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = view_budget(view_func, request.method)
@@ -0,0 +1,143 @@
+import bisect
+
+
+class IntervalSet:
+    """ A sorted set of non overlapping half-open intervals, e.g the
+    time slots of a single executor.
+
+    Next to the intervals, the set keeps the merged blocks of
+    back to back intervals, so coverage and continuity questions are
+    answered with a couple of binary searches.
+    """
+
+    def __init__(self, intervals=()):
+        self._lowers = []
+        self._uppers = []
+        self._keys = []
+        self._block_lowers = []
+        self._block_uppers = []
+        for interval in sorted(intervals, key=lambda i: i[0]):
+            self.add(*interval)
+
+    def __len__(self):
+        return len(self._lowers)
+
+    def __iter__(self):
+        return iter(zip(self._lowers, self._uppers, self._keys))
+
+    def __repr__(self):
+        return f'IntervalSet({list(self)!r})'
+
+    @property
+    def blocks(self):
+        """ the continuous blocks as (lower, upper) tuples"""
+        return list(zip(self._block_lowers, self._block_uppers))
+
+    def _block_index(self, point):
+        """ index of the block holding point, -1 if there is none"""
+        i = bisect.bisect_right(self._block_lowers, point) - 1
+        if i >= 0 and point < self._block_uppers[i]:
+            return i
+        return -1
+
+    def _overlap_bounds(self, lower, upper):
+        """ index range of the intervals overlapping lower-upper"""
+        start = bisect.bisect_right(self._uppers, lower)
+        end = bisect.bisect_left(self._lowers, upper)
+        return start, max(start, end)
+
+    def add(self, lower, upper, key=None):
+        """ inserts an interval, merging it into the adjacent blocks"""
+        if lower >= upper:
+            raise ValueError("The upper bound should be greater than the "
+                             "lower bound")
+        start, end = self._overlap_bounds(lower, upper)
+        if start != end:
+            raise ValueError("The interval overlaps an existing interval")
+        self._lowers.insert(start, lower)
+        self._uppers.insert(start, upper)
+        self._keys.insert(start, key)
+
+        # blocks ending at lower and starting at upper are merged
+        i = bisect.bisect_left(self._block_uppers, lower)
+        j = bisect.bisect_right(self._block_lowers, upper)
+        block_lower = min([lower] + self._block_lowers[i:j])
+        block_upper = max([upper] + self._block_uppers[i:j])
+        self._block_lowers[i:j] = [block_lower]
+        self._block_uppers[i:j] = [block_upper]
+
+    def remove(self, lower, upper):
+        """ deletes an interval, splitting the block that holds it"""
+        i = bisect.bisect_left(self._lowers, lower)
+        if i == len(self._lowers) or (self._lowers[i], self._uppers[i]) \
+                != (lower, upper):
+            raise KeyError((lower, upper))
+        del self._lowers[i], self._uppers[i], self._keys[i]
+
+        b = self._block_index(lower)
+        block = [(self._block_lowers[b], lower),
+                 (upper, self._block_uppers[b])]
+        block = [(bl, bu) for bl, bu in block if bl < bu]
+        self._block_lowers[b:b + 1] = [bl for bl, _ in block]
+        self._block_uppers[b:b + 1] = [bu for _, bu in block]
+
+    def overlapping(self, lower, upper):
+        """ the intervals overlapping lower-upper"""
+        start, end = self._overlap_bounds(lower, upper)
+        return list(zip(self._lowers[start:end], self._uppers[start:end],
+                        self._keys[start:end]))
+
+    def covers(self, lower, upper):
+        """ To check if lower-upper lies within continuous intervals"""
+        b = self._block_index(lower)
+        return b >= 0 and upper <= self._block_uppers[b]
+
+    def covering(self, lower, upper):
+        """ the intervals covering lower-upper, empty if it is
+        not fully covered"""
+        if not self.covers(lower, upper):
+            return []
+        return self.overlapping(lower, upper)
+
+    def is_continuous(self, lower, upper):
+        """ To check if the intervals overlapping lower-upper form
+        a single continuous block"""
+        start, end = self._overlap_bounds(lower, upper)
+        if start == end:
+            return False
+        b = self._block_index(self._lowers[start])
+        return self._uppers[end - 1] <= self._block_uppers[b]
+
+
+def merge(intervals):
+    """ merges overlapping and back to back (lower, upper) tuples
+    sorted by lower bound into continuous blocks"""
+    blocks = []
+    for lower, upper in intervals:
+        if blocks and lower <= blocks[-1][1]:
+            blocks[-1][1] = max(blocks[-1][1], upper)
+        else:
+            blocks.append([lower, upper])
+    return [tuple(block) for block in blocks]
+
+
+def subtract(intervals, others):
+    """ the parts of the intervals not covered by others, both being
+    iterables of (lower, upper) tuples sorted by lower bound. The
+    intervals must not overlap each other, the others may.
+    A single sweep over the two sequences"""
+    others = iter(others)
+    cut = next(others, None)
+    result = []
+    for lower, upper in intervals:
+        while lower < upper:
+            # skip the cuts ending before the interval
+            while cut is not None and cut[1] <= lower:
+                cut = next(others, None)
+            if cut is None or cut[0] >= upper:
+                result.append((lower, upper))
+                break
+            if cut[0] > lower:
+                result.append((lower, cut[0]))
+            lower = cut[1]
+    return result
@@ -0,0 +1,255 @@
+""" Booking metrics shared by the worker processes, exposed at /metrics
+in the Prometheus text format.
+
+Every process adds to its own memory mapped file in the METRICS
+setting DIRECTORY, /metrics sums the files of all processes. The files
+of the processes that are gone are removed when the apps are loaded,
+see remove_dead.
+"""
+import functools
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+HEADER = 8
+INITIAL_SIZE = 1 << 16
+
+# upper bounds in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                   0.5, 1.0, 2.5)
+
+FAMILIES = {
+    'gany_booking_seconds': (
+        'histogram', 'Latency of the booking operations'),
+    'gany_booking_errors_total': (
+        'counter', 'Rejected bookings by operation and exception class'),
+    'gany_availability_cache_total': (
+        'counter', 'Availability cache hits, misses and invalidations'),
+}
+
+
+class MmapDict:
+    """ float values by key in a memory mapped file with a single
+    writer. Entries are appended as the key length, the key padded to
+    8 bytes and the value, the header holds the used size"""
+
+    def __init__(self, path):
+        self._file = open(path, 'a+b')
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._file.truncate(INITIAL_SIZE)
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._positions = {}
+        self._used = struct.unpack_from('i', self._map, 0)[0]
+        if not self._used:
+            self._used = HEADER
+            struct.pack_into('i', self._map, 0, self._used)
+        for key, _, position in _entries(self._map, self._used):
+            self._positions[key] = position
+
+    def _append(self, key):
+        encoded = key.encode()
+        padded = encoded + b' ' * (8 - (len(encoded) + 4) % 8)
+        entry = struct.pack(f'i{len(padded)}sd', len(encoded), padded, 0.0)
+        if self._used + len(entry) > len(self._map):
+            self._map.close()
+            self._file.truncate(max(2 * os.fstat(self._file.fileno()).st_size,
+                                    self._used + len(entry)))
+            self._map = mmap.mmap(self._file.fileno(), 0)
+        self._map[self._used:self._used + len(entry)] = entry
+        self._positions[key] = self._used + 4 + len(padded)
+        # readers only look at entries before the used size
+        self._used += len(entry)
+        struct.pack_into('i', self._map, 0, self._used)
+
+    def add(self, key, amount):
+        if key not in self._positions:
+            self._append(key)
+        position = self._positions[key]
+        value = struct.unpack_from('d', self._map, position)[0]
+        struct.pack_into('d', self._map, position, value + amount)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def _entries(data, used):
+    """ (key, value, value position) of the entries of a MmapDict"""
+    position = HEADER
+    while position < used:
+        length = struct.unpack_from('i', data, position)[0]
+        start = position + 4
+        key = bytes(data[start:start + length]).decode()
+        position = start + length + 8 - (length + 4) % 8
+        yield key, struct.unpack_from('d', data, position)[0], position
+        position += 8
+
+
+def read(path):
+    """ the values of a MmapDict file by key"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < HEADER:
+        return {}
+    used = struct.unpack_from('i', data, 0)[0]
+    return {key: value for key, value, _ in _entries(data, used)}
+
+
+def _key(name, **labels):
+    return json.dumps([name, sorted(labels.items())])
+
+
+class Registry:
+    """ Records the booking metrics of this process in the directory
+    of the METRICS setting"""
+
+    def __init__(self, directory=None):
+        self._directory = directory
+        self._lock = threading.Lock()
+        self._values = None
+        self._pid = None
+
+    @property
+    def directory(self):
+        return self._directory or settings.METRICS['DIRECTORY']
+
+    def _add(self, key, amount):
+        with self._lock:
+            # a forked worker gets a file of its own
+            if self._pid != os.getpid():
+                os.makedirs(self.directory, exist_ok=True)
+                self._pid = os.getpid()
+                self._values = MmapDict(
+                    os.path.join(self.directory, f'{self._pid}.db'))
+            self._values.add(key, amount)
+
+    def observe(self, operation, seconds):
+        """ records the latency of an operation"""
+        name = 'gany_booking_seconds'
+        # every bucket is written, the empty ones too
+        for bound in LATENCY_BUCKETS + (float('inf'),):
+            self._add(_key(f'{name}_bucket', operation=operation,
+                           le=_bound(bound)), int(seconds <= bound))
+        self._add(_key(f'{name}_sum', operation=operation), seconds)
+        self._add(_key(f'{name}_count', operation=operation), 1)
+
+    def error(self, operation, error):
+        """ counts a rejected booking by the class of its exception"""
+        self._add(_key('gany_booking_errors_total', operation=operation,
+                       error=type(error).__name__), 1)
+
+    def cache_event(self, event):
+        """ counts a hit, miss or invalidation of the availability
+        cache"""
+        self._add(_key('gany_availability_cache_total', event=event), 1)
+
+    def collect(self):
+        """ the values of all processes by key"""
+        values = {}
+        if not os.path.isdir(self.directory):
+            return values
+        for f in os.listdir(self.directory):
+            if f.endswith('.db'):
+                for key, value in read(os.path.join(self.directory,
+                                                    f)).items():
+                    values[key] = values.get(key, 0) + value
+        return values
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # the pid belongs to another user
+        return True
+    return True
+
+
+def remove_dead(directory=None):
+    """ removes the files of the processes that are not running anymore,
+    the workers of the server running keep theirs"""
+    directory = directory or settings.METRICS['DIRECTORY']
+    if not os.path.isdir(directory):
+        return
+    for f in os.listdir(directory):
+        name, extension = os.path.splitext(f)
+        if extension == '.db' and name.isdecimal() and \
+                not _alive(int(name)):
+            try:
+                os.remove(os.path.join(directory, f))
+            except FileNotFoundError:
+                # another worker removed it first
+                pass
+
+
+def _bound(bound):
+    return '+Inf' if bound == float('inf') else repr(bound)
+
+
+def _sort_key(sample):
+    name, labels = sample
+    le = dict(labels).get('le')
+    return (name, [item for item in labels if item[0] != 'le'],
+            float(le) if le is not None else 0)
+
+
+def exposition(values):
+    """ the Prometheus text format of the collected values"""
+    samples = {}
+    for key, value in values.items():
+        name, labels = json.loads(key)
+        sample = (name, tuple(tuple(label) for label in labels))
+        samples[sample] = value
+    lines = []
+    for family, (kind, help_text) in FAMILIES.items():
+        lines += [f'# HELP {family} {help_text}', f'# TYPE {family} {kind}']
+        for name, labels in sorted(
+                (s for s in samples if s[0].startswith(family)),
+                key=_sort_key):
+            # le comes last by convention
+            label_text = ','.join(f'{k}="{v}"' for k, v in sorted(
+                labels, key=lambda label: label[0] == 'le'))
+            lines.append(f'{name}{{{label_text}}} '
+                         f'{samples[(name, labels)]!r}')
+    return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def timed(operation):
+    """ records the latency of the calls of a booking operation and
+    counts the exceptions they raise"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            except Exception as error:
+                registry.error(operation, error)
+                raise
+            finally:
+                registry.observe(operation, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def metrics_view(request):
+    """ the booking metrics of every process, for Prometheus. Only
+    staff users and the METRICS setting ALLOWED_IPS can read them"""
+    user = getattr(request, 'user', None)
+    if request.META.get('REMOTE_ADDR') not in \
+            settings.METRICS['ALLOWED_IPS'] and \
+            not (user is not None and user.is_staff):
+        return HttpResponseForbidden()
+    return HttpResponse(exposition(registry.collect()),
+                        content_type='text/plain; version=0.0.4')
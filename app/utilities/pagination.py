@@ -0,0 +1,108 @@
+""" Keyset pagination for the list endpoints """
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import DateTimeField, F, Field, Func, Value
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class Row(Func):
+    """ a row constructor, compared column by column like a tuple"""
+    function = 'ROW'
+    output_field = Field()
+
+
+class RangeLower(Func):
+    """ the lower bound of a date time range column"""
+    function = 'lower'
+    output_field = DateTimeField()
+
+
+class KeysetPagination(BasePagination):
+    """ Pages through a queryset with a WHERE on the last row seen
+    instead of an OFFSET, so every page costs an index range scan.
+
+    The view gives the ordering as a keyset: (name, expression) pairs
+    ending with a unique column, matching an index, e.g
+    [('start', RangeLower('duration')), ('id', F('id'))]. The cursor is the
+    keyset values of the last row of a page.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self):
+        self.page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE') or 50
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, values):
+        # isoformat keeps the microseconds the keyset compares on
+        values = [value.isoformat() if hasattr(value, 'isoformat')
+                  else value for value in values]
+        data = json.dumps(values).encode()
+        return base64.urlsafe_b64encode(data).decode()
+
+    def decode_cursor(self, cursor, fields):
+        """ the keyset values of a cursor, parsed by the keyset
+        fields"""
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if len(values) != len(fields):
+                raise ValueError
+            return [field.to_python(value)
+                    for field, value in zip(fields, values)]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        keyset = view.keyset
+        names = [name for name, _ in keyset]
+        queryset = queryset.annotate(**{
+            name: expression for name, expression in keyset
+            if not (isinstance(expression, F) and expression.name == name)
+        }).order_by(*names)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            annotations = queryset.query.annotations
+            fields = [annotations[name].output_field if name in annotations
+                      else queryset.model._meta.get_field(name)
+                      for name in names]
+            values = self.decode_cursor(cursor, fields)
+            queryset = queryset.annotate(
+                keyset=Row(*[F(name) for name in names])
+            ).filter(keyset__gt=Row(*[Value(v) for v in values]))
+
+        self.request = request
+        limit = self.get_page_size(request)
+        rows = list(queryset[:limit + 1])
+        self.next_values = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            self.next_values = [getattr(rows[-1], name) for name in names]
+        return rows
+
+    def get_next_link(self):
+        if self.next_values is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param,
+                                   self.encode_cursor(self.next_values))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
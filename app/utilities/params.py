@@ -0,0 +1,15 @@
+""" Query parameters of the list endpoints """
+from rest_framework.exceptions import ValidationError
+
+
+def id_param(request, name):
+    """ the integer id of the name query parameter, None when it is
+    missing. Raises a ValidationError, a 400 answer, otherwise"""
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({name: [f"A valid integer is required, "
+                                      f"got {value!r}"]})
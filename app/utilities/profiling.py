@@ -0,0 +1,147 @@
+""" Sampled cProfile profiles of requests, see the PROFILING setting """
+import cProfile
+import datetime
+import io
+import json
+import os
+import pstats
+import random
+import re
+import time
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import Http404
+from django.shortcuts import render
+
+NAME = re.compile(r'[\w-]+')
+
+
+def sample_rate(path, patterns, default):
+    """ the share of the requests to path to profile, the rate of the
+    first matching pattern or default"""
+    for pattern, rate in patterns.items():
+        if re.search(pattern, path):
+            return rate
+    return default
+
+
+def _path(directory, name, suffix):
+    if not NAME.fullmatch(name):
+        raise ValueError(f'invalid profile name {name}')
+    return os.path.join(directory, name + suffix)
+
+
+def save(directory, profiler, meta, keep):
+    """ writes a profile in pstats format with its meta data next to
+    it, then drops the oldest profiles beyond keep"""
+    os.makedirs(directory, exist_ok=True)
+    # names sort by time
+    name = f'{time.time_ns()}-{uuid.uuid4().hex[:8]}'
+    profiler.dump_stats(_path(directory, name, '.prof'))
+    with open(_path(directory, name, '.json'), 'w') as f:
+        json.dump(meta, f)
+    rotate(directory, keep)
+    return name
+
+
+def rotate(directory, keep):
+    """ removes all but the keep most recent profiles"""
+    names = sorted(f[:-len('.prof')] for f in os.listdir(directory)
+                   if f.endswith('.prof'))
+    for name in names[:max(0, len(names) - keep)]:
+        for suffix in ('.prof', '.json'):
+            try:
+                os.remove(_path(directory, name, suffix))
+            except FileNotFoundError:
+                # removed by another worker
+                pass
+
+
+def recent(directory):
+    """ the meta data of the profiles in directory, with their name"""
+    profiles = []
+    if not os.path.isdir(directory):
+        return profiles
+    for f in os.listdir(directory):
+        if not f.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, f)) as meta:
+                profiles.append(dict(json.load(meta), name=f[:-len('.json')]))
+        except (OSError, ValueError):
+            # rotated away or being written
+            continue
+    return profiles
+
+
+def slowest(directory, limit=50):
+    return sorted(recent(directory), key=lambda p: p['duration_ms'],
+                  reverse=True)[:limit]
+
+
+def report(directory, name, sort='cumulative', limit=40):
+    """ the pstats report of a profile"""
+    stream = io.StringIO()
+    stats = pstats.Stats(_path(directory, name, '.prof'), stream=stream)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+class ProfilingMiddleware:
+    """ Profiles a sample of the requests with cProfile when the
+    PROFILING setting enables it. RATE is the share of the requests
+    profiled, PATTERNS maps path regular expressions to their own
+    rates. The KEEP most recent profiles are kept in DIRECTORY"""
+
+    def __init__(self, get_response):
+        if not settings.PROFILING['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.options = settings.PROFILING
+
+    def __call__(self, request):
+        rate = sample_rate(request.path, self.options['PATTERNS'],
+                           self.options['RATE'])
+        if not rate or random.random() >= rate:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        save(self.options['DIRECTORY'], profiler, {
+            'created': datetime.datetime.now(datetime.timezone.utc)
+                                        .isoformat(),
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': (time.perf_counter() - start) * 1000,
+        }, self.options['KEEP'])
+        return response
+
+
+def profile_list(request):
+    """ admin page of the slowest recent profiles"""
+    return render(request, 'admin/profiles.html', {
+        'title': 'Slowest recent profiles',
+        'profiles': slowest(settings.PROFILING['DIRECTORY']),
+        'enabled': settings.PROFILING['ENABLED'],
+    })
+
+
+def profile_detail(request, name):
+    """ admin page of the pstats report of a profile"""
+    try:
+        text = report(settings.PROFILING['DIRECTORY'], name,
+                      sort=request.GET.get('sort', 'cumulative'))
+    except (OSError, ValueError, KeyError):
+        raise Http404('No such profile')
+    return render(request, 'admin/profile.html', {
+        'title': f'Profile {name}',
+        'report': text,
+    })
@@ -0,0 +1,128 @@
+""" Sends the reads of the scheduling and review models to the read
+replicas of the REPLICAS setting, and everything else to the primary """
+import contextlib
+import random
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# the apps whose reads can be served by a replica
+REPLICA_APPS = {'job', 'timeslot', 'review'}
+
+PIN_COOKIE = 'primary_pin'
+PIN_SALT = 'utilities.routers'
+
+_state = threading.local()
+
+
+@contextlib.contextmanager
+def request_state(pinned=False):
+    """ scopes the routing state to a request. Pinned requests read
+    from the primary, and so does the rest of a request once it wrote.
+    pinned may be a callable, called on the first read. Writes are
+    only recorded in a request scope"""
+    _state.pinned, _state.wrote, _state.scoped = pinned, False, True
+    try:
+        yield _state
+    finally:
+        _state.pinned = _state.wrote = _state.scoped = False
+
+
+def _pinned():
+    pinned = getattr(_state, 'pinned', False)
+    if callable(pinned):
+        _state.pinned = False
+        pinned = _state.pinned = bool(pinned())
+    return pinned
+
+
+def reads_primary():
+    return _pinned() or getattr(_state, 'wrote', False) or \
+        connections[DEFAULT_DB_ALIAS].in_atomic_block
+
+
+class ReplicaRouter:
+    """ Reads of the REPLICA_APPS models go to a random replica, unless
+    the request is pinned to the primary, already wrote, or runs in a
+    transaction of the primary. Writes go to the primary"""
+
+    def db_for_read(self, model, **hints):
+        if not settings.REPLICAS or \
+                model._meta.app_label not in REPLICA_APPS or reads_primary():
+            return None
+        return random.choice(settings.REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        if getattr(_state, 'scoped', False):
+            _state.wrote = True
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db in settings.REPLICAS:
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.REPLICAS:
+            return False
+        return None
+
+
+def _pin_key(user):
+    return f'replica-pin:{user.pk}'
+
+
+def _authenticated(request):
+    user = getattr(request, 'user', None)
+    return user if user is not None and user.is_authenticated else None
+
+
+class ReplicaPinningMiddleware:
+    """ Pins a user who wrote to the primary for REPLICA_PIN_SECONDS,
+    so that they do not read a stale schedule from a lagging replica
+    right after booking.
+
+    The pin is kept by user id in the default cache, which should be
+    shared by the worker processes. Anonymous clients get a signed
+    cookie instead. The user of a request is looked up on its first
+    read, once the views authenticated it, e.g with Basic auth.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        seconds = settings.REPLICA_PIN_SECONDS
+        cookie = request.get_signed_cookie(
+            PIN_COOKIE, default=None, salt=PIN_SALT, max_age=seconds)
+
+        def pinned():
+            user = _authenticated(request)
+            return cookie is not None or (
+                user is not None and caches['default'].get(_pin_key(user)))
+
+        with request_state(pinned) as state:
+            response = self.get_response(request)
+            wrote = state.wrote
+        if wrote and settings.REPLICAS:
+            user = _authenticated(request)
+            if user is not None:
+                caches['default'].set(_pin_key(user), True, seconds)
+            response.set_signed_cookie(PIN_COOKIE, '1', salt=PIN_SALT,
+                                       max_age=seconds, httponly=True)
+        return response
+
+
+def replica_lag_timeout(model, default=None):
+    """ the cache timeout of results read for model, short when they
+    come from a replica which may lag behind an invalidation"""
+    if settings.REPLICAS and model._meta.app_label in REPLICA_APPS \
+            and not reads_primary():
+        return settings.REPLICA_PIN_SECONDS
+    return default
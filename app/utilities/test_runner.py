@@ -0,0 +1,24 @@
+""" The test runner of the project, see the TEST_RUNNER setting """
+import logging
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """ fails the tests going over a query budget, and keeps the log
+    of every request out of their output, see
+    utilities.instrumentation"""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._budgets = override_settings(QUERY_BUDGET_RAISE=True)
+        self._budgets.enable()
+        self._logger = logging.getLogger('utilities.instrumentation')
+        self._level = self._logger.level
+        self._logger.setLevel(logging.WARNING)
+
+    def teardown_test_environment(self, **kwargs):
+        self._logger.setLevel(self._level)
+        self._budgets.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,40 @@
+from django.test import SimpleTestCase, TestCase
+
+from job.management.commands.run_benchmarks import run
+from timeslot.models import TimeSlot
+from utilities import benchmark
+
+
+class BenchmarkTests(SimpleTestCase):
+
+    def test_regressions(self):
+        """ To check that more queries or a slower mean time than the
+        baseline are flagged"""
+        baseline = {'10': {
+            'a': {'ms': 1.0, 'queries': 1},
+            'b': {'ms': 1.0, 'queries': 2},
+        }}
+        results = {'10': {
+            'a': {'ms': 1.4, 'queries': 2},
+            'b': {'ms': 1.6, 'queries': 2},
+            'c': {'ms': 9.0, 'queries': 9},
+        }}
+
+        self.assertEqual(
+            [(size, case) for size, case, _ in
+             benchmark.regressions(results, baseline)],
+            [('10', 'a'), ('10', 'b')])
+
+
+class BenchmarkRunTests(TestCase):
+
+    def test_run(self):
+        """ To check that every case runs on a synthetic data set and
+        leaves nothing behind"""
+        results = run(10, repeat=2)
+
+        self.assertEqual(set(results), {
+            'JobManager.create', 'TimeSlotManager.create',
+            'timeslot_continuity_check', 'ReviewManager.create'})
+        self.assertEqual(results['JobManager.create']['queries'], 1)
+        self.assertFalse(TimeSlot.objects.exists())
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from utilities import checks
+
+MEMCACHED = {
+    'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+    'LOCATION': '127.0.0.1:11211',
+}
+
+
+@override_settings(DEBUG=False, REPLICAS=[])
+class SharedCachesCheckTests(SimpleTestCase):
+
+    def test_locmem_availability_cache(self):
+        """ To check that a per process availability cache is reported
+        outside of DEBUG, and a shared one is not"""
+        errors = checks.check_shared_caches(None)
+        self.assertEqual([error.id for error in errors], ['utilities.W001'])
+
+        with override_settings(CACHES=dict(settings.CACHES,
+                                           availability=MEMCACHED)):
+            self.assertEqual(checks.check_shared_caches(None), [])
+        with override_settings(DEBUG=True):
+            self.assertEqual(checks.check_shared_caches(None), [])
+
+    def test_locmem_pins(self):
+        """ To check that the default cache holding the replica pins
+        is reported when there are replicas"""
+        with override_settings(REPLICAS=['replica1'], CACHES=dict(
+                settings.CACHES, availability=MEMCACHED)):
+            errors = checks.check_shared_caches(None)
+        self.assertEqual([error.msg for error in errors],
+                         ["The 'default' cache is local to each process"])
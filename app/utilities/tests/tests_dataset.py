@@ -0,0 +1,49 @@
+import io
+import random
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from job.constants import RECESS_HOUR
+from job.models import Job
+from review.models import ExecutorRating, Review
+from timeslot.models import TimeSlot
+from utilities import dataset
+from utilities.factories import START
+
+
+class ScheduleTests(SimpleTestCase):
+
+    def test_schedule(self):
+        """ To check that a schedule has the slots asked for, jobs
+        inside the slots spaced by the recess, and that the same seed
+        gives the same schedule"""
+        profile = (50, 1.5, 0.7)
+        slots, jobs = dataset.schedule(START, profile, random.Random(3))
+
+        self.assertEqual(len(slots), 50)
+        self.assertEqual(
+            (slots, jobs), dataset.schedule(START, profile, random.Random(3)))
+        for lower, upper in jobs:
+            self.assertTrue(any(s_lower <= lower and upper <= s_upper
+                                for s_lower, s_upper in slots))
+        for (_, upper), (lower, _) in zip(jobs, jobs[1:]):
+            self.assertGreaterEqual((lower - upper).total_seconds(),
+                                    RECESS_HOUR * 3600)
+
+    def test_shares(self):
+        self.assertEqual(dataset.shares(9, [1, 1, 2]), [3, 2, 4])
+
+
+class GenerateDatasetTests(TestCase):
+
+    def test_generate_dataset(self):
+        """ To check that the data set is loaded within the counts
+        asked for, with the rating stats of its reviews"""
+        call_command('generate_dataset', users=20, timeslots=300, jobs=200,
+                     reviews=30, seed=2, stdout=io.StringIO())
+
+        self.assertEqual(TimeSlot.objects.count(), 300)
+        self.assertTrue(0 < Job.objects.count() <= 200)
+        self.assertTrue(0 < Review.objects.count() <= 30)
+        self.assertEqual(ExecutorRating.objects.inconsistencies(), [])
@@ -0,0 +1,52 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from timeslot.views import TimeSlotViewSet
+from utilities import samples
+from utilities.Exceptions.instrumentation import QueryBudgetExceeded
+from utilities.instrumentation import query_budget
+
+
+class InstrumentationTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(samples.sample_user())
+
+    def test_server_timing(self):
+        """ To check that the queries of a request are reported in the
+        Server-Timing header"""
+        response = self.client.get('/api/timeslots/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response['Server-Timing'],
+                         r'^db;dur=[\d.]+;desc="1 queries", total;dur=[\d.]+$')
+
+    def test_view_budget(self):
+        """ To check that a viewset action going over its budget fails"""
+        with mock.patch.object(TimeSlotViewSet, 'query_budgets',
+                               {'list': 0}):
+            with self.assertRaises(QueryBudgetExceeded) as error:
+                self.client.get('/api/timeslots/')
+
+        self.assertEqual(error.exception.name, 'TimeSlotViewSet.list')
+        self.assertEqual(error.exception.count, 1)
+
+    def test_query_budget(self):
+        """ To check that a decorated function going over its budget
+        fails under tests and logs a warning otherwise"""
+        @query_budget(1, name='two_queries')
+        def two_queries():
+            return list(get_user_model().objects.all()) + \
+                list(get_user_model().objects.all())
+
+        with self.assertRaises(QueryBudgetExceeded):
+            two_queries()
+        with override_settings(QUERY_BUDGET_RAISE=False), \
+                self.assertLogs('utilities.instrumentation') as logs:
+            self.assertEqual(len(two_queries()), 2)
+        self.assertIn('two_queries ran 2 queries, its budget is 1',
+                      logs.output[0])
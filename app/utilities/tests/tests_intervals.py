@@ -0,0 +1,87 @@
+from django.test import SimpleTestCase
+
+from utilities.intervals import IntervalSet, merge, subtract
+
+
+class IntervalSetTests(SimpleTestCase):
+
+    def test_adjacent_intervals_are_merged_into_blocks(self):
+        """ To check that back to back intervals form a single
+        block in any insertion order
+        e.g ==> 12-14, 16-18 and 14-16
+        """
+        slots = IntervalSet([(12, 14, 'a'), (16, 18, 'b')])
+        self.assertEqual(slots.blocks, [(12, 14), (16, 18)])
+
+        slots.add(14, 16, 'c')
+
+        self.assertEqual(slots.blocks, [(12, 18)])
+        self.assertEqual([key for _, _, key in slots], ['a', 'c', 'b'])
+
+    def test_overlapping_interval_cannot_be_added(self):
+        """ To check that an interval overlapping an existing
+        one is rejected
+        """
+        slots = IntervalSet([(12, 16)])
+        with self.assertRaises(ValueError):
+            slots.add(15, 18)
+        with self.assertRaises(ValueError):
+            slots.add(18, 18)
+
+    def test_covers_and_covering(self):
+        """ To check coverage of a duration by continuous intervals
+        e.g ==> 8-11, 12-16 and 16-20
+        """
+        slots = IntervalSet([(8, 11, 'a'), (12, 16, 'b'), (16, 20, 'c')])
+
+        self.assertTrue(slots.covers(14, 18))
+        self.assertTrue(slots.covers(12, 20))
+        self.assertFalse(slots.covers(10, 13))
+        self.assertFalse(slots.covers(18, 21))
+        self.assertEqual([key for _, _, key in slots.covering(14, 18)],
+                         ['b', 'c'])
+        self.assertEqual(slots.covering(10, 13), [])
+
+    def test_continuity_of_overlapping_intervals(self):
+        """ To check if the intervals overlapping a duration are
+        continuous
+        e.g ==> 11-12, 13-15 and 15-18
+        """
+        slots = IntervalSet([(11, 12), (13, 15), (15, 18)])
+
+        self.assertTrue(slots.is_continuous(14, 17))
+        self.assertFalse(slots.is_continuous(11, 17))
+        self.assertFalse(slots.is_continuous(20, 22))
+
+    def test_remove_splits_block(self):
+        """ To check that removing an interval splits the block
+        that holds it
+        """
+        slots = IntervalSet([(12, 14), (14, 16), (16, 18)])
+
+        slots.remove(14, 16)
+
+        self.assertEqual(slots.blocks, [(12, 14), (16, 18)])
+        self.assertFalse(slots.covers(13, 17))
+        self.assertEqual(len(slots), 2)
+        with self.assertRaises(KeyError):
+            slots.remove(14, 16)
+
+    def test_subtract(self):
+        """ To check the parts of intervals not covered by others
+        e.g ==> 8-12 and 14-20 minus 9-10, 11-15 and 18-19
+        """
+        self.assertEqual(
+            subtract([(8, 12), (14, 20)], [(9, 10), (11, 15), (18, 19)]),
+            [(8, 9), (10, 11), (15, 18), (19, 20)])
+        self.assertEqual(subtract([(8, 12)], []), [(8, 12)])
+        self.assertEqual(subtract([(8, 12)], [(6, 13)]), [])
+
+    def test_merge(self):
+        """ To check that overlapping and back to back intervals
+        are merged
+        e.g ==> 8-10, 9-12, 12-13 and 15-16
+        """
+        self.assertEqual(merge([(8, 10), (9, 12), (12, 13), (15, 16)]),
+                         [(8, 13), (15, 16)])
+        self.assertEqual(merge([]), [])
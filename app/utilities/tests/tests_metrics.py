@@ -0,0 +1,134 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from job.models import Job
+from timeslot.models import TimeSlot
+from utilities import metrics, samples
+from utilities.cache import availability_cache
+from utilities.Exceptions.timeslot import TimeSlotsNotFound
+
+
+class RegistryTests(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_processes_are_summed(self):
+        """ To check that the files of every process are summed, the
+        buckets being cumulative"""
+        first = metrics.MmapDict(os.path.join(self.directory.name, '1.db'))
+        second = metrics.Registry(self.directory.name)
+        first.add(metrics._key('gany_booking_errors_total',
+                               operation='JobManager.create',
+                               error='JobOverlapError'), 2)
+        second.error('JobManager.create', ValueError())
+        second.error('JobManager.create', ValueError())
+        second.observe('JobManager.create', 0.003)
+
+        text = metrics.exposition(second.collect())
+        self.assertIn('gany_booking_errors_total{error="JobOverlapError",'
+                      'operation="JobManager.create"} 2.0', text)
+        self.assertIn('gany_booking_errors_total{error="ValueError",'
+                      'operation="JobManager.create"} 2.0', text)
+        self.assertIn('gany_booking_seconds_bucket{operation='
+                      '"JobManager.create",le="0.005"} 1.0', text)
+        self.assertIn('gany_booking_seconds_bucket{operation='
+                      '"JobManager.create",le="0.0025"} 0.0', text)
+        self.assertIn('gany_booking_seconds_count{operation='
+                      '"JobManager.create"} 1.0', text)
+        first.close()
+
+    def test_mmap_dict_grows(self):
+        """ To check that the file grows past its initial size and is
+        read back"""
+        path = os.path.join(self.directory.name, '1.db')
+        values = metrics.MmapDict(path)
+        for n in range(5000):
+            values.add(f'key-{n}', n)
+        values.add('key-1', 1)
+        values.close()
+
+        self.assertGreater(os.path.getsize(path), metrics.INITIAL_SIZE)
+        read = metrics.read(path)
+        self.assertEqual(len(read), 5000)
+        self.assertEqual(read['key-1'], 2)
+        self.assertEqual(read['key-4999'], 4999)
+
+    def test_remove_dead(self):
+        """ To check that only the files of the processes that are gone
+        are removed"""
+        alive = os.path.join(self.directory.name, f'{os.getpid()}.db')
+        dead = os.path.join(self.directory.name, '1000001.db')
+        metrics.MmapDict(alive).close()
+        metrics.MmapDict(dead).close()
+
+        with mock.patch.object(metrics, '_alive',
+                               lambda pid: pid == os.getpid()):
+            metrics.remove_dead(self.directory.name)
+
+        self.assertEqual(os.listdir(self.directory.name),
+                         [f'{os.getpid()}.db'])
+        self.assertTrue(metrics._alive(os.getpid()))
+
+
+class BookingMetricsTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        patcher = mock.patch.object(metrics, 'registry',
+                                    metrics.Registry(self.directory.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_metrics_endpoint(self):
+        """ To check that booking latencies and rejections are exposed
+        at /metrics"""
+        creator = samples.sample_user()
+        executor = samples.sample_user(email='tito123@pluto.com')
+        with self.assertRaises(TimeSlotsNotFound):
+            Job.objects.create(creator, executor, 10,
+                               samples.sample_duration(delta=1))
+        TimeSlot.objects.create(executor, samples.sample_duration())
+
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        text = response.content.decode()
+        self.assertIn('# TYPE gany_booking_seconds histogram', text)
+        self.assertIn('gany_booking_errors_total{error="TimeSlotsNotFound",'
+                      'operation="JobManager.create"} 1.0', text)
+        for operation in ('JobManager.create', 'TimeSlotManager.create'):
+            self.assertIn(f'gany_booking_seconds_bucket{{operation='
+                          f'"{operation}",le="+Inf"}} 1.0', text)
+
+    def test_availability_cache_counters(self):
+        """ To check that the availability cache hits, misses and
+        invalidations are exposed at /metrics"""
+        executor = samples.sample_user()
+        for _ in range(2):
+            availability_cache.get_or_set(executor.pk, 'key', lambda: 1)
+        availability_cache.invalidate(executor.pk)
+
+        text = self.client.get('/metrics').content.decode()
+
+        for event in ('hits', 'misses', 'invalidations'):
+            self.assertIn(f'gany_availability_cache_total{{event='
+                          f'"{event}"}} 1.0', text)
+
+    def test_metrics_access(self):
+        """ To check that /metrics only answers the allowed addresses
+        and staff users"""
+        self.assertEqual(self.client.get(
+            '/metrics', REMOTE_ADDR='10.0.0.1').status_code, 403)
+
+        staff = samples.sample_user()
+        staff.is_staff = True
+        staff.save()
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get(
+            '/metrics', REMOTE_ADDR='10.0.0.1').status_code, 200)
@@ -0,0 +1,126 @@
+import os
+from unittest import mock
+
+from django.db import connections
+from django.test import SimpleTestCase
+
+import psycopg2
+from psycopg2.pool import PoolError
+
+from utilities.db import pool
+from utilities.db.pool import ConnectionPool, close_pools, stats
+from utilities.db.pooled.base import DatabaseWrapper
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    databases = {'default'}
+
+    def setUp(self):
+        self.params = connections['default'].get_connection_params()
+
+    def pool(self, *args, **kwargs):
+        connection_pool = ConnectionPool(*args, **kwargs, **self.params)
+        self.addCleanup(connection_pool.closeall)
+        return connection_pool
+
+    def test_backend_reuses_connections(self):
+        """ To check that the pooled backend gives its connection back
+        to the pool when closed and takes it again"""
+        settings_dict = dict(connections['default'].settings_dict,
+                             ENGINE='utilities.db.pooled',
+                             POOL={'MIN_SIZE': 1, 'MAX_SIZE': 2})
+        wrapper = DatabaseWrapper(settings_dict, alias='pooled-test')
+        self.addCleanup(close_pools, alias='pooled-test')
+        backend_pids = []
+        for _ in range(3):
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT pg_backend_pid()')
+                backend_pids.append(cursor.fetchone()[0])
+            wrapper.close()
+
+        self.assertEqual(len(set(backend_pids)), 1)
+        pool_stats = stats()[('pooled-test', settings_dict['NAME'])]
+        self.assertEqual(pool_stats['connects'], 1)
+        self.assertEqual(pool_stats['checkouts'], 3)
+        self.assertEqual(pool_stats['idle'], 1)
+
+    def test_health_check(self):
+        """ To check that a connection lost while idle is replaced on
+        checkout"""
+        connection_pool = self.pool(1, 2, check_after=0)
+        conn = connection_pool.checkout()
+        connection_pool.checkin(conn)
+        other = psycopg2.connect(**self.params)
+        with other, other.cursor() as cursor:
+            cursor.execute('SELECT pg_terminate_backend(%s)',
+                           [conn.get_backend_pid()])
+        other.close()
+
+        replaced = connection_pool.checkout()
+
+        self.assertIsNot(replaced, conn)
+        self.assertEqual(connection_pool.stats()['broken'], 1)
+
+    def test_max_lifetime(self):
+        """ To check that connections past their lifetime are closed"""
+        connection_pool = self.pool(0, 2, max_lifetime=0)
+        conn = connection_pool.checkout()
+        connection_pool.checkin(conn)
+
+        self.assertTrue(conn.closed)
+        self.assertEqual(connection_pool.stats()['expired'], 1)
+
+    def test_exhausted(self):
+        """ To check that a checkout gives up when every connection is
+        used for longer than the timeout"""
+        connection_pool = self.pool(0, 1, timeout=0.01)
+        connection_pool.checkout()
+
+        with self.assertRaises(PoolError):
+            connection_pool.checkout()
+        self.assertEqual(connection_pool.stats()['timeouts'], 1)
+
+    def test_idle_connections_kept_up_to_max(self):
+        """ To check that the connections of concurrent checkouts stay
+        open when given back, above minconn"""
+        connection_pool = self.pool(1, 3)
+        for _ in range(2):
+            conns = [connection_pool.checkout() for _ in range(3)]
+            for conn in conns:
+                connection_pool.checkin(conn)
+
+        pool_stats = connection_pool.stats()
+        self.assertEqual(pool_stats['connects'], 3)
+        self.assertEqual(pool_stats['idle'], 3)
+
+    def test_idle_timeout(self):
+        """ To check that the idle connections above minconn are closed
+        after the idle timeout"""
+        connection_pool = self.pool(1, 3, idle_timeout=0)
+        conns = [connection_pool.checkout() for _ in range(3)]
+        for conn in conns:
+            connection_pool.checkin(conn)
+
+        pool_stats = connection_pool.stats()
+        self.assertEqual(pool_stats['idle'], 1)
+        self.assertEqual(pool_stats['idle_closed'], 2)
+        self.assertEqual([conn.closed for conn in conns], [1, 1, 0])
+
+    def test_forked_process_gets_its_own_pool(self):
+        """ To check that a forked process does not reuse the pools,
+        nor close the connections, of its parent"""
+        options = {'MIN_SIZE': 1, 'MAX_SIZE': 2}
+        parent = pool.get_pool('fork-test', self.params, options)
+        self.addCleanup(parent.closeall)
+        conn = parent.checkout()
+        parent.checkin(conn)
+
+        with mock.patch.object(pool.os, 'getpid', return_value=-1):
+            child = pool.get_pool('fork-test', self.params, options)
+        self.addCleanup(close_pools, alias='fork-test')
+        self.addCleanup(setattr, pool, '_pid', os.getpid())
+        self.addCleanup(pool._inherited.clear)
+
+        self.assertIsNot(child, parent)
+        self.assertFalse(conn.closed)
+        self.assertIn(parent, pool._inherited)
@@ -0,0 +1,64 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from utilities import profiling, samples
+
+
+class ProfilingTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.settings = override_settings(PROFILING=dict(
+            settings.PROFILING, ENABLED=True, RATE=0,
+            PATTERNS={r'^/api/timeslots/$': 1},
+            DIRECTORY=self.directory.name, KEEP=2))
+        self.settings.enable()
+        # the middleware reads the setting when the client loads it
+        self.client = APIClient()
+        self.client.force_authenticate(samples.sample_user())
+
+    def tearDown(self):
+        self.settings.disable()
+        self.directory.cleanup()
+
+    def test_sampled_requests(self):
+        """ To check that only the requests matching a pattern are
+        profiled and that the most recent profiles are kept"""
+        for _ in range(3):
+            self.client.get('/api/timeslots/')
+        self.client.get('/api/jobs/')
+
+        profiles = profiling.recent(self.directory.name)
+        self.assertEqual(len(profiles), 2)
+        self.assertEqual(len(os.listdir(self.directory.name)), 4)
+        self.assertEqual({p['path'] for p in profiles}, {'/api/timeslots/'})
+        self.assertEqual(profiles[0]['status'], 200)
+
+    def test_admin_pages(self):
+        """ To check that staff can list the slowest profiles and read
+        their reports"""
+        self.client.get('/api/timeslots/')
+        name = profiling.slowest(self.directory.name)[0]['name']
+        admin = get_user_model().objects.create_superuser(
+            'admin@pluto.com', 'password')
+        self.client.force_login(admin)
+
+        response = self.client.get('/admin/profiles/')
+        self.assertContains(response, f'/admin/profiles/{name}/')
+        response = self.client.get(f'/admin/profiles/{name}/?sort=tottime')
+        self.assertContains(response, 'function calls')
+        response = self.client.get('/admin/profiles/missing/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_sample_rate(self):
+        patterns = {r'^/api/jobs/$': 0.5, r'^/api/': 0.1}
+        self.assertEqual(profiling.sample_rate('/api/jobs/', patterns, 0), 0.5)
+        self.assertEqual(profiling.sample_rate('/api/reviews/', patterns, 0),
+                         0.1)
+        self.assertEqual(profiling.sample_rate('/admin/', patterns, 0.01),
+                         0.01)
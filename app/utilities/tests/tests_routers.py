@@ -0,0 +1,106 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from job.models import Job
+from review.models import Review
+from timeslot.models import TimeSlot
+from utilities import routers
+
+REPLICAS = ['replica1', 'replica2']
+
+
+@override_settings(REPLICAS=REPLICAS, REPLICA_PIN_SECONDS=5)
+class ReplicaRouterTests(SimpleTestCase):
+
+    def setUp(self):
+        self.router = routers.ReplicaRouter()
+
+    def test_reads(self):
+        """ To check that the scheduling and review reads go to the
+        replicas, unless the request is pinned or already wrote"""
+        for model in (Job, TimeSlot, Review):
+            self.assertIn(self.router.db_for_read(model), REPLICAS)
+        self.assertIsNone(self.router.db_for_read(get_user_model()))
+
+        with routers.request_state(pinned=True):
+            self.assertIsNone(self.router.db_for_read(Job))
+        with routers.request_state():
+            self.assertIn(self.router.db_for_read(Job), REPLICAS)
+            self.router.db_for_write(Job)
+            self.assertIsNone(self.router.db_for_read(Job))
+
+        # writes out of a request do not pin the thread
+        self.router.db_for_write(Job)
+        self.assertIn(self.router.db_for_read(Job), REPLICAS)
+
+    def test_writes(self):
+        """ To check that instances read from a replica are written to
+        the primary and that replicas are not migrated"""
+        job = Job()
+        job._state.db = 'replica1'
+        with routers.request_state():
+            self.assertEqual(self.router.db_for_write(Job, instance=job),
+                             'default')
+        self.assertIs(self.router.allow_migrate('replica1', 'job'), False)
+        self.assertIsNone(self.router.allow_migrate('default', 'job'))
+
+    def test_pinning_middleware(self):
+        """ To check that a request which wrote pins the next requests
+        of the user to the primary"""
+        def write(request):
+            routers.ReplicaRouter().db_for_write(Job)
+            return HttpResponse()
+
+        pinned = []
+
+        def read(request):
+            pinned.append(routers.reads_primary())
+            return HttpResponse()
+
+        factory = RequestFactory()
+        response = routers.ReplicaPinningMiddleware(write)(
+            factory.post('/api/jobs/'))
+        cookie = response.cookies[routers.PIN_COOKIE]
+        self.assertEqual(cookie['max-age'], 5)
+
+        routers.ReplicaPinningMiddleware(read)(factory.get('/api/jobs/'))
+        request = factory.get('/api/jobs/')
+        request.COOKIES[routers.PIN_COOKIE] = cookie.value
+        routers.ReplicaPinningMiddleware(read)(request)
+        request = factory.get('/api/jobs/')
+        request.COOKIES[routers.PIN_COOKIE] = 'forged'
+        routers.ReplicaPinningMiddleware(read)(request)
+
+        self.assertEqual(pinned, [False, True, False])
+        self.assertFalse(routers.reads_primary())
+
+    def test_pinning_by_user(self):
+        """ To check that the pin of a user who wrote is kept in the
+        cache for the clients without cookies, e.g with Basic auth,
+        whose user is only known once the view authenticated it"""
+        self.addCleanup(caches['default'].clear)
+        user = get_user_model()(pk=1, email='tito@pluto.com')
+        other = get_user_model()(pk=2, email='tito123@pluto.com')
+
+        def write(request):
+            request.user = user
+            routers.ReplicaRouter().db_for_write(Job)
+            return HttpResponse()
+
+        pinned = []
+
+        def read(request):
+            request.user = request.authenticated
+            pinned.append(routers.reads_primary())
+            return HttpResponse()
+
+        factory = RequestFactory()
+        routers.ReplicaPinningMiddleware(write)(factory.post('/api/jobs/'))
+        for authenticated in (user, other):
+            request = factory.get('/api/jobs/')
+            request.authenticated = authenticated
+            routers.ReplicaPinningMiddleware(read)(request)
+
+        self.assertEqual(pinned, [True, False])
@@ -1,5 +1,7 @@
 import collections
 
+from .intervals import IntervalSet
+
 
 def sequence_continuity(seq):
     """ To check if a  sequence of a 2 tuple item is continuous"""
@@ -16,16 +18,10 @@ def sequence_continuity(seq):
 
 
 def timeslot_continuity_check(qs):
-    """ To check if a  queryset of DTrange objects are continuous"""
+    """ To check if a  queryset of DTrange objects are continuous,
+    the queryset is evaluated once and in any order"""
     if not isinstance(qs, collections.abc.Iterable):
         raise ValueError("Argument must be an Iterable")
-    if not qs.exists():
-        return False
-    cue = qs[0].period.lower
-    for item in qs:
-        if cue == item.period.lower:
-            cue = item.period.upper
-            continue
-        else:
-            return False
-    return True
+    slots = IntervalSet((item.period.lower, item.period.upper)
+                        for item in qs)
+    return len(slots.blocks) == 1